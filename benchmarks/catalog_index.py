@@ -0,0 +1,146 @@
+"""Benchmark search_catalog's local catalog index on a synthetic catalog.
+
+Builds a CatalogMirror from N synthetic datasources (default 100,000) and
+times text, bbox, time-range and combined searches through the mirror's
+indexes against a brute-force scan of the same datasources.
+
+    python benchmarks/catalog_index.py [N]
+"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+import time
+
+import numpy as np
+import shapely.geometry
+
+from oceanum_mcp.servers.datamesh.catalog import CatalogMirror
+
+
+def synthetic_features(n: int, seed: int = 0) -> list[dict]:
+    """Catalog listing features: small boxes anywhere, varied coverage."""
+    rng = np.random.default_rng(seed)
+    xs = rng.uniform(-180, 175, n)
+    ys = rng.uniform(-90, 85, n)
+    sizes = rng.uniform(0.1, 5, (n, 2))
+    starts = rng.integers(0, 27000, n)
+    spans = rng.integers(1, 9000, n)
+    epoch = datetime.datetime(1950, 1, 1)
+    features = []
+    for i in range(n):
+        x, y, (w, h) = xs[i], ys[i], sizes[i]
+        tstart = epoch + datetime.timedelta(days=int(starts[i]))
+        props = {
+            "name": f"Synthetic dataset {i}",
+            "description": "Benchmark datasource",
+            "driver": "onzarr",
+            "tags": ["synthetic", ("wave", "wind", "sst")[i % 3]],
+            "tstart": tstart.isoformat() + "Z",
+            "modified": "2024-01-01T00:00:00Z",
+        }
+        if i % 4:  # a quarter are ongoing
+            props["tend"] = (
+                tstart + datetime.timedelta(days=int(spans[i]))
+            ).isoformat() + "Z"
+        features.append(
+            {
+                "type": "Feature",
+                "id": f"synthetic-{i:06d}",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[x, y], [x + w, y], [x + w, y + h], [x, y + h], [x, y]]
+                    ],
+                },
+                "properties": props,
+            }
+        )
+    return features
+
+
+def scan(datasources, start=None, end=None, bbox=None, text=None) -> int:
+    """Brute-force equivalent of CatalogMirror.search (no limit)."""
+    box = shapely.geometry.box(*bbox) if bbox else None
+    count = 0
+    for ds in datasources:
+        if text and text not in (ds.tags or []):
+            continue
+        if start is not None or end is not None:
+            if end is not None and ds.tstart.replace(tzinfo=None) > end:
+                continue
+            if (
+                start is not None
+                and ds.tend is not None
+                and ds.tend.replace(tzinfo=None) < start
+            ):
+                continue
+        if box is not None and not ds.geom.intersects(box):
+            continue
+        count += 1
+    return count
+
+
+def best_of(fn, repeat: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(n: int) -> None:
+    features = synthetic_features(n)
+    mirror = CatalogMirror()
+    t0 = time.perf_counter()
+    mirror.apply(features)
+    load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    mirror.apply(features)
+    unchanged = time.perf_counter() - t0
+    features[0]["properties"]["modified"] = "2024-06-01T00:00:00Z"
+    t0 = time.perf_counter()
+    mirror.apply(features)
+    one_change = time.perf_counter() - t0
+    print(f"{n} datasources")
+    print(f"  initial load + index build   {load * 1e3:10.1f} ms")
+    print(f"  refresh, nothing changed     {unchanged * 1e3:10.1f} ms")
+    print(f"  refresh, one datasource      {one_change * 1e3:10.1f} ms")
+
+    datasources = mirror.search()
+    t = datetime.datetime
+    cases = {
+        "text": {"text": "wave"},
+        "text, top 20": {"text": "wave", "limit": 20},
+        "bbox 10x10 deg": {"bbox": [170, -45, 180, -35]},
+        "time 1 month": {"start": t(2020, 1, 1), "end": t(2020, 2, 1)},
+        "bbox + time": {
+            "bbox": [170, -45, 180, -35],
+            "start": t(2020, 1, 1),
+            "end": t(2020, 2, 1),
+        },
+        "bbox + time + text": {
+            "bbox": [170, -45, 180, -35],
+            "start": t(2020, 1, 1),
+            "end": t(2020, 2, 1),
+            "text": "wave",
+        },
+    }
+    print(f"  {'search':<22}{'matches':>9}{'index ms':>11}{'scan ms':>11}")
+    for label, case in cases.items():
+        indexed, matches = best_of(lambda: mirror.search(**case))
+        filters = {k: v for k, v in case.items() if k != "limit"}
+        scanned, expected = best_of(lambda: scan(datasources, **filters), repeat=1)
+        # Only the synthetic tags vary in wording, so the mirror's ranked
+        # text match finds exactly the scan's tag matches.
+        assert len(matches) == min(expected, case.get("limit", expected))
+        print(
+            f"  {label:<22}{len(matches):>9}"
+            f"{indexed * 1e3:>11.3f}{scanned * 1e3:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,172 @@
+"""Admission control for tool calls on a shared (hosted) server.
+
+Every gateway-bound tool call (query_data, export_query, stage_queries,
+fetch_page, load_datasource) holds a worker thread, gateway sessions and
+memory for as long as it runs. Without a bound, one tenant firing many calls
+in parallel occupies all of them, and every other tenant's calls wait behind
+theirs. AdmissionControl bounds the calls running at once, both in total and
+per tenant (the hash of the caller's credential), and makes calls over the
+bound wait in line.
+
+Each tenant has its own bounded line. When a call finishes, the freed slot
+goes to the longest-waiting call whose tenant is under its own limit, so a
+tenant with many calls queued never holds up another tenant's. A call that
+finds its tenant's line full, or that waits longer than the timeout, is
+refused with Busy, which carries an estimate of when to retry.
+
+State is touched only from the event loop, so there is no lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import Counter, deque
+
+# Retry estimate before any call has finished, and its bounds.
+_DEFAULT_RETRY_S = 5.0
+_MIN_RETRY_S = 1
+_MAX_RETRY_S = 300
+
+# Weight of the latest call in the running mean of call durations.
+_DURATION_WEIGHT = 0.2
+
+
+class Busy(Exception):
+    """The server is at its call limit for this tenant; retry later."""
+
+    def __init__(self, message: str, retry_after_s: int) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionControl:
+    """Bounds concurrent calls in total and per tenant, with a wait line.
+
+    max_calls: calls running at once across all tenants.
+    tenant_calls: calls running at once for one tenant.
+    queue: calls one tenant may have waiting; 0 refuses instead of waiting.
+    timeout_s: longest a call waits before it is refused.
+    """
+
+    def __init__(
+        self, max_calls: int, tenant_calls: int, queue: int, timeout_s: float
+    ) -> None:
+        self._max = max_calls
+        self._tenant_max = tenant_calls
+        self._queue = queue
+        self._timeout = timeout_s
+        self._running: Counter[str] = Counter()
+        self._queued: Counter[str] = Counter()
+        self._waiters: deque[tuple[str, asyncio.Future[None]]] = deque()
+        self._mean_s: float | None = None
+        self._admitted = 0
+        self._refused = 0
+
+    async def acquire(self, tenant: str) -> float:
+        """Wait for a slot for tenant; returns the monotonic start time.
+
+        Raises Busy if tenant's line is full or the wait times out. Every
+        successful acquire must be paired with release().
+        """
+        # Slots are handed to waiting calls as soon as they free up, so a
+        # free slot here is one no waiting call can use.
+        if self._free(tenant):
+            self._grant(tenant)
+            return time.monotonic()
+        if self._queued[tenant] >= self._queue:
+            raise self._busy(
+                f"Too many calls in progress for this credential "
+                f"({self._running[tenant]} running, {self._queued[tenant]} "
+                "waiting)."
+            )
+        entry = (tenant, asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        self._queued[tenant] += 1
+        try:
+            await asyncio.wait((entry[1],), timeout=self._timeout)
+        except BaseException:
+            if self._leave(entry):
+                self._return(tenant)
+            raise
+        if not self._leave(entry):
+            raise self._busy(
+                f"No free slot within {self._timeout:g} s; the server is busy."
+            )
+        return time.monotonic()
+
+    def release(self, tenant: str, started: float) -> None:
+        """Free tenant's slot, taken at started, for the next waiting call."""
+        elapsed = time.monotonic() - started
+        if self._mean_s is None:
+            self._mean_s = elapsed
+        else:
+            self._mean_s += _DURATION_WEIGHT * (elapsed - self._mean_s)
+        self._return(tenant)
+
+    def clear(self) -> None:
+        """Forget all state (calls running or waiting are not notified)."""
+        self._running.clear()
+        self._queued.clear()
+        self._waiters.clear()
+        self._mean_s = None
+        self._admitted = 0
+        self._refused = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "running": sum(self._running.values()),
+            "waiting": len(self._waiters),
+            "admitted": self._admitted,
+            "refused": self._refused,
+        }
+
+    def _free(self, tenant: str) -> bool:
+        return (
+            sum(self._running.values()) < self._max
+            and self._running[tenant] < self._tenant_max
+        )
+
+    def _grant(self, tenant: str) -> None:
+        self._running[tenant] += 1
+        self._admitted += 1
+
+    def _return(self, tenant: str) -> None:
+        self._running[tenant] -= 1
+        if not self._running[tenant]:
+            del self._running[tenant]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting calls, longest-waiting first."""
+        for entry in list(self._waiters):
+            tenant, future = entry
+            if sum(self._running.values()) >= self._max:
+                return
+            if self._running[tenant] < self._tenant_max:
+                self._waiters.remove(entry)
+                self._grant(tenant)
+                future.set_result(None)
+
+    def _leave(self, entry: tuple[str, asyncio.Future[None]]) -> bool:
+        """Take a waiting call out of line; returns whether it was granted.
+
+        A call granted a slot just as its wait timed out runs anyway; one
+        cancelled after being granted must give the slot back.
+        """
+        tenant, future = entry
+        self._queued[tenant] -= 1
+        if not self._queued[tenant]:
+            del self._queued[tenant]
+        if future.done():
+            return True
+        self._waiters.remove(entry)
+        future.cancel()
+        return False
+
+    def _busy(self, message: str) -> Busy:
+        self._refused += 1
+        estimate = _DEFAULT_RETRY_S if self._mean_s is None else self._mean_s
+        retry_after_s = min(max(math.ceil(estimate), _MIN_RETRY_S), _MAX_RETRY_S)
+        return Busy(f"{message} Retry after {retry_after_s} s.", retry_after_s)
@@ -0,0 +1,224 @@
+"""In-process caches shared by Oceanum MCP servers.
+
+Every cache that holds per-user gateway state keys its entries by
+common.client.credential_key(), so entries are never shared between
+credentials. The same goes for SingleFlight keys, which decide whose
+in-flight result a caller may receive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL, thread-safe.
+
+    Lookups come both from the event loop and from tool work offloaded to
+    worker threads, so they race; every operation holds the lock only for
+    dict bookkeeping.
+    None is never stored — get() returning None always means a miss. Hit and
+    miss counters are kept for observability (stats()).
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float) -> None:
+        self._lock = threading.Lock()
+        # key -> (monotonic expiry, value)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._max = max_entries
+        self._ttl = ttl_s
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl_s: float | None = None) -> None:
+        """Store value under key; ttl_s overrides the cache default."""
+        if value is None:
+            return
+        expiry = time.monotonic() + (self._ttl if ttl_s is None else ttl_s)
+        with self._lock:
+            self._entries[key] = (expiry, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate; returns the count."""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                del self._entries[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+            }
+
+
+class ByteLRUCache:
+    """LRU cache bounded by the total size of its values, thread-safe.
+
+    Callers state each value's size in bytes when storing it; the least
+    recently used entries are evicted once the total exceeds max_bytes. A
+    value larger than the whole budget is not stored. max_bytes <= 0
+    disables the cache (every get() misses). With ttl_s, entries also
+    expire that many seconds after they were stored. Counters as for
+    TTLCache.
+    """
+
+    def __init__(self, max_bytes: int, ttl_s: float | None = None) -> None:
+        self._lock = threading.Lock()
+        # key -> (size in bytes, monotonic expiry, value)
+        self._entries: OrderedDict[Hashable, tuple[int, float, Any]] = OrderedDict()
+        self._max = max_bytes
+        self._ttl = ttl_s
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() >= entry[1]:
+                del self._entries[key]
+                self._bytes -= entry[0]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, value: Any, nbytes: int) -> None:
+        """Store value under key, accounting it as nbytes of the budget."""
+        if value is None or nbytes > self._max:
+            return
+        expiry = float("inf") if self._ttl is None else time.monotonic() + self._ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0]
+            self._entries[key] = (nbytes, expiry, value)
+            self._bytes += nbytes
+            while self._bytes > self._max:
+                _, (size, _, _) = self._entries.popitem(last=False)
+                self._bytes -= size
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate; returns the count."""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                self._bytes -= self._entries.pop(key)[0]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent identical async calls onto one in-flight call.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight (followers) await the leader's future and receive
+    the same result or exception. Nothing is kept once the call finishes —
+    this deduplicates simultaneous work, it is not a cache. If the leader is
+    cancelled, its followers retry (one of them becomes the new leader)
+    rather than inheriting the cancellation.
+
+    Bound to a single event loop, like the server; all bookkeeping happens
+    on that loop, so no lock is needed.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return fn()'s result, sharing it with identical concurrent calls."""
+        while (pending := self._calls.get(key)) is not None:
+            self._coalesced += 1
+            # asyncio.wait never cancels the leader's future, even if this
+            # follower is itself cancelled while waiting.
+            await asyncio.wait((pending,))
+            if not pending.cancelled():
+                return pending.result()
+            self._coalesced -= 1
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Retrieved here so an unshared failure is not logged as
+            # "exception was never retrieved" at garbage collection.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def clear(self) -> None:
+        """Reset the counters (in-flight calls are left to finish)."""
+        self._leaders = 0
+        self._coalesced = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leaders": self._leaders,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._calls),
+        }
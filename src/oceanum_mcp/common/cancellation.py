@@ -0,0 +1,68 @@
+"""Cancellation of blocking work that tool calls run on worker threads.
+
+When an MCP client cancels a tool call, FastMCP cancels the call's task,
+but a worker thread the task is waiting on runs on regardless: a download
+reads to the end, a dask computation fetches every chunk. So each server's
+_run_sync runs the thread's work inside cancellable(), and sets the event
+when its task is cancelled. The thread's work then stops at its next
+check:
+
+- raise_if_cancelled() between blocks of a download or pieces of a write;
+- wait() instead of time.sleep() in retry back-offs;
+- dask_callbacks() passed to dask.compute, which stops the computation
+  before its next task (tasks already running finish).
+
+Outside cancellable() all of these do nothing.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from dask.callbacks import Callback
+
+
+class Cancelled(Exception):
+    """Raised on a worker thread whose tool call was cancelled."""
+
+
+_event: ContextVar[threading.Event | None] = ContextVar("_cancel_event", default=None)
+
+
+@contextmanager
+def cancellable(event: threading.Event) -> Iterator[None]:
+    """Run the enclosed work so that setting event stops it at its next check."""
+    token = _event.set(event)
+    try:
+        yield
+    finally:
+        _event.reset(token)
+
+
+def raise_if_cancelled() -> None:
+    event = _event.get()
+    if event is not None and event.is_set():
+        raise Cancelled("The tool call was cancelled.")
+
+
+def wait(seconds: float) -> None:
+    """Sleep for seconds, or raise Cancelled as soon as the call is cancelled."""
+    event = _event.get()
+    if event is None:
+        threading.Event().wait(seconds)
+    elif event.wait(seconds):
+        raise Cancelled("The tool call was cancelled.")
+
+
+def dask_callbacks() -> list[Any]:
+    """Callbacks for dask.compute(callbacks=...) that stop it once cancelled.
+
+    dask calls pretask on the thread that called compute(), where the
+    cancellation event is visible.
+    """
+    if _event.get() is None:
+        return []
+    return [Callback(pretask=lambda key, dsk, state: raise_if_cancelled())._callback]
@@ -12,16 +12,27 @@ Clients are cached per credential: Connector construction performs a gateway
 round trip, so rebuilding it on every tool call would double request latency.
 The cache is bounded and entries expire so revoked tokens do not keep a live
 client forever.
+
+Direct gateway calls the oceanum library does not offer asynchronously
+(staging, catalog and metadata reads) share one credential-less
+httpx.AsyncClient per event loop; the credential travels in each request's
+headers.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
 import threading
 import time
+import weakref
 from collections import OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import TYPE_CHECKING, Any, Callable
 
+import httpx
+
 from oceanum_mcp.common.config import auth_mode, datamesh_service, storage_service
 
 if TYPE_CHECKING:
@@ -35,6 +46,10 @@ CREDENTIAL_CLAIM = "datamesh_credential"
 _CACHE_MAX = 64
 _CACHE_TTL_S = 900.0
 
+# Upper bound on concurrent gateway connections from the shared async client.
+# Staging requests are long-lived but cheap to hold open as coroutines.
+_GATEWAY_MAX_CONNECTIONS = 500
+
 
 class _ClientCache:
     """Bounded TTL cache keyed by (credential, service), thread-safe.
@@ -128,6 +143,14 @@ def resolve_credential() -> str:
     )
 
 
+def credential_key() -> str:
+    """Non-reversible identifier of the current tool call's credential.
+
+    Keys per-user caches without keeping raw tokens around as dict keys.
+    """
+    return hashlib.sha256(resolve_credential().encode()).hexdigest()
+
+
 def _get_client(
     cache: _ClientCache, service: str, build: Callable[[str, str], Any]
 ) -> Any:
@@ -157,3 +180,33 @@ def get_storage_filesystem() -> FileSystem:
         return FileSystem(token=credential, service=service)
 
     return _get_client(_storage_cache, storage_service(), build)
+
+
+_gateway_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def get_gateway_http() -> httpx.AsyncClient:
+    """Return the shared async HTTP client for direct Datamesh gateway calls.
+
+    One client (one connection pool) per event loop, since an AsyncClient's
+    pool is bound to the loop it first runs on; in a server process that is
+    a single client for its lifetime, never closed. The client is shared by
+    every tenant, so it carries no credential and rejects all cookies:
+    nothing a response sets may leak into another user's request.
+    """
+    loop = asyncio.get_running_loop()
+    client = _gateway_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            # Connection-level retries only, like the library's retried
+            # requests; HTTP error statuses are never retried blindly.
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=_GATEWAY_MAX_CONNECTIONS),
+            ),
+        )
+        _gateway_clients[loop] = client
+    return client
@@ -13,6 +13,56 @@ DEFAULT_MAX_INLINE_BYTES = 50_000_000
 # of a within-budget tabular result is shown at once.
 DEFAULT_MAX_INLINE_ROWS = 100
 
+# Default number of queries stage_queries sends to the gateway at once. Each
+# in-flight staging holds a gateway session; the bound keeps one batch from
+# monopolising the gateway while still overlapping most of the latency.
+DEFAULT_STAGE_CONCURRENCY = 8
+
+# Default byte budget of the in-memory query_data result cache. Entries are
+# response summaries bounded by the inline limits, so this holds many of them.
+DEFAULT_RESULT_CACHE_BYTES = 64_000_000
+
+# Default byte budget of the store of downloaded results behind query_data
+# cursors (fetch_page). Each entry is one inline-sized result.
+DEFAULT_PAGE_STORE_BYTES = 256_000_000
+
+# Default byte budget of the head preview of a lazy dataset: the stored
+# chunks read to show its first values. One chunk of a typical gridded
+# variable is a few megabytes.
+DEFAULT_PREVIEW_BYTES = 16_000_000
+
+# Default bytes of downloaded rows a local tabular export holds in memory at
+# once. Larger exports are fetched as sub-queries of about this size and
+# appended to the file one by one.
+DEFAULT_EXPORT_CHUNK_BYTES = 256_000_000
+
+# Defaults of the lazy NetCDF export engine: chunk fetches in flight at once,
+# and the bytes of chunks they may hold together (fewer workers run when
+# chunks are large).
+DEFAULT_EXPORT_WORKERS = 8
+DEFAULT_EXPORT_WINDOW_BYTES = 512_000_000
+
+# Defaults bounding the statistics query_data(stats=True) computes over a
+# lazy dataset: wall-clock seconds before returning what was scanned, and
+# bytes of chunks held in memory at once.
+DEFAULT_STATS_TIMEOUT_S = 20.0
+DEFAULT_STATS_MEMORY_BYTES = 512_000_000
+
+# Default byte budget of the on-disk result cache (OCEANUM_MCP_CACHE_DIR).
+DEFAULT_CACHE_DIR_MAX_BYTES = 5_000_000_000
+
+# Default maximum age, in seconds, of a catalog mirror before search_catalog
+# refreshes it from the gateway.
+DEFAULT_CATALOG_REFRESH_S = 300.0
+
+# Defaults of admission control on hosted servers: data tool calls running at
+# once in total and per credential, calls one credential may have waiting for
+# a slot, and seconds a call waits before it is refused as busy.
+DEFAULT_MAX_CONCURRENT_CALLS = 16
+DEFAULT_TENANT_CONCURRENT_CALLS = 4
+DEFAULT_ADMISSION_QUEUE = 8
+DEFAULT_ADMISSION_TIMEOUT_S = 30.0
+
 # Transport the current process was started with. Set by the CLI before the
 # server modules are imported (they are imported lazily), so import-time
 # decisions like disabling local-filesystem tools in http mode can key off it.
@@ -47,6 +97,19 @@ def is_read_only() -> bool:
     )
 
 
+def single_stage() -> bool:
+    """Whether query tools download from the stage they already made.
+
+    Enabled unless OCEANUM_MCP_SINGLE_STAGE is set to 0/false/no, which falls
+    back to the oceanum library's own query path (it stages a second time).
+    """
+    return os.environ.get("OCEANUM_MCP_SINGLE_STAGE", "").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
 def max_inline_bytes() -> int:
     """Byte threshold above which results are not downloaded inline.
 
@@ -86,6 +149,318 @@ def max_inline_rows() -> int:
     return rows
 
 
+def result_cache_bytes() -> int:
+    """Byte budget of the in-memory query_data result cache; 0 disables it.
+
+    Read at server start from OCEANUM_MCP_RESULT_CACHE_BYTES. Fails fast on
+    an unparsable or negative value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_RESULT_CACHE_BYTES")
+    if not raw:
+        return DEFAULT_RESULT_CACHE_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_RESULT_CACHE_BYTES must be an integer byte count, "
+            f"got {raw!r}"
+        ) from exc
+    if budget < 0:
+        raise ValueError(
+            f"OCEANUM_MCP_RESULT_CACHE_BYTES must not be negative, got {budget}"
+        )
+    return budget
+
+
+def page_store_bytes() -> int:
+    """Byte budget of the result store behind fetch_page; 0 disables cursors.
+
+    Read at server start from OCEANUM_MCP_PAGE_STORE_BYTES. Fails fast on an
+    unparsable or negative value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_PAGE_STORE_BYTES")
+    if not raw:
+        return DEFAULT_PAGE_STORE_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_PAGE_STORE_BYTES must be an integer byte count, "
+            f"got {raw!r}"
+        ) from exc
+    if budget < 0:
+        raise ValueError(
+            f"OCEANUM_MCP_PAGE_STORE_BYTES must not be negative, got {budget}"
+        )
+    return budget
+
+
+def preview_bytes() -> int:
+    """Byte budget of the chunks read for a lazy dataset's head preview.
+
+    Read from OCEANUM_MCP_PREVIEW_BYTES; 0 disables previews. Fails fast on
+    an unparsable or negative value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_PREVIEW_BYTES")
+    if not raw:
+        return DEFAULT_PREVIEW_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_PREVIEW_BYTES must be an integer byte count, got {raw!r}"
+        ) from exc
+    if budget < 0:
+        raise ValueError(
+            f"OCEANUM_MCP_PREVIEW_BYTES must not be negative, got {budget}"
+        )
+    return budget
+
+
+def export_chunk_bytes() -> int:
+    """Bytes of rows a streaming tabular export downloads and holds at once.
+
+    From OCEANUM_MCP_EXPORT_CHUNK_BYTES. Fails fast on an unparsable or
+    non-positive value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_EXPORT_CHUNK_BYTES")
+    if not raw:
+        return DEFAULT_EXPORT_CHUNK_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_CHUNK_BYTES must be an integer byte count, "
+            f"got {raw!r}"
+        ) from exc
+    if budget < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_CHUNK_BYTES must be positive, got {budget}"
+        )
+    return budget
+
+
+def export_workers() -> int:
+    """Concurrent chunk fetches of a lazy NetCDF export.
+
+    From OCEANUM_MCP_EXPORT_WORKERS. Fails fast on an unparsable value or one
+    below 1.
+    """
+    raw = os.environ.get("OCEANUM_MCP_EXPORT_WORKERS")
+    if not raw:
+        return DEFAULT_EXPORT_WORKERS
+    try:
+        workers = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_WORKERS must be an integer, got {raw!r}"
+        ) from exc
+    if workers < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_WORKERS must be at least 1, got {workers}"
+        )
+    return workers
+
+
+def export_window_bytes() -> int:
+    """Bytes of chunks a lazy NetCDF export may hold in flight at once.
+
+    From OCEANUM_MCP_EXPORT_WINDOW_BYTES. Fails fast on an unparsable or
+    non-positive value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_EXPORT_WINDOW_BYTES")
+    if not raw:
+        return DEFAULT_EXPORT_WINDOW_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_WINDOW_BYTES must be an integer byte count, "
+            f"got {raw!r}"
+        ) from exc
+    if budget < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_EXPORT_WINDOW_BYTES must be positive, got {budget}"
+        )
+    return budget
+
+
+def stats_timeout_s() -> float:
+    """Deadline, in seconds, of lazy dataset statistics (partial results after).
+
+    From OCEANUM_MCP_STATS_TIMEOUT_S. Fails fast on an unparsable or
+    non-positive value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_STATS_TIMEOUT_S")
+    if not raw:
+        return DEFAULT_STATS_TIMEOUT_S
+    try:
+        seconds = float(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_STATS_TIMEOUT_S must be a number of seconds, got {raw!r}"
+        ) from exc
+    if seconds <= 0:
+        raise ValueError(f"OCEANUM_MCP_STATS_TIMEOUT_S must be positive, got {seconds}")
+    return seconds
+
+
+def stats_memory_bytes() -> int:
+    """Memory cap on chunks in flight while computing lazy dataset statistics.
+
+    From OCEANUM_MCP_STATS_MEMORY_BYTES. Fails fast on an unparsable or
+    non-positive value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_STATS_MEMORY_BYTES")
+    if not raw:
+        return DEFAULT_STATS_MEMORY_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_STATS_MEMORY_BYTES must be an integer byte count, "
+            f"got {raw!r}"
+        ) from exc
+    if budget < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_STATS_MEMORY_BYTES must be positive, got {budget}"
+        )
+    return budget
+
+
+def catalog_refresh_s() -> float:
+    """Maximum staleness, in seconds, of search_catalog's local catalog mirror.
+
+    From OCEANUM_MCP_CATALOG_REFRESH_S; 0 disables the mirror, sending every
+    search to the gateway. Fails fast on an unparsable or negative value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_CATALOG_REFRESH_S")
+    if not raw:
+        return DEFAULT_CATALOG_REFRESH_S
+    try:
+        seconds = float(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_CATALOG_REFRESH_S must be a number of seconds, got {raw!r}"
+        ) from exc
+    if seconds < 0:
+        raise ValueError(
+            f"OCEANUM_MCP_CATALOG_REFRESH_S must not be negative, got {seconds}"
+        )
+    return seconds
+
+
+def stage_concurrency() -> int:
+    """Maximum concurrent staging requests for one stage_queries call.
+
+    From OCEANUM_MCP_STAGE_CONCURRENCY; must be a positive integer (fails
+    fast otherwise).
+    """
+    raw = os.environ.get("OCEANUM_MCP_STAGE_CONCURRENCY")
+    if not raw:
+        return DEFAULT_STAGE_CONCURRENCY
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_STAGE_CONCURRENCY must be an integer, got {raw!r}"
+        ) from exc
+    if limit < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_STAGE_CONCURRENCY must be at least 1, got {limit}"
+        )
+    return limit
+
+
+def max_concurrent_calls() -> int:
+    """Data tool calls a hosted server runs at once, across all credentials.
+
+    From OCEANUM_MCP_MAX_CONCURRENT_CALLS; must be a positive integer (fails
+    fast otherwise).
+    """
+    raw = os.environ.get("OCEANUM_MCP_MAX_CONCURRENT_CALLS")
+    if not raw:
+        return DEFAULT_MAX_CONCURRENT_CALLS
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_MAX_CONCURRENT_CALLS must be an integer, got {raw!r}"
+        ) from exc
+    if limit < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_MAX_CONCURRENT_CALLS must be at least 1, got {limit}"
+        )
+    return limit
+
+
+def tenant_concurrent_calls() -> int:
+    """Data tool calls a hosted server runs at once for one credential.
+
+    From OCEANUM_MCP_TENANT_CONCURRENT_CALLS; must be a positive integer
+    (fails fast otherwise).
+    """
+    raw = os.environ.get("OCEANUM_MCP_TENANT_CONCURRENT_CALLS")
+    if not raw:
+        return DEFAULT_TENANT_CONCURRENT_CALLS
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_TENANT_CONCURRENT_CALLS must be an integer, got {raw!r}"
+        ) from exc
+    if limit < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_TENANT_CONCURRENT_CALLS must be at least 1, got {limit}"
+        )
+    return limit
+
+
+def admission_queue() -> int:
+    """Data tool calls one credential may have waiting for a slot.
+
+    From OCEANUM_MCP_ADMISSION_QUEUE; 0 refuses calls over the limits at once
+    instead of queueing them. Fails fast on an unparsable or negative value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_ADMISSION_QUEUE")
+    if not raw:
+        return DEFAULT_ADMISSION_QUEUE
+    try:
+        queue = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_ADMISSION_QUEUE must be an integer, got {raw!r}"
+        ) from exc
+    if queue < 0:
+        raise ValueError(
+            f"OCEANUM_MCP_ADMISSION_QUEUE must not be negative, got {queue}"
+        )
+    return queue
+
+
+def admission_timeout_s() -> float:
+    """Seconds a queued data tool call waits for a slot before it is refused.
+
+    From OCEANUM_MCP_ADMISSION_TIMEOUT_S. Fails fast on an unparsable or
+    non-positive value.
+    """
+    raw = os.environ.get("OCEANUM_MCP_ADMISSION_TIMEOUT_S")
+    if not raw:
+        return DEFAULT_ADMISSION_TIMEOUT_S
+    try:
+        seconds = float(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_ADMISSION_TIMEOUT_S must be a number of seconds, "
+            f"got {raw!r}"
+        ) from exc
+    if seconds <= 0:
+        raise ValueError(
+            f"OCEANUM_MCP_ADMISSION_TIMEOUT_S must be positive, got {seconds}"
+        )
+    return seconds
+
+
 def export_dir() -> Path | None:
     """Optional directory that export_query writes are confined to.
 
@@ -95,6 +470,41 @@ def export_dir() -> Path | None:
     return Path(raw).expanduser().resolve() if raw else None
 
 
+def cache_dir() -> Path | None:
+    """Optional directory for the persistent query result cache (stdio only).
+
+    Set OCEANUM_MCP_CACHE_DIR to keep downloaded query results across
+    sessions; unset (the default) disables the disk cache. Ignored on
+    network transports, which must not touch the server-local filesystem.
+    """
+    raw = os.environ.get("OCEANUM_MCP_CACHE_DIR")
+    if not raw or is_network_transport():
+        return None
+    return Path(raw).expanduser().resolve()
+
+
+def cache_dir_max_bytes() -> int:
+    """Byte budget of the disk cache, from OCEANUM_MCP_CACHE_MAX_BYTES.
+
+    Least recently used results are evicted beyond it. Must be a positive
+    integer (fails fast otherwise).
+    """
+    raw = os.environ.get("OCEANUM_MCP_CACHE_MAX_BYTES")
+    if not raw:
+        return DEFAULT_CACHE_DIR_MAX_BYTES
+    try:
+        budget = int(raw)
+    except ValueError as exc:
+        raise ValueError(
+            f"OCEANUM_MCP_CACHE_MAX_BYTES must be an integer byte count, got {raw!r}"
+        ) from exc
+    if budget < 1:
+        raise ValueError(
+            f"OCEANUM_MCP_CACHE_MAX_BYTES must be at least 1, got {budget}"
+        )
+    return budget
+
+
 def datamesh_service() -> str:
     """Datamesh service URL from the environment (no token required)."""
     domain = os.environ.get("OCEANUM_DOMAIN", "oceanum.io")
@@ -0,0 +1,180 @@
+"""Persistent on-disk cache of downloaded query results (stdio only).
+
+Local users rerun the same queries across sessions; keeping the decoded
+result on disk lets a later query skip the gateway download. Frames are
+stored as Parquet, datasets as NetCDF, one data file per entry plus a JSON
+sidecar holding the metadata needed to validate and restore it:
+
+    <root>/<credential hash>/<query hash>.parquet|.nc
+    <root>/<credential hash>/<query hash>.json
+
+The sidecar is written last, so an entry exists only once its data file is
+complete. Entries are validated against the datasource's `modified`
+timestamp (compared by the caller's value, not re-read from disk), and the
+directory is kept under a byte budget by evicting the least recently used
+entries — "used" is the sidecar's mtime, touched on every hit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Hashable
+
+import pandas as pd
+import xarray as xr
+
+_SIDECAR = ".json"
+_SUFFIX = {"dataset": ".nc", "dataframe": ".parquet", "geodataframe": ".parquet"}
+
+
+def _kind(data: Any) -> str | None:
+    """Storage kind of a query result, or None if it cannot be cached."""
+    if isinstance(data, xr.Dataset):
+        return "dataset"
+    gpd = sys.modules.get("geopandas")
+    if gpd is not None and isinstance(data, gpd.GeoDataFrame):
+        return "geodataframe"
+    if isinstance(data, pd.DataFrame):
+        return "dataframe"
+    return None
+
+
+class DiskResultCache:
+    """Size-bounded LRU of query results on disk, thread-safe within a process.
+
+    Keys are (credential_key, *query identity) tuples; the credential hash
+    becomes the entry's directory, the rest is hashed into its file name.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self._max = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, key: tuple[Hashable, ...]) -> tuple[Path, Path]:
+        """(entry stem, sidecar path) for a key."""
+        credential, *rest = key
+        digest = hashlib.sha256(json.dumps(rest).encode()).hexdigest()
+        stem = self.root / str(credential) / digest
+        return stem, stem.with_suffix(_SIDECAR)
+
+    def get(
+        self, key: tuple[Hashable, ...], modified: Any
+    ) -> tuple[Any, dict[str, Any]] | None:
+        """Return (data, stored metadata) if cached for this `modified`.
+
+        A stale entry (different `modified`) is removed. Unreadable or
+        half-evicted entries are misses, never errors.
+        """
+        stem, sidecar = self._paths(key)
+        try:
+            meta = json.loads(sidecar.read_text())
+        except (OSError, ValueError):
+            return None
+        data_path = stem.with_suffix(_SUFFIX.get(meta.get("kind"), ".missing"))
+        if meta.get("modified") != str(modified):
+            self._remove(stem)
+            return None
+        try:
+            if meta["kind"] == "dataset":
+                data = xr.load_dataset(data_path)
+            elif meta["kind"] == "geodataframe":
+                import geopandas
+
+                data = geopandas.read_parquet(data_path)
+            else:
+                data = pd.read_parquet(data_path)
+            os.utime(sidecar)
+        except (OSError, ValueError):
+            return None
+        return data, meta
+
+    def put(
+        self,
+        key: tuple[Hashable, ...],
+        modified: Any,
+        data: Any,
+        **meta: Any,
+    ) -> bool:
+        """Store a result under key; extra keyword metadata goes in the sidecar.
+
+        Returns False (storing nothing) for results that cannot be cached,
+        fail to serialize (e.g. a mixed-type object column) or do not fit
+        the budget on their own. A failed write is a skipped entry, never an
+        error.
+        """
+        kind = _kind(data)
+        if kind is None:
+            return False
+        stem, sidecar = self._paths(key)
+        data_path = stem.with_suffix(_SUFFIX[kind])
+        tmp = data_path.with_name(f".{data_path.name}.{threading.get_ident()}.tmp")
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if kind == "dataset":
+                data.to_netcdf(tmp)
+            else:
+                data.to_parquet(tmp)
+            if tmp.stat().st_size > self._max:
+                return False
+            with self._lock:
+                os.replace(tmp, data_path)
+                sidecar.write_text(
+                    json.dumps({"kind": kind, "modified": str(modified), **meta})
+                )
+                self._evict()
+        # pyarrow's ArrowInvalid/ArrowTypeError are ValueError/TypeError, and
+        # ArrowNotImplementedError a NotImplementedError.
+        except (OSError, ValueError, TypeError, NotImplementedError):
+            return False
+        finally:
+            # Dot-files are skipped by _entries(), so eviction would never
+            # reclaim a tmp file left behind.
+            tmp.unlink(missing_ok=True)
+        return True
+
+    def _remove(self, stem: Path) -> None:
+        # Sidecar first: without it the entry is invisible to get().
+        stem.with_suffix(_SIDECAR).unlink(missing_ok=True)
+        for suffix in set(_SUFFIX.values()):
+            stem.with_suffix(suffix).unlink(missing_ok=True)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """(last used, total bytes, stem) for every entry, sidecar or not."""
+        entries: dict[Path, tuple[float, int]] = {}
+        for path in self.root.glob("*/*"):
+            if path.name.startswith("."):  # another thread's in-progress write
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            stem = path.with_suffix("")
+            used, size = entries.get(stem, (0.0, 0))
+            # Only the sidecar records use; a data file without one (left by
+            # an interrupted put) keeps 0.0 and is evicted first.
+            if path.suffix == _SIDECAR:
+                used = st.st_mtime
+            entries[stem] = (used, size + st.st_size)
+        return sorted((used, size, stem) for stem, (used, size) in entries.items())
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, stem in entries:
+            if total <= self._max:
+                break
+            self._remove(stem)
+            total -= size
+
+    def stats(self) -> dict[str, int]:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -9,13 +9,21 @@ never mistakes a preview for the full result.
 from __future__ import annotations
 
 import json
+import math
 import sys
 from typing import Any
 
 import pandas as pd
 import xarray as xr
 
-from oceanum_mcp.common.config import is_network_transport, max_inline_rows
+from oceanum_mcp.common.config import (
+    is_network_transport,
+    max_inline_rows,
+    preview_bytes,
+    stats_memory_bytes,
+    stats_timeout_s,
+)
+from oceanum_mcp.common.reductions import CHUNK_READ_ERRORS, lazy_statistics
 
 
 def to_json(obj: Any) -> str:
@@ -55,17 +63,29 @@ def human_bytes(n: int | float) -> str:
     raise AssertionError("unreachable")
 
 
+def _is_geo(df: pd.DataFrame) -> bool:
+    # sys.modules is enough: a GeoDataFrame can only exist if geopandas is
+    # already imported.
+    gpd = sys.modules.get("geopandas")
+    return gpd is not None and isinstance(df, gpd.GeoDataFrame)
+
+
 def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    # geopandas overrides DataFrame.to_json with a GeoJSON serializer, so geo
+    # frames must be converted to plain pandas (geometry as WKT) before
+    # serializing records.
+    if _is_geo(df):
+        gpd = sys.modules["geopandas"]
+        plain = pd.DataFrame(df).copy()
+        for col in df.columns:
+            if isinstance(df[col].dtype, gpd.array.GeometryDtype):
+                plain[col] = df[col].to_wkt()
+        df = plain
     return json.loads(df.to_json(orient="records", date_format="iso"))
 
 
 def _frame_summary(df: pd.DataFrame, max_rows: int) -> dict[str, Any]:
-    # geopandas overrides DataFrame.to_json with a GeoJSON serializer, so geo
-    # frames must be converted to plain pandas (geometry as WKT) before
-    # serializing records. sys.modules is enough: a GeoDataFrame can only
-    # exist if geopandas is already imported.
-    gpd = sys.modules.get("geopandas")
-    is_geo = gpd is not None and isinstance(df, gpd.GeoDataFrame)
+    is_geo = _is_geo(df)
     out: dict[str, Any] = {
         "container": "geodataframe" if is_geo else "dataframe",
         "rows": int(df.shape[0]),
@@ -75,14 +95,7 @@ def _frame_summary(df: pd.DataFrame, max_rows: int) -> dict[str, Any]:
         # Structure-only summary (e.g. after an export): no preview, and no
         # truncation flags that could suggest the result itself is partial.
         return out
-    shown = df.head(max_rows)
-    if is_geo:
-        plain = pd.DataFrame(shown).copy()
-        for col in shown.columns:
-            if isinstance(shown[col].dtype, gpd.array.GeometryDtype):
-                plain[col] = shown[col].to_wkt()
-        shown = plain
-    out["data"] = _records(shown)
+    out["data"] = _records(df.head(max_rows))
     out["truncated"] = df.shape[0] > max_rows
     if out["truncated"]:
         out["note"] = (
@@ -101,7 +114,76 @@ def _coord_summary(coord: xr.DataArray) -> dict[str, Any]:
     return out
 
 
-def _dataset_summary(ds: xr.Dataset, max_rows: int) -> dict[str, Any]:
+def _first_chunk(var: xr.DataArray) -> tuple[tuple[int, ...], int]:
+    """(head lengths per dim, bytes read) of a variable's first chunk.
+
+    Reading any part of a stored (zarr/NetCDF) chunk reads all of it, so the
+    stored chunk sets the cost. The head also stays within the first dask
+    chunk, so a single task computes it. In-memory variables cost nothing.
+    """
+    if var.chunks is None:
+        return tuple(var.shape), 0
+    task = tuple(c[0] for c in var.chunks)
+    stored = var.encoding.get("chunks")
+    if stored is None or len(stored) != var.ndim:
+        stored = task
+    head = tuple(min(t, s) for t, s in zip(task, stored))
+    return head, math.prod(stored) * var.dtype.itemsize
+
+
+def _head_preview(ds: xr.Dataset, max_rows: int, budget: int) -> dict[str, Any] | None:
+    """Records from the leading corner of a lazy dataset, read chunk-wise.
+
+    Each variable contributes at most its first stored chunk (and those of
+    its chunked coordinates); variables whose chunks would take the total
+    past `budget` bytes are left out. Along each dimension, the last first,
+    as many leading positions are kept as fit both the first chunk and
+    max_rows records. None if nothing fits.
+    """
+    names: list[str] = []
+    limits: dict[Any, int] = {}
+    counted: set[Any] = set()
+    total = 0
+    for name, var in ds.data_vars.items():
+        coords = [
+            c
+            for c, coord in var.coords.items()
+            if c not in counted and c not in ds.dims and coord.chunks is not None
+        ]
+        parts = [_first_chunk(var)] + [_first_chunk(var.coords[c]) for c in coords]
+        cost = sum(nbytes for _, nbytes in parts)
+        if total + cost > budget:
+            continue
+        total += cost
+        names.append(str(name))
+        counted.update(coords)
+        for owner, (head, _) in zip([var, *(var.coords[c] for c in coords)], parts):
+            for dim, n in zip(owner.dims, head):
+                limits[dim] = min(limits.get(dim, n), n)
+    if not names:
+        return None
+
+    subset = ds[names]
+    selection: dict[str, int] = {}
+    remaining = max_rows
+    for dim in reversed(list(subset.dims)):
+        n = min(limits.get(dim, subset.sizes[dim]), remaining)
+        selection[str(dim)] = n
+        remaining = max(1, remaining // max(n, 1))
+    try:
+        head = subset.isel({d: slice(0, n) for d, n in selection.items()}).load()
+    except CHUNK_READ_ERRORS:
+        # A failed chunk read costs the preview, not the summary.
+        return None
+    return {
+        "variables": names,
+        "selection": {d: selection[d] for d in map(str, subset.dims)},
+        "bytes_read": total,
+        "data": _records(head.to_dataframe().reset_index()),
+    }
+
+
+def _dataset_summary(ds: xr.Dataset, max_rows: int, stats: bool) -> dict[str, Any]:
     lazy = any(ds[v].chunks is not None for v in ds.data_vars)
     out: dict[str, Any] = {
         "container": "dataset",
@@ -121,7 +203,20 @@ def _dataset_summary(ds: xr.Dataset, max_rows: int) -> dict[str, Any]:
         "size_human": human_bytes(ds.nbytes),
         "lazy": lazy,
     }
-    if lazy:
+    if lazy and stats:
+        out["stats"] = lazy_statistics(ds, stats_timeout_s(), stats_memory_bytes())
+    preview = None
+    if lazy and max_rows > 0 and preview_bytes() > 0:
+        preview = _head_preview(ds, max_rows, preview_bytes())
+    if preview is not None:
+        out["preview"] = preview
+        out["note"] = (
+            "Dataset is lazily loaded; only `preview` (the leading values of "
+            "its first chunk, per `selection`) was downloaded. Narrow the query "
+            "with filters, aggregation, or time_resolution downsampling to see "
+            "values inline" + export_clause() + "."
+        )
+    elif lazy:
         out["note"] = (
             "Dataset is lazily loaded (values not downloaded). Narrow the query "
             "with filters, aggregation, or time_resolution downsampling to see "
@@ -140,15 +235,47 @@ def _dataset_summary(ds: xr.Dataset, max_rows: int) -> dict[str, Any]:
     return out
 
 
+def records_frame(data: Any) -> pd.DataFrame | None:
+    """The table a result's inline records are drawn from, if it has one.
+
+    Frames are their own table; an eager dataset flattens to one row per
+    coordinate combination, as in its summary. Lazy datasets have none.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, xr.Dataset) and not any(
+        data[v].chunks is not None for v in data.data_vars
+    ):
+        return data.to_dataframe().reset_index()
+    return None
+
+
+def page_records(df: pd.DataFrame, offset: int, limit: int) -> dict[str, Any]:
+    """Rows [offset, offset + limit) of a records table, with paging state."""
+    page = df.iloc[offset : offset + limit]
+    end = offset + len(page)
+    return {
+        "rows": int(df.shape[0]),
+        "offset": offset,
+        "data": _records(page),
+        "next_offset": end if end < df.shape[0] else None,
+    }
+
+
 def summarize_data(
-    data: Any, max_rows: int | None = None, warnings: list[str] | None = None
+    data: Any,
+    max_rows: int | None = None,
+    warnings: list[str] | None = None,
+    stats: bool = False,
 ) -> dict[str, Any]:
     """Summarize a query result as a structured dict for MCP output.
 
     max_rows defaults to the configured inline row cap (OCEANUM_MCP_MAX_INLINE_ROWS).
     max_rows <= 0 produces a structure-only summary with no value preview and
     no truncation flags (used after exports, where the written file is
-    complete regardless of preview size).
+    complete regardless of preview size). stats adds per-variable value
+    statistics of a lazy dataset, bounded in time and memory (see
+    common.reductions).
     """
     if max_rows is None:
         max_rows = max_inline_rows()
@@ -160,7 +287,7 @@ def summarize_data(
     elif isinstance(data, pd.DataFrame):
         summary = _frame_summary(data, max_rows)
     elif isinstance(data, xr.Dataset):
-        summary = _dataset_summary(data, max_rows)
+        summary = _dataset_summary(data, max_rows, stats)
     else:
         summary = {"container": type(data).__name__, "repr": str(data)}
     if warnings:
@@ -0,0 +1,156 @@
+"""MCP progress notifications for long tool calls.
+
+Staging a large query, downloading it and writing an export can each take
+minutes. A client that hears nothing in that time may give up and call
+again, doubling the gateway's work. A tool call's Progress sends MCP
+progress notifications through the FastMCP context of the request instead.
+The context's report_progress does nothing unless the client asked for
+progress with a progress token, and outside a request Progress does
+nothing at all.
+
+A call goes through phases (stage, download, write), each counted in its
+own units: chunks, pieces or seconds waited. MCP requires progress to
+increase with every notification, so each phase continues one unit past
+where the previous one ended, and `total` grows as phases with a known size
+begin. Notifications go out one at a time, in order; one that would not
+advance the progress is dropped, and while one is being sent only the
+latest of those that arrive meanwhile is kept.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator
+
+from fastmcp.server.dependencies import get_context
+
+# Minimum spacing of throttled notifications, and of heartbeats while
+# waiting on a single long request.
+_INTERVAL_S = 1.0
+_HEARTBEAT_S = 5.0
+
+
+class Progress:
+    """Progress notifications for one tool call.
+
+    Created on the event loop; phase() and update() may be called from any
+    thread (dask workers, writer threads) and hand the notification to the
+    loop without waiting. A notification that fails (the client went away)
+    is dropped; it never fails the tool call.
+    """
+
+    def __init__(self, context: Any | None) -> None:
+        self._context = context
+        self._loop = asyncio.get_running_loop() if context is not None else None
+        self._lock = threading.Lock()
+        self._base = 0.0
+        self._done = 0.0
+        self._total: float | None = None
+        self._last = 0.0
+        self._sent = 0.0
+        self._pending: tuple[float, float | None, str] | None = None
+        self._draining = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._context is not None
+
+    def phase(self, message: str, total: float | None = None) -> None:
+        """Begin a phase of `total` units (None if unknown), and say so."""
+        with self._lock:
+            self._base += self._done + 1
+            self._done = 0.0
+            self._total = total
+        self._send(message, force=True)
+
+    def update(
+        self,
+        done: float,
+        message: str,
+        total: float | None = None,
+        force: bool = False,
+    ) -> None:
+        """Units of the current phase done so far (throttled unless force).
+
+        total sets the phase's size once it is known.
+        """
+        with self._lock:
+            self._done = max(self._done, float(done))
+            if total is not None:
+                self._total = total
+        self._send(message, force=force)
+
+    @asynccontextmanager
+    async def waiting(self, message: str) -> AsyncIterator[None]:
+        """A phase spent awaiting one long request: heartbeats of seconds waited."""
+        if not self.enabled:
+            yield
+            return
+        self.phase(message)
+        started = time.monotonic()
+
+        async def beat() -> None:
+            while True:
+                await asyncio.sleep(_HEARTBEAT_S)
+                elapsed = time.monotonic() - started
+                self.update(elapsed, f"{message} ({elapsed:.0f} s)", force=True)
+
+        heartbeat = asyncio.ensure_future(beat())
+        try:
+            yield
+        finally:
+            heartbeat.cancel()
+
+    def _send(self, message: str, force: bool) -> None:
+        if self._context is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last < _INTERVAL_S:
+                return
+            progress = self._base + self._done
+            if progress <= self._sent:
+                return
+            self._last, self._sent = now, progress
+            total = None if self._total is None else self._base + self._total
+            self._pending = (progress, total, message)
+            if self._draining:
+                return
+            self._draining = True
+        self._loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self._drain()))
+
+    async def _drain(self) -> None:
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    self._draining = False
+                    return
+            try:
+                await self._context.report_progress(*pending)
+            except Exception:  # a lost client must not fail the tool call
+                pass
+
+
+_current: ContextVar[Progress | None] = ContextVar("_current_progress", default=None)
+
+
+def current_progress() -> Progress:
+    """The Progress of the running tool call (disabled outside a request).
+
+    One per FastMCP context: the first caller in a tool call creates it, and
+    later callers in the same call (and tasks it starts) share it.
+    """
+    try:
+        context = get_context()
+    except RuntimeError:
+        context = None
+    progress = _current.get()
+    if progress is None or progress._context is not context:
+        progress = Progress(context)
+        _current.set(progress)
+    return progress
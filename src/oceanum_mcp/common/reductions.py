@@ -0,0 +1,174 @@
+"""Bounded-cost value statistics of lazy (dask-backed) datasets.
+
+Agents often stage a large grid only to learn its value ranges. This
+computes min, max, mean and NaN fraction per variable as streaming
+reductions instead: each variable is scanned in batches of chunks along its
+leading dimension, every batch reduced to a few numbers before the next is
+read. The work runs on a thread pool of its own, sized so that the chunks
+in flight stay under a memory cap, and stops at a wall-clock deadline —
+variables (or the tail of a variable) not reached by then are reported as
+such, and the numbers cover only what was scanned.
+
+The deadline is checked between batches, so it can be overrun by at most
+one batch (a few chunks per worker). A chunk that cannot be read (a gateway
+error) ends that variable's scan the same way, with the error reported; the
+other variables are still scanned.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import dask
+import dask.array as da
+import numpy as np
+import xarray as xr
+from oceanum.datamesh.exceptions import (
+    DatameshConnectError,
+    DatameshQueryError,
+    DatameshSessionError,
+)
+
+from oceanum_mcp.common.cancellation import dask_callbacks
+
+# What reading a lazy dataset's chunk may raise: gateway errors from the
+# Datamesh ZarrClient, KeyError for a chunk missing from the store, and I/O.
+CHUNK_READ_ERRORS = (
+    OSError,
+    KeyError,
+    DatameshConnectError,
+    DatameshQueryError,
+    DatameshSessionError,
+)
+
+# Chunks per worker in each batch: enough to keep the pool busy between
+# deadline checks, few enough that a batch is quick.
+_CHUNKS_PER_WORKER = 2
+
+
+def _max_chunk_bytes(var: xr.DataArray) -> int:
+    return math.prod(max(c) for c in var.chunks) * var.dtype.itemsize
+
+
+def _batches(var: xr.DataArray, chunks_per_batch: int) -> list[slice]:
+    """Slices of the leading dimension, each spanning whole chunks."""
+    leading = var.chunks[0]
+    per_slab = math.prod(len(c) for c in var.chunks[1:])
+    slabs = max(1, chunks_per_batch // per_slab)
+    edges = np.cumsum((0, *leading))
+    return [
+        slice(int(edges[i]), int(edges[min(i + slabs, len(leading))]))
+        for i in range(0, len(leading), slabs)
+    ]
+
+
+def _reduce(block: da.Array, pool: ThreadPoolExecutor) -> tuple[Any, ...]:
+    """(min, max, sum, NaN count) of a block; NaNs do not enter min/max/sum.
+
+    Masking with where() rather than nanmin/nanmax keeps all-NaN chunks from
+    raising RuntimeWarnings.
+    """
+    nan = da.isnan(block)
+    return dask.compute(
+        da.where(nan, np.inf, block).min(),
+        da.where(nan, -np.inf, block).max(),
+        da.where(nan, 0, block).sum(dtype="f8"),
+        nan.sum(),
+        scheduler="threads",
+        pool=pool,
+        callbacks=dask_callbacks(),
+    )
+
+
+def _variable_stats(
+    var: xr.DataArray, pool: ThreadPoolExecutor, workers: int, deadline: float
+) -> dict[str, Any]:
+    lo, hi, total, nans, seen = np.inf, -np.inf, 0.0, 0, 0
+    error = None
+    if var.ndim == 0:
+        var = var.expand_dims("_")
+    data = var.data if var.chunks is not None else da.from_array(var.values)
+    batches = (
+        _batches(var, workers * _CHUNKS_PER_WORKER)
+        if var.chunks is not None
+        else [slice(None)]
+    )
+    for batch in batches:
+        if time.monotonic() >= deadline:
+            break
+        block = data[batch]
+        try:
+            b_lo, b_hi, b_sum, b_nans = _reduce(block, pool)
+        except CHUNK_READ_ERRORS as exc:
+            error = f"chunk read failed: {exc}"
+            break
+        lo, hi = min(lo, float(b_lo)), max(hi, float(b_hi))
+        total += float(b_sum)
+        nans += int(b_nans)
+        seen += block.size
+    out: dict[str, Any] = {"scanned_fraction": round(seen / data.size, 4)}
+    if error is not None:
+        out["error"] = error
+    valid = seen - nans
+    if seen:
+        out["nan_fraction"] = round(nans / seen, 4)
+    if valid:
+        out.update(min=lo, max=hi, mean=total / valid)
+    return out
+
+
+def lazy_statistics(
+    ds: xr.Dataset, deadline_s: float, memory_bytes: int
+) -> dict[str, Any]:
+    """Per-variable min/max/mean/NaN fraction of a dataset, bounded in cost.
+
+    Non-numeric variables, variables whose single largest chunk exceeds
+    memory_bytes, and variables whose first chunks could not be read are
+    listed as skipped. `complete` is False when the deadline or a failed
+    chunk read cut the scan short; partially scanned variables carry a
+    scanned_fraction below 1 (and the read error, if that stopped them).
+    """
+    started = time.monotonic()
+    deadline = started + deadline_s
+    numeric, skipped = {}, {}
+    for name, var in ds.data_vars.items():
+        if not (np.issubdtype(var.dtype, np.number) or var.dtype == bool):
+            skipped[str(name)] = "not numeric"
+        elif var.chunks is not None and _max_chunk_bytes(var) > memory_bytes:
+            skipped[str(name)] = "chunks larger than the memory cap"
+        else:
+            numeric[str(name)] = var
+    # Each worker holds about one chunk (plus its masked copies) at a time.
+    largest = max(
+        (_max_chunk_bytes(v) for v in numeric.values() if v.chunks is not None),
+        default=1,
+    )
+    workers = max(1, min(os.cpu_count() or 1, memory_bytes // (3 * largest)))
+
+    variables: dict[str, Any] = {}
+    complete = True
+    with ThreadPoolExecutor(workers, thread_name_prefix="stats") as pool:
+        for name, var in numeric.items():
+            if time.monotonic() >= deadline:
+                complete = False
+                skipped[name] = "deadline reached"
+                continue
+            stats = _variable_stats(var, pool, workers, deadline)
+            if stats["scanned_fraction"] < 1:
+                complete = False
+            if "error" in stats and not stats["scanned_fraction"]:
+                skipped[name] = stats["error"]
+            else:
+                variables[name] = stats
+    out: dict[str, Any] = {
+        "complete": complete,
+        "elapsed_s": round(time.monotonic() - started, 3),
+        "variables": variables,
+    }
+    if skipped:
+        out["skipped"] = skipped
+    return out
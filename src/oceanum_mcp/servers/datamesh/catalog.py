@@ -0,0 +1,378 @@
+"""Local mirror of the Datamesh catalog for search_catalog.
+
+Discovery-heavy sessions search the catalog many times, and it changes
+rarely. Each credential (catalog visibility differs per user) gets a
+CatalogMirror, loaded once from the catalog listing and refreshed in place
+when it is older than the configured interval; searches are answered from
+memory.
+
+Refreshes are incremental: a datasource whose `modified` timestamp is
+unchanged keeps its parsed Datasource, so only new and changed entries are
+re-validated, and entries missing from the listing are dropped. The gateway
+offers no "modified since" filter, so the listing itself is still fetched
+whole.
+
+Spatial and temporal filters go through a SpatioTemporalIndex (an STRtree
+over datasource geometries plus sorted time-coverage arrays), rebuilt only
+when a refresh changed something, so a bbox/time search costs a tree query
+and two binary searches rather than a scan of the catalog.
+
+Text search is ranked: a TextIndex (an inverted index scored with Okapi
+BM25) over each datasource's id, name, description, tags, labels and
+variable names returns the best matches first, so a small limit is usually
+enough. It is updated per datasource as refreshes add, change or drop
+entries, never rebuilt whole.
+"""
+
+from __future__ import annotations
+
+import datetime
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Iterable, NamedTuple
+
+import numpy as np
+import shapely
+import shapely.geometry
+from oceanum.datamesh.datasource import Datasource
+from pydantic import ValidationError
+
+# Sentinels for open-ended time coverage and filters, in int64 nanoseconds.
+_T_MIN = np.iinfo(np.int64).min
+_T_MAX = np.iinfo(np.int64).max
+
+# Okapi BM25 parameters: term-frequency saturation and length normalisation.
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class _Entry(NamedTuple):
+    version: str | None
+    datasource: Datasource
+
+
+def _parse(feature: dict[str, Any]) -> Datasource | None:
+    """Datasource from a catalog GeoJSON feature, or None if it is invalid.
+
+    Invalid features are skipped, as oceanum's Catalog does.
+    """
+    try:
+        return Datasource(
+            id=feature["id"],
+            geom=feature.get("geometry"),
+            **(feature.get("properties") or {}),
+        )
+    except (KeyError, TypeError, ValidationError):
+        return None
+
+
+def _tokens(text: str) -> list[str]:
+    """Lower-cased alphanumeric words, with a trailing plural "s" folded.
+
+    The folding is deliberately crude ("waves" -> "wave", "tides" -> "tide";
+    "analysis" -> "analysi"), but it is applied to queries and documents
+    alike, so a query matches either number.
+    """
+    return [
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in _WORD.findall(text.lower())
+    ]
+
+
+def _document(ds: Datasource) -> list[str]:
+    """Tokens TextIndex scores a datasource on.
+
+    The name is counted twice, so a term in the name outweighs the same term
+    in a long description. Variables contribute their names and their
+    long_name/standard_name attributes, when the listing carries a schema.
+    """
+    fields = [ds.id, ds.name, ds.name, ds.description or ""]
+    fields += [str(v) for v in [*(ds.tags or []), *(ds.labels or [])]]
+    for name, var in (ds.dataschema.data_vars if ds.dataschema else {}).items():
+        attrs = (var or {}).get("attrs") or {}
+        fields += [str(name), str(attrs.get("long_name", ""))]
+        fields.append(str(attrs.get("standard_name", "")).replace("_", " "))
+    return _tokens(" ".join(fields))
+
+
+def _naive_utc(dt: datetime.datetime | datetime.timedelta) -> datetime.datetime:
+    """Comparable form of a catalog timestamp (the gateway's times are UTC).
+
+    A timedelta is a relative filter time ("-P7D"), resolved against now as
+    the gateway does.
+    """
+    if isinstance(dt, datetime.timedelta):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (now + dt).replace(tzinfo=None)
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _ns(dt: datetime.datetime | datetime.timedelta | None, default: int) -> int:
+    if dt is None:
+        return default
+    return int(np.datetime64(_naive_utc(dt), "ns").astype(np.int64))
+
+
+class SpatioTemporalIndex:
+    """Spatial and time-coverage index over an ordered list of datasources.
+
+    Positions are indices into the list it was built from. Space: an STRtree
+    over the datasource geometries, queried with an exact intersects
+    predicate. Time: datasources sorted by coverage start, with their
+    coverage ends alongside, so an overlap query is a binary search on the
+    starts plus a vectorised comparison of the ends. Datasources without a
+    geometry or a tstart are not indexed on that axis, so never match its
+    filter.
+    """
+
+    def __init__(self, datasources: list[Datasource]) -> None:
+        located = [i for i, ds in enumerate(datasources) if ds.geom is not None]
+        self._geom_pos = np.array(located, dtype=np.intp)
+        self._tree = shapely.STRtree([datasources[i].geom for i in located])
+
+        timed = [i for i, ds in enumerate(datasources) if ds.tstart is not None]
+        starts = np.array(
+            [_ns(datasources[i].tstart, _T_MIN) for i in timed], dtype=np.int64
+        )
+        ends = np.array(
+            [_ns(datasources[i].tend, _T_MAX) for i in timed], dtype=np.int64
+        )
+        order = np.argsort(starts, kind="stable")
+        self._time_pos = np.array(timed, dtype=np.intp)[order]
+        self._starts = starts[order]
+        self._ends = ends[order]
+
+    def query(
+        self,
+        *,
+        start: datetime.datetime | datetime.timedelta | None = None,
+        end: datetime.datetime | datetime.timedelta | None = None,
+        bbox: list[float] | None = None,
+    ) -> np.ndarray | None:
+        """Sorted positions matching the filters; None if none were given.
+
+        The time coverage must overlap [start, end] (a missing tend means
+        ongoing); the geometry must intersect bbox.
+        """
+        matches: np.ndarray | None = None
+        if start is not None or end is not None:
+            # Coverage starts at or before `end` ...
+            upto = np.searchsorted(self._starts, _ns(end, _T_MAX), side="right")
+            # ... and ends at or after `start`.
+            overlap = self._ends[:upto] >= _ns(start, _T_MIN)
+            matches = np.sort(self._time_pos[:upto][overlap])
+        if bbox is not None:
+            hits = self._tree.query(shapely.geometry.box(*bbox), predicate="intersects")
+            spatial = np.sort(self._geom_pos[hits])
+            matches = (
+                spatial
+                if matches is None
+                else np.intersect1d(matches, spatial, assume_unique=True)
+            )
+        return matches
+
+
+class TextIndex:
+    """Inverted index over tokenised documents, scored with Okapi BM25.
+
+    Documents are added, replaced and removed one at a time, so keeping the
+    index in step with the catalog costs work proportional to what changed.
+    Updates come from refreshes on worker threads while searches run on the
+    event loop; a lock serialises them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # term -> {document id -> term frequency}
+        self._postings: dict[str, dict[str, int]] = {}
+        # document id -> its distinct terms and its length in tokens
+        self._terms: dict[str, tuple[frozenset[str], int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, doc_id: str, tokens: list[str]) -> None:
+        """Index a document, replacing any earlier version of it."""
+        counts = Counter(tokens)
+        with self._lock:
+            self._discard(doc_id)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._terms[doc_id] = (frozenset(counts), len(tokens))
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._discard(doc_id)
+
+    def _discard(self, doc_id: str) -> None:
+        old = self._terms.pop(doc_id, None)
+        if old is None:
+            return
+        terms, length = old
+        for term in terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+        self._total_length -= length
+
+    def scores(self, text: str, among: Iterable[str] | None = None) -> dict[str, float]:
+        """BM25 score of every document containing at least one query term.
+
+        among restricts scoring to those document ids; when it is shorter
+        than a term's posting list, the ids are looked up instead of the
+        posting list being walked.
+        """
+        scores: dict[str, float] = {}
+        allowed = None if among is None else set(among)
+        with self._lock:
+            n = len(self._terms)
+            if not n:
+                return scores
+            # BM25's tf / (tf + k1 * (1 - b + b * length / avg_length)), with
+            # the per-query constants hoisted out of the loop.
+            base = _BM25_K1 * (1 - _BM25_B)
+            per_token = _BM25_K1 * _BM25_B / (self._total_length / n or 1.0)
+            docs = self._terms
+            for term in dict.fromkeys(_tokens(text)):
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                scale = idf * (_BM25_K1 + 1)
+                if allowed is None:
+                    hits = posting.items()
+                elif len(allowed) < df:
+                    hits = ((d, posting[d]) for d in allowed if d in posting)
+                else:
+                    hits = ((d, tf) for d, tf in posting.items() if d in allowed)
+                for doc_id, tf in hits:
+                    weight = tf / (tf + base + per_token * docs[doc_id][1])
+                    scores[doc_id] = scores.get(doc_id, 0.0) + scale * weight
+        return scores
+
+
+class _Snapshot(NamedTuple):
+    # id -> entry, in catalog listing order.
+    entries: dict[str, _Entry]
+    # The same entries as a list, which index positions refer to.
+    ordered: list[_Entry]
+    # id -> position in ordered.
+    positions: dict[str, int]
+    index: SpatioTemporalIndex
+
+
+class CatalogMirror:
+    """One credential's in-memory copy of the Datamesh catalog.
+
+    apply() builds a new snapshot and swaps it in with one assignment, so
+    searches on the event loop never see a half-applied refresh running on
+    a worker thread. The text index is updated in place just before the
+    swap; search() ignores text hits for ids the snapshot does not hold.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = _Snapshot({}, [], {}, SpatioTemporalIndex([]))
+        self._text = TextIndex()
+        self._refreshed_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ordered)
+
+    def age(self) -> float:
+        """Seconds since the last refresh (infinite before the first)."""
+        if self._refreshed_at is None:
+            return float("inf")
+        return time.monotonic() - self._refreshed_at
+
+    def expire(self) -> None:
+        """Force a refresh on next use (e.g. after a metadata update)."""
+        self._refreshed_at = None
+
+    def get(self, datasource_id: str) -> Datasource | None:
+        """The listed datasource with this id, if the mirror holds it."""
+        entry = self._snapshot.entries.get(datasource_id)
+        return None if entry is None else entry.datasource
+
+    def apply(self, features: list[dict[str, Any]]) -> dict[str, int]:
+        """Bring the mirror in line with a full catalog listing.
+
+        Returns counts of added, updated, removed and unchanged datasources.
+        """
+        old = self._snapshot.entries
+        entries: dict[str, _Entry] = {}
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        for feature in features:
+            ds_id = feature.get("id")
+            version = (feature.get("properties") or {}).get("modified")
+            previous = old.get(ds_id)
+            if previous is not None and version and previous.version == version:
+                entries[ds_id] = previous
+                counts["unchanged"] += 1
+                continue
+            ds = _parse(feature)
+            if ds is None:
+                continue
+            entries[ds.id] = _Entry(version, ds)
+            self._text.add(ds.id, _document(ds))
+            counts["updated" if previous is not None else "added"] += 1
+        for ds_id in old:
+            if ds_id not in entries:
+                self._text.remove(ds_id)
+                counts["removed"] += 1
+        if counts["unchanged"] != len(entries) or list(entries) != list(old):
+            ordered = list(entries.values())
+            positions = {ds_id: i for i, ds_id in enumerate(entries)}
+            index = SpatioTemporalIndex([entry.datasource for entry in ordered])
+            self._snapshot = _Snapshot(entries, ordered, positions, index)
+        self._refreshed_at = time.monotonic()
+        return counts
+
+    def search(
+        self,
+        *,
+        text: str | None = None,
+        start: datetime.datetime | datetime.timedelta | None = None,
+        end: datetime.datetime | datetime.timedelta | None = None,
+        bbox: list[float] | None = None,
+        limit: int | None = None,
+    ) -> list[Datasource]:
+        """Datasources matching every given filter.
+
+        text: datasources matching any of its words (case-insensitive) in
+        the id, name, description, tags, labels or variables, best BM25
+        score first, ties in catalog order. start/end: the datasource's time
+        coverage must overlap the range (a timedelta is relative to now);
+        datasources with no time coverage never match, and a missing tend
+        means ongoing. bbox: the datasource geometry must intersect it.
+        Without text, results are in catalog order.
+        """
+        _, ordered, positions, index = self._snapshot
+        allowed = index.query(start=start, end=end, bbox=bbox)
+
+        if not (text and _tokens(text)):
+            if allowed is None:
+                return [entry.datasource for entry in ordered[:limit]]
+            return [ordered[i].datasource for i in allowed[:limit]]
+
+        among = None
+        if allowed is not None:
+            among = [ordered[i].datasource.id for i in allowed]
+        ranked = [
+            (-score, positions[ds_id])
+            for ds_id, score in self._text.scores(text, among).items()
+            if ds_id in positions
+        ]
+        best = sorted(ranked) if limit is None else heapq.nsmallest(limit, ranked)
+        return [ordered[pos].datasource for _, pos in best]
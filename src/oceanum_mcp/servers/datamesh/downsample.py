@@ -0,0 +1,199 @@
+"""Downsampling plans that fit a gridded query into a byte budget.
+
+query_data(fit_to_budget=True) uses this instead of leaving the agent to
+guess a time_resolution or geofilter_resolution over several stage round
+trips. The staged size gives the reduction needed; the datasource's schema
+(dimension sizes, time coverage, bounds) gives the native time step and
+grid spacing each lever starts from. Time is coarsened first, to the
+finest step on a ladder of pandas frequencies that achieves the reduction;
+whatever is still needed comes from a coarser spatial resolution. Neither
+lever goes below a floor of time steps or grid cells, so a plan never
+collapses an axis; queries that would need that get no plan.
+
+Estimates assume uniform sampling, so the caller re-stages the planned
+query to confirm the size.
+"""
+
+from __future__ import annotations
+
+import datetime
+import math
+from typing import Any, NamedTuple
+
+import pandas as pd
+from oceanum.datamesh.datasource import Datasource
+from oceanum.datamesh.query import Query
+
+# Coarsening never leaves fewer time steps, or grid cells along the shorter
+# spatial axis, than these.
+_MIN_TIME_STEPS = 12
+_MIN_CELLS = 8
+
+# Candidate time resolutions, finest first (pandas frequency strings).
+_TIME_STEPS = (
+    "15min",
+    "30min",
+    "1h",
+    "3h",
+    "6h",
+    "12h",
+    "1D",
+    "2D",
+    "7D",
+    "14D",
+    "1MS",
+    "3MS",
+    "1YS",
+)
+
+
+class Plan(NamedTuple):
+    query: Query
+    # Tool parameters the plan set, as query_data would take them.
+    changes: dict[str, Any]
+
+
+def _freq_seconds(freq: str) -> float:
+    """Length of one step of a pandas frequency, in seconds.
+
+    Calendar frequencies (months, years) have no fixed length; one step from
+    a fixed origin is close enough for sizing.
+    """
+    origin = pd.Timestamp("2001-01-01")
+    return ((origin + pd.tseries.frequencies.to_offset(freq)) - origin).total_seconds()
+
+
+_LADDER = [(freq, _freq_seconds(freq)) for freq in _TIME_STEPS]
+
+
+def resolve_time(value: Any) -> pd.Timestamp | None:
+    """Naive-UTC Timestamp of a filter or coverage time (None if open)."""
+    if value is None:
+        return None
+    if isinstance(value, (datetime.timedelta, pd.Timedelta)):
+        # Relative times resolve against now, as the gateway does.
+        return pd.Timestamp.now(tz="UTC").tz_localize(None) + value
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo else ts
+
+
+def _round_up(value: float) -> float:
+    """value rounded up to two significant figures."""
+    scale = 10 ** (math.floor(math.log10(value)) - 1)
+    return math.ceil(value / scale - 1e-9) * scale
+
+
+def _axes(ds: Datasource) -> tuple[dict[str, str], dict[str, int]]:
+    """(coordinate key -> dimension name, dimension sizes) of a datasource."""
+    coords = {getattr(k, "value", k): v for k, v in (ds.coordinates or {}).items()}
+    dims = dict(ds.dataschema.dims) if ds.dataschema else {}
+    return coords, dims
+
+
+def _plan_time(
+    ds: Datasource, query: Query, echo: dict[str, Any], factor: float
+) -> tuple[float, dict[str, Any]]:
+    """(reduction achieved, parameter changes) from a coarser time step.
+
+    Bounds are read from the parsed query: the echo holds relative times as
+    ISO 8601 periods ("-P30D"), which do not parse as timestamps.
+    """
+    coords, dims = _axes(ds)
+    steps = dims.get(coords.get("t"), 0)
+    timefilter = echo.get("timefilter")
+    if steps < 2 or ds.tstart is None:
+        return 1.0, {}
+    if timefilter is not None and timefilter.get("type") != "range":
+        return 1.0, {}
+
+    tstart, tend = resolve_time(ds.tstart), resolve_time(ds.tend)
+    if tend is None:
+        tend = resolve_time(datetime.timedelta(0))
+    native = (tend - tstart).total_seconds() / (steps - 1)
+    if native <= 0:
+        return 1.0, {}
+    times = query.timefilter.times if query.timefilter else [None, None]
+    start, end = resolve_time(times[0]), resolve_time(times[1])
+    start = tstart if start is None else max(start, tstart)
+    end = tend if end is None else min(end, tend)
+    span = (end - start).total_seconds()
+
+    current = native
+    resolution = (timefilter or {}).get("resolution") or "native"
+    if resolution != "native":
+        current = max(current, _freq_seconds(resolution))
+    if span / current + 1 <= _MIN_TIME_STEPS:
+        return 1.0, {}
+
+    coarsest = span / (_MIN_TIME_STEPS - 1)
+    allowed = [(f, s) for f, s in _LADDER if current < s <= coarsest]
+    if not allowed:
+        return 1.0, {}
+    freq, seconds = next(
+        ((f, s) for f, s in allowed if s >= current * factor), allowed[-1]
+    )
+
+    changes: dict[str, Any] = {"time_resolution": freq}
+    if timefilter is None:
+        changes["time_start"] = tstart.isoformat()
+        echo["timefilter"] = {"type": "range", "times": [changes["time_start"], None]}
+    echo["timefilter"]["resolution"] = freq
+    if resolution == "native":
+        # The resample method was never chosen; averaging suits downsampling.
+        echo["timefilter"]["resample"] = "mean"
+        changes["time_resample"] = "mean"
+    return seconds / current, changes
+
+
+def _plan_space(
+    ds: Datasource, echo: dict[str, Any], factor: float
+) -> tuple[float, dict[str, Any]]:
+    """(reduction achieved, parameter changes) from a coarser grid."""
+    coords, dims = _axes(ds)
+    nx, ny = dims.get(coords.get("x"), 0), dims.get(coords.get("y"), 0)
+    geofilter = echo.get("geofilter")
+    # Bounds are WGS84; a resolution in another CRS's units is not comparable.
+    if nx < 2 or ny < 2 or ds.bounds is None or echo.get("crs") is not None:
+        return 1.0, {}
+    if geofilter is not None and geofilter.get("type") != "bbox":
+        return 1.0, {}
+
+    xmin, ymin, xmax, ymax = ds.bounds
+    native = max((xmax - xmin) / (nx - 1), (ymax - ymin) / (ny - 1))
+    if native <= 0:
+        return 1.0, {}
+    bbox = geofilter["geom"] if geofilter else [xmin, ymin, xmax, ymax]
+    width = min(bbox[2], xmax) - max(bbox[0], xmin)
+    height = min(bbox[3], ymax) - max(bbox[1], ymin)
+    current = max(native, (geofilter or {}).get("resolution") or 0.0)
+    if min(width, height) / current + 1 <= _MIN_CELLS:
+        return 1.0, {}
+
+    coarsest = min(width, height) / (_MIN_CELLS - 1)
+    resolution = min(_round_up(current * math.sqrt(factor)), coarsest)
+    if resolution <= current:
+        return 1.0, {}
+
+    changes: dict[str, Any] = {"geofilter_resolution": resolution}
+    if geofilter is None:
+        changes["bbox"] = [xmin, ymin, xmax, ymax]
+        echo["geofilter"] = {"type": "bbox", "geom": changes["bbox"]}
+    echo["geofilter"]["resolution"] = resolution
+    return (resolution / current) ** 2, changes
+
+
+def plan_downsampling(ds: Datasource, query: Query, factor: float) -> Plan | None:
+    """A downsampled query expected to shrink the result by `factor`.
+
+    Returns None when the levers this datasource offers cannot reach the
+    reduction without dropping below the step and cell floors.
+    """
+    echo = query.model_dump(mode="json", exclude_none=True, warnings=False)
+    achieved, changes = _plan_time(ds, query, echo, factor)
+    if achieved < factor:
+        space_factor, space_changes = _plan_space(ds, echo, factor / achieved)
+        changes.update(space_changes)
+        achieved *= space_factor
+    if not changes or achieved < factor:
+        return None
+    return Plan(Query(**echo), changes)
@@ -13,42 +13,118 @@ Error conventions:
 
 from __future__ import annotations
 
+import asyncio
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import math
+import shutil
+import tempfile
 import threading
+import time
 import warnings as _warnings
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, Iterator, Literal
-
+from typing import Any, AsyncIterator, Callable, Iterator, Literal
+from urllib.parse import parse_qs, urlsplit
+
+import anyio
+import httpx
+import pandas as pd
+import requests
+import shapely.geometry
+import xarray as xr
 from fastmcp import FastMCP
 from fastmcp.exceptions import ToolError
 
 from oceanum.datamesh import Connector
+from oceanum.datamesh.catalog import Catalog
+from oceanum.datamesh.connection import DASK_QUERY_SIZE
+from oceanum.datamesh.datasource import Datasource
 from oceanum.datamesh.exceptions import (
     DatameshConnectError,
     DatameshQueryError,
     DatameshSessionError,
 )
-from oceanum.datamesh.query import Container, CoordSelector, GeoFilter, Query, Stage
+from oceanum.datamesh.query import (
+    Container,
+    CoordSelector,
+    GeoFilter,
+    Query,
+    Stage,
+    TimeFilter,
+)
 from oceanum.datamesh.session import Session
 from oceanum.datamesh.utils import (
     DATAMESH_CONNECT_TIMEOUT,
+    DATAMESH_DOWNLOAD_TIMEOUT,
+    DATAMESH_READ_TIMEOUT,
     DATAMESH_STAGE_READ_TIMEOUT,
 )
-
-from oceanum_mcp.common.client import get_datamesh_connector
+from oceanum.datamesh.zarr import ZarrClient
+
+from oceanum_mcp.common.admission import AdmissionControl, Busy
+from oceanum_mcp.common.cache import ByteLRUCache, SingleFlight, TTLCache
+from oceanum_mcp.common.cancellation import (
+    cancellable,
+    raise_if_cancelled,
+    wait,
+)
+from oceanum_mcp.common.client import (
+    credential_key,
+    get_datamesh_connector,
+    get_gateway_http,
+)
 from oceanum_mcp.common.config import (
+    admission_queue,
+    admission_timeout_s,
+    cache_dir,
+    cache_dir_max_bytes,
+    catalog_refresh_s,
+    datamesh_service,
+    export_chunk_bytes,
     export_dir,
+    export_window_bytes,
+    export_workers,
     is_network_transport,
     is_read_only,
     max_inline_bytes,
+    max_inline_rows,
+    max_concurrent_calls,
+    page_store_bytes,
+    result_cache_bytes,
+    single_stage,
+    stage_concurrency,
+    tenant_concurrent_calls,
 )
+from oceanum_mcp.common.diskcache import DiskResultCache
 from oceanum_mcp.common.formatting import (
     export_clause,
     format_datasource,
     human_bytes,
+    page_records,
+    records_frame,
     summarize_data,
     to_json,
 )
+from oceanum_mcp.common.progress import Progress, current_progress
+from oceanum_mcp.servers.datamesh.catalog import CatalogMirror
+from oceanum_mcp.servers.datamesh.downsample import plan_downsampling
+from oceanum_mcp.servers.datamesh.shards import shard_queries
+from oceanum_mcp.servers.datamesh.writers import (
+    ChunkProgress,
+    ExportManifest,
+    assemble_parts,
+    is_zarr_store,
+    manifest_path,
+    parts_path,
+    write_part,
+    write_netcdf,
+    write_zarr,
+)
 
 # Everything the oceanum library can raise on a gateway interaction.
 # Session.acquire wraps all its failures (auth, network) in DatameshSessionError.
@@ -57,7 +133,8 @@ _DATAMESH_ERRORS = (DatameshConnectError, DatameshQueryError, DatameshSessionErr
 # Server caps tabular (dataframe/geodataframe) query results at this many rows.
 DATAMESH_ROW_CAP = 2_000_000
 
-# Ceiling on bytes loaded into memory for a tabular export (local/stdio path).
+# Ceiling on bytes loaded into memory for a tabular export (local/stdio path)
+# that cannot be streamed in sub-queries (see OCEANUM_MCP_EXPORT_CHUNK_BYTES).
 MAX_EXPORT_FRAME_BYTES = 2_000_000_000
 
 # Above this staged size the hosted download link is flagged as a large
@@ -68,6 +145,52 @@ LARGE_DOWNLOAD_BYTES = 2_000_000_000
 # The tool's format names mapped to the gateway's `&f=` download tokens.
 _GATEWAY_FORMAT = {"netcdf": "nc", "parquet": "parquet", "csv": "csv"}
 
+# Transfer encodings the gateway's /oceanql/ endpoint serves, per container
+# (the same Accept headers Connector._query sends).
+_TRANSFER_FORMAT = {
+    Container.Dataset: "application/x-netcdf4",
+    Container.DataFrame: "application/parquet",
+    Container.GeoDataFrame: "application/parquet",
+}
+
+# Stages are reused across stage_query -> query_data/export_query calls with
+# identical parameters (the documented workflow). The TTL stays well inside
+# the gateway's own retention of staged queries, so a cached qhash is still
+# fetchable when query_data downloads from it.
+_STAGE_CACHE_MAX = 256
+_STAGE_CACHE_TTL_S = 300.0
+
+# Hosted export_query reuses a download stage (its signed URL) for the same
+# credential and query while the URL stays valid, less a margin so a reused
+# URL never lapses before the caller fetches it. The validity comes from
+# the gateway's expiry (a response field, or the URL's signature
+# parameters); a response stating none is assumed valid for the default.
+_DOWNLOAD_CACHE_MAX = 256
+_DOWNLOAD_URL_DEFAULT_VALIDITY_S = 600.0
+_DOWNLOAD_URL_MARGIN_S = 120.0
+
+# Per-credential cache of full datasource metadata for get_datasource_info.
+# An entry younger than the fresh window is served as is; an older one is
+# revalidated against the `modified` timestamp in the caller's catalog
+# mirror when that mirror is itself fresh, and refetched otherwise. The TTL
+# caps how long revalidation can keep an entry alive.
+_DATASOURCE_CACHE_MAX = 512
+_DATASOURCE_CACHE_TTL_S = 3600.0
+_DATASOURCE_FRESH_S = 60.0
+
+# query_data cursors (fetch_page). A truncated result's table is kept for
+# the cursor TTL, within OCEANUM_MCP_PAGE_STORE_BYTES; the cursor's query is
+# remembered longer, so a cursor whose table was evicted re-downloads once.
+_CURSOR_TTL_S = 900.0
+_CURSOR_QUERIES_MAX = 1024
+_CURSOR_QUERY_TTL_S = 3600.0
+
+# Per-credential catalog mirrors (see servers/datamesh/catalog.py). A mirror
+# unused by searches for an hour is dropped; while in use, refreshes are
+# incremental.
+_CATALOG_MIRRORS_MAX = 32
+_CATALOG_MIRROR_TTL_S = 3600.0
+
 READ_TOOL = {"readOnlyHint": True, "openWorldHint": True}
 
 # Instructions are transport-neutral: they describe the stage -> narrow
@@ -95,7 +218,53 @@ mcp = FastMCP(
 # Helpers
 # ---------------------------------------------------------------------------
 
-_WARNINGS_LOCK = threading.Lock()
+# Warnings raised during a tool call are routed to that call's collector.
+# catch_warnings() would be simpler but swaps process-global state, which
+# forced every capture (and so every download) behind one lock. Instead a
+# single showwarning hook dispatches on a context variable: FastMCP runs each
+# sync tool in a worker thread with its own copy of the context, so
+# concurrent calls capture independently.
+_warning_sink: ContextVar[list[str] | None] = ContextVar("_warning_sink", default=None)
+_HOOK_LOCK = threading.Lock()
+_next_showwarning: Callable[..., None] = _warnings.showwarning
+
+
+def _route_warning(
+    message: Warning | str,
+    category: type[Warning],
+    filename: str,
+    lineno: int,
+    file: Any = None,
+    line: str | None = None,
+) -> None:
+    sink = _warning_sink.get()
+    if sink is None:
+        # Outside a capture (or on a thread without the tool's context, e.g.
+        # a dask worker): behave as if the hook were not there.
+        _next_showwarning(message, category, filename, lineno, file, line)
+    else:
+        sink.append(str(message))
+
+
+def _install_warning_hook() -> None:
+    """Install _route_warning as warnings.showwarning, idempotently.
+
+    Called at import and again on each capture, because a catch_warnings()
+    block elsewhere in the process (test runners use them per test) restores
+    whatever showwarning it saw on entry.
+    """
+    global _next_showwarning
+    with _HOOK_LOCK:
+        if _warnings.showwarning is not _route_warning:
+            _next_showwarning = _warnings.showwarning
+            _warnings.showwarning = _route_warning
+
+
+# Never deduplicate the library's (or this server's re-emitted) degradation
+# warnings: the default "once per location" action would drop the row-cap
+# warning from every query after the first.
+_warnings.filterwarnings("always", module="oceanum")
+_install_warning_hook()
 
 
 @contextmanager
@@ -103,58 +272,438 @@ def _captured_warnings(collected: list[str]) -> Iterator[None]:
     """Capture Python warnings raised by the oceanum library.
 
     The library signals silent degradation (row caps, lazy dask fallback)
-    via warnings.warn, which would otherwise be lost to stderr.
-    catch_warnings mutates process-global state and FastMCP runs sync tools
-    in worker threads, so captures are serialized with a lock.
+    via warnings.warn, which would otherwise be lost to stderr. Captures are
+    context-local (see _route_warning), so concurrent downloads run in
+    parallel and each response gets only its own warnings.
     """
-    with _WARNINGS_LOCK:
-        with _warnings.catch_warnings(record=True) as caught:
-            _warnings.simplefilter("always")
-            yield
-        collected.extend(str(w.message) for w in caught)
-
+    _install_warning_hook()
+    token = _warning_sink.set(collected)
+    try:
+        yield
+    finally:
+        _warning_sink.reset(token)
 
-def _stage(conn: Connector, query: Query) -> Stage | None:
-    """Stage a query on the Datamesh gateway without downloading data.
 
-    Uses the connector's private staging request — oceanum<2 has no public
-    staging API; the dependency pin in pyproject.toml guards this. Once
-    oceanum grows a public Connector.stage() (and a way to execute a query
-    from an existing stage), switch to it: that also removes the second
-    staging round-trip conn.query() currently performs internally.
-    """
-    session = Session.acquire(conn)
+def _gateway_auth(conn: Connector) -> tuple[str, dict[str, str]]:
+    """The connector's gateway URL and auth headers, for direct async calls."""
     try:
-        return conn._stage_request(query, session)
+        return conn._gateway, dict(conn._auth_headers)
     except AttributeError as exc:  # private API drift within the 1.x pin
         raise ToolError(
-            "The installed oceanum version no longer exposes the staging "
+            "The installed oceanum version no longer exposes the connection "
             "internals this server relies on; install a version matching "
             "the pyproject.toml pin."
         ) from exc
+
+
+async def _gateway_request(
+    method: str,
+    url: str,
+    *,
+    read_timeout: float | None = DATAMESH_READ_TIMEOUT,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send one request on the shared async gateway client.
+
+    Transport failures surface as DatameshConnectError, like the library's
+    own requests, so callers handle a single family of gateway errors.
+    """
+    try:
+        return await get_gateway_http().request(
+            method,
+            url,
+            timeout=httpx.Timeout(read_timeout, connect=DATAMESH_CONNECT_TIMEOUT),
+            **kwargs,
+        )
+    except httpx.HTTPError as exc:
+        raise DatameshConnectError(f"Datamesh gateway request failed: {exc}") from exc
+
+
+@asynccontextmanager
+async def _gateway_session(conn: Connector) -> AsyncIterator[Session]:
+    """Acquire a Datamesh session asynchronously (mirrors Session.acquire).
+
+    Closing is best effort: the gateway expires abandoned sessions itself, so
+    a failed DELETE must not turn a successful call into an error.
+    """
+    gateway, auth = _gateway_auth(conn)
+    params = {**getattr(conn, "_session_params", {}), "allow_multiwrite": False}
+    try:
+        resp = await _gateway_request(
+            "GET",
+            f"{gateway}/session/",
+            # Stringified the way requests encodes them (Python reprs).
+            params={k: str(v) for k, v in params.items()},
+            headers={**auth, "Cache-Control": "no-store"},
+        )
+        if resp.status_code != 200:
+            raise DatameshConnectError(
+                "Failed to create session with error: " + resp.text
+            )
+        session = Session(**resp.json())
+    except (DatameshConnectError, ValueError) as exc:
+        raise DatameshSessionError(
+            f"Error when acquiring datamesh session {exc}"
+        ) from exc
+    try:
+        yield session
     finally:
-        session.close()
+        try:
+            await _gateway_request(
+                "DELETE",
+                f"{gateway}/session/{session.id}",
+                params={"finalise_write": "False"},
+                headers={**auth, **session.header},
+            )
+        except DatameshConnectError:
+            pass
+
+
+async def _stage(conn: Connector, query: Query) -> Stage | None:
+    """Stage a query on the Datamesh gateway without downloading data.
+
+    Speaks the gateway's staging protocol directly on the shared async
+    client (mirroring the private Connector._stage_request — oceanum<2 has no
+    public staging API, nor an async one), so a slow staging holds a
+    coroutine rather than a worker thread for up to
+    DATAMESH_STAGE_READ_TIMEOUT. Once oceanum grows a public async stage (and
+    a way to execute a query from an existing stage), switch to it and
+    retire _fetch_staged.
+    """
+    gateway, auth = _gateway_auth(conn)
+    async with _gateway_session(conn) as session:
+        resp = await _gateway_request(
+            "POST",
+            f"{gateway}/oceanql/stage/",
+            headers={**auth, **session.header},
+            content=query.model_dump_json(warnings=False),
+            read_timeout=DATAMESH_STAGE_READ_TIMEOUT,
+        )
+    _raise_for_gateway_error(resp)
+    if resp.status_code == 204:
+        return None
+    return Stage(**resp.json())
 
 
-def _download_stage(conn: Connector, query: Query) -> dict[str, Any] | None:
+async def _download_stage(conn: Connector, query: Query) -> dict[str, Any] | None:
     """Stage a query for download, returning the gateway's response dict.
 
     POSTs to the gateway's /oceanql/download/ endpoint, which the oceanum<2
     library does not wrap. The response carries a self-authenticating signed
     `url` (append `&f=<format>` to pick a format), plus `formats`, `size`, and
-    `container`. Mirrors Connector._stage_request's auth/error handling.
+    `container`. Same session handling and errors as _stage.
     Returns None when no data matches (HTTP 204).
     """
+    gateway, auth = _gateway_auth(conn)
+    async with _gateway_session(conn) as session:
+        resp = await _gateway_request(
+            "POST",
+            f"{gateway}/oceanql/download/",
+            headers={**auth, **session.header},
+            content=query.model_dump_json(warnings=False),
+            # Preparing a download stage for a large export can far exceed
+            # the default read timeout, like staging itself.
+            read_timeout=DATAMESH_STAGE_READ_TIMEOUT,
+        )
+    _raise_for_gateway_error(resp)
+    if resp.status_code == 204:
+        return None
+    return resp.json()
+
+
+def _expiry_seconds(value: Any, now: float) -> float | None:
+    """Seconds until an expiry given as epoch seconds or an ISO timestamp."""
+    try:
+        return float(value) - now
+    except (TypeError, ValueError):
+        pass
+    try:
+        expires = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=datetime.timezone.utc)
+    return expires.timestamp() - now
+
+
+def _download_validity_s(stage: dict[str, Any]) -> float:
+    """Seconds a download stage's signed URL has left.
+
+    Read from the response (expires_in seconds, or an expiry field), else
+    from the URL's signature parameters (Expires / exp as epoch seconds, or
+    a signing date plus X-Amz-Expires / X-Goog-Expires); the default window
+    if none.
+    """
+    now = time.time()
+    try:
+        return float(stage["expires_in"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    for field in ("expires_at", "expires", "expiry"):
+        if stage.get(field) is not None:
+            left = _expiry_seconds(stage[field], now)
+            if left is not None:
+                return left
+    params = {
+        k.lower(): v[0] for k, v in parse_qs(urlsplit(stage["url"]).query).items()
+    }
+    for field in ("expires", "exp"):
+        if field in params:
+            left = _expiry_seconds(params[field], now)
+            if left is not None:
+                return left
+    for vendor in ("amz", "goog"):
+        signed = params.get(f"x-{vendor}-date")
+        lifetime = params.get(f"x-{vendor}-expires")
+        if signed is None or lifetime is None:
+            continue
+        try:
+            start = datetime.datetime.strptime(signed, "%Y%m%dT%H%M%SZ").replace(
+                tzinfo=datetime.timezone.utc
+            )
+            return start.timestamp() + float(lifetime) - now
+        except ValueError:
+            continue
+    return _DOWNLOAD_URL_DEFAULT_VALIDITY_S
+
+
+async def _metadata_request(
+    conn: Connector, datasource_id: str = "", params: dict[str, Any] | None = None
+) -> Any:
+    """GET datasource metadata (one id, or the catalog) as parsed JSON.
+
+    Mirrors Connector._metadata_request: metadata lives on the service host
+    (which the connector was built for), not the gateway, and every failure
+    is a DatameshConnectError.
+    """
+    _, auth = _gateway_auth(conn)
+    resp = await _gateway_request(
+        "GET",
+        f"{datamesh_service()}/datasource/{datasource_id}",
+        params=params,
+        headers=auth,
+    )
+    if resp.status_code == 404:
+        raise DatameshConnectError(f"Datasource {datasource_id} not found")
+    if resp.status_code == 401:
+        raise DatameshConnectError(f"Datasource {datasource_id} not Authorized")
+    if resp.status_code >= 400:
+        try:
+            detail = resp.json().get("detail")
+        except ValueError:
+            detail = None
+        raise DatameshConnectError(detail or "Datamesh server error: " + resp.text)
+    return resp.json()
+
+
+async def _get_datasource(conn: Connector, datasource_id: str) -> Datasource:
+    """Fetch one datasource's metadata (mirrors Connector.get_datasource)."""
+    meta = await _metadata_request(conn, datasource_id)
+    try:
+        return Datasource(id=datasource_id, geom=meta["geometry"], **meta["properties"])
+    except (KeyError, TypeError, ValueError) as exc:
+        # pydantic's ValidationError is a ValueError.
+        raise DatameshConnectError(
+            f"Metadata for datasource {datasource_id} does not match the "
+            f"oceanum Datasource model: {exc}"
+        ) from exc
+
+
+async def _run_sync(
+    fn: Callable[..., Any],
+    *args: Any,
+    captured: list[str] | None = None,
+    **kwargs: Any,
+) -> Any:
+    """Run blocking work on a worker thread, optionally capturing warnings.
+
+    Reserved for what only the synchronous oceanum/xarray stack can do —
+    result downloads, zarr/netCDF/parquet decoding, file writes, summarizing
+    decoded data — so the event loop never blocks on it. Warnings are
+    collected into `captured` when given.
+
+    If the calling task is cancelled (the client cancelled the tool call),
+    the thread is told to stop (common/cancellation.py) and awaited before
+    the cancellation propagates, so callers clean up after a thread that has
+    let go of its files and connections.
+    """
+    cancel = threading.Event()
+
+    def call() -> Any:
+        with cancellable(cancel):
+            if captured is None:
+                return fn(*args, **kwargs)
+            with _captured_warnings(captured):
+                return fn(*args, **kwargs)
+
+    work = asyncio.ensure_future(anyio.to_thread.run_sync(call))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        cancel.set()
+        with anyio.CancelScope(shield=True):
+            await asyncio.wait((work,))
+        if not work.cancelled():
+            work.exception()  # Cancelled, or whatever stopped it first
+        raise
+
+
+async def _connector() -> Connector:
+    """The calling user's Connector, built off the event loop.
+
+    Building one (first call per credential) does a blocking gateway round
+    trip; cache hits return immediately from the worker thread.
+    """
+    return await anyio.to_thread.run_sync(get_datamesh_connector)
+
+
+def _raise_for_gateway_error(resp: Any) -> None:
+    """Raise the oceanum exception matching a failed gateway response.
+
+    A "detail" message means the gateway rejected the query itself
+    (DatameshQueryError); anything else is a server-side failure.
+    """
+    if resp.status_code < 400:
+        return
+    try:
+        detail = resp.json().get("detail")
+    except ValueError:
+        detail = None
+    if detail:
+        raise DatameshQueryError(detail)
+    raise DatameshConnectError("Datamesh server error: " + resp.text)
+
+
+def _open_lazy(conn: Connector, key: str, api: Literal["query", "zarr"]) -> xr.Dataset:
+    """Open a staged result or a whole datasource as a lazy zarr dataset.
+
+    key is the stage's qhash for api="query", the datasource id for
+    api="zarr". The dataset fetches chunks through the session for its whole lifetime, so
+    the session is deliberately left open, exactly as Connector._query does;
+    oceanum closes it at interpreter exit.
+    """
     session = Session.acquire(conn)
     try:
-        resp = conn._retried_request(
-            f"{conn._gateway}/oceanql/download/",
-            method="POST",
-            headers=session.header,
+        mapper = ZarrClient(conn, key, session, api=api, verify=conn._verify)
+        return xr.open_zarr(
+            mapper, consolidated=True, decode_coords="all", mask_and_scale=True
+        )
+    except AttributeError as exc:  # private API drift within the 1.x pin
+        session.close()
+        raise ToolError(
+            "The installed oceanum version no longer exposes the connection "
+            "internals this server relies on; install a version matching "
+            "the pyproject.toml pin."
+        ) from exc
+    except BaseException:
+        session.close()
+        raise
+
+
+def _decode_result(content: bytes, container: Container) -> Any:
+    """Decode a downloaded query result into its xarray/pandas container."""
+    with tempfile.TemporaryDirectory(prefix="oceanum_mcp_") as tmp:
+        path = Path(tmp) / "result"
+        path.write_bytes(content)
+        if container == Container.Dataset:
+            # load_dataset reads fully into memory, so the file can go.
+            return xr.load_dataset(path, decode_coords="all", mask_and_scale=True)
+        if container == Container.GeoDataFrame:
+            import geopandas
+
+            return geopandas.read_parquet(path)
+        return pd.read_parquet(path)
+
+
+# Result downloads read the body in blocks of this size, so a cancelled call
+# stops within a block. Attempts that fail to connect are retried like the
+# library's retried_request: exponential back-off, and 30 s after a 502.
+_DOWNLOAD_BLOCK_BYTES = 1 << 20
+_DOWNLOAD_RETRIES = 8
+
+
+def _post_download(
+    conn: Connector, url: str, headers: dict[str, str], data: str
+) -> bytes | None:
+    """POST a result download and read its body in cancellable blocks.
+
+    Connector._retried_request reads the whole body before returning, so a
+    cancelled call could not stop it; closing a part-read streamed response
+    drops the connection instead. Returns None on HTTP 204.
+    """
+    requester = conn.http_session or requests
+    for attempt in range(_DOWNLOAD_RETRIES):
+        raise_if_cancelled()
+        try:
+            resp = requester.request(
+                method="POST",
+                url=url,
+                data=data,
+                headers=headers,
+                timeout=(DATAMESH_CONNECT_TIMEOUT, DATAMESH_DOWNLOAD_TIMEOUT),
+                verify=conn._verify,
+                stream=True,
+            )
+            try:
+                if resp.status_code == 502:
+                    wait(30)
+                    raise requests.RequestException("502 Bad Gateway")
+                _raise_for_gateway_error(resp)
+                if resp.status_code == 204:
+                    return None
+                body = bytearray()
+                for block in resp.iter_content(_DOWNLOAD_BLOCK_BYTES):
+                    raise_if_cancelled()
+                    body += block
+                return bytes(body)
+            finally:
+                resp.close()
+        except requests.RequestException as exc:
+            if attempt == _DOWNLOAD_RETRIES - 1:
+                raise DatameshConnectError(
+                    f"Failed to connect to {url} after {_DOWNLOAD_RETRIES} "
+                    f"retries with error: {exc}"
+                ) from exc
+            wait(0.1 * 2**attempt)
+    return None
+
+
+def _fetch_staged(
+    conn: Connector, query: Query, stage: Stage, *, use_dask: bool = False
+) -> Any:
+    """Retrieve the result of a query that _stage() has already staged.
+
+    This is the post-staging half of Connector._query. conn.query() would
+    stage the query a second time before downloading, and staging is often
+    the slowest gateway round trip of a small query. The library's row-cap
+    and lazy-fallback warnings are re-emitted so _captured_warnings still
+    surfaces them. Returns None when the gateway reports no data (HTTP 204).
+
+    OCEANUM_MCP_SINGLE_STAGE=0 falls back to conn.query().
+    """
+    if not single_stage():
+        return conn.query(query, use_dask=use_dask)
+    if stage.container in (Container.DataFrame, Container.GeoDataFrame):
+        if stage.dlen >= DATAMESH_ROW_CAP:
+            _warnings.warn(
+                f"Query limited to {DATAMESH_ROW_CAP} rows, not all data may be "
+                "returned. Use a more specific query."
+            )
+    elif stage.size > DASK_QUERY_SIZE and not use_dask:
+        _warnings.warn(
+            "Query is too large for direct access, using lazy access with dask"
+        )
+        use_dask = True
+    if use_dask and stage.container == Container.Dataset:
+        return _open_lazy(conn, stage.qhash, "query")
+
+    session = Session.acquire(conn)
+    try:
+        content = _post_download(
+            conn,
+            f"{conn._gateway}/oceanql/",
+            headers={"Accept": _TRANSFER_FORMAT[stage.container], **session.header},
             data=query.model_dump_json(warnings=False),
-            # Match _stage_request's long read timeout: preparing a download
-            # stage for a large export can far exceed the 10s default.
-            timeout=(DATAMESH_CONNECT_TIMEOUT, DATAMESH_STAGE_READ_TIMEOUT),
         )
     except AttributeError as exc:  # private API drift within the 1.x pin
         raise ToolError(
@@ -164,17 +713,35 @@ def _download_stage(conn: Connector, query: Query) -> dict[str, Any] | None:
         ) from exc
     finally:
         session.close()
-    if resp.status_code == 204:
+    if content is None:
         return None
-    if resp.status_code >= 400:
-        try:
-            detail = resp.json().get("detail")
-        except ValueError:
-            detail = None
-        if detail:
-            raise DatameshQueryError(detail)
-        raise DatameshConnectError("Datamesh server error: " + resp.text)
-    return resp.json()
+    return _decode_result(content, stage.container)
+
+
+def _load_staged(conn: Connector, datasource_id: str, stage: Stage) -> Any:
+    """Load a whole datasource whose default query _stage() has already staged.
+
+    The post-staging half of Connector.load_datasource, for the same reason as
+    _fetch_staged. OCEANUM_MCP_SINGLE_STAGE=0 falls back to
+    conn.load_datasource().
+    """
+    if not single_stage():
+        return conn.load_datasource(datasource_id)
+    if stage.container == Container.Dataset:
+        return _open_lazy(conn, datasource_id, "zarr")
+    try:
+        tmpfile = conn._data_request(datasource_id, "application/parquet")
+    except AttributeError as exc:  # private API drift within the 1.x pin
+        raise ToolError(
+            "The installed oceanum version no longer exposes the connection "
+            "internals this server relies on; install a version matching "
+            "the pyproject.toml pin."
+        ) from exc
+    if stage.container == Container.GeoDataFrame:
+        import geopandas
+
+        return geopandas.read_parquet(tmpfile)
+    return pd.read_parquet(tmpfile)
 
 
 def _query_echo(query: Query) -> dict[str, Any]:
@@ -182,6 +749,239 @@ def _query_echo(query: Query) -> dict[str, Any]:
     return query.model_dump(mode="json", exclude_none=True, warnings=False)
 
 
+# (credential_key, datasource id, canonical query JSON) -> Stage. The
+# datasource id is part of the key so update_metadata can invalidate by it.
+_stage_cache = TTLCache(max_entries=_STAGE_CACHE_MAX, ttl_s=_STAGE_CACHE_TTL_S)
+
+# (credential_key, datasource id, canonical query JSON) -> the gateway's
+# download-stage response (signed URL and formats), for hosted exports.
+_download_cache = TTLCache(
+    max_entries=_DOWNLOAD_CACHE_MAX, ttl_s=_DOWNLOAD_URL_DEFAULT_VALIDITY_S
+)
+
+# Identical gateway calls in flight at the same moment (the same user's
+# sessions replaying one prompt) share a single call. Keys are
+# (operation, credential_key, ...) so only the same credential coalesces.
+# stats() reports how many calls led and how many were coalesced.
+_inflight = SingleFlight()
+
+# (credential_key, datasource id, canonical query JSON) -> (datasource
+# `modified` timestamp, query_data JSON response, whether it is a lazy
+# summary, whether it carries a fetch_page cursor), bounded by the responses'
+# total size (OCEANUM_MCP_RESULT_CACHE_BYTES). An entry is served only while
+# the datasource's `modified` still matches, so changed data is refetched.
+_result_cache = ByteLRUCache(max_bytes=result_cache_bytes())
+
+# Optional persistent cache of downloaded query_data results for stdio users
+# (OCEANUM_MCP_CACHE_DIR), validated against `modified` like the above.
+_disk_cache = (
+    DiskResultCache(cache_dir(), cache_dir_max_bytes()) if cache_dir() else None
+)
+
+
+# (credential_key, cursor) -> records table of a truncated query_data result.
+_page_store = ByteLRUCache(max_bytes=page_store_bytes(), ttl_s=_CURSOR_TTL_S)
+
+# (credential_key, cursor) -> the Query the cursor pages through.
+_cursor_queries = TTLCache(max_entries=_CURSOR_QUERIES_MAX, ttl_s=_CURSOR_QUERY_TTL_S)
+
+# Hosted servers bound the gateway-bound tool calls (query_data,
+# export_query, stage_queries, fetch_page, load_datasource) running at once,
+# in total and per credential_key, so one credential's parallel calls cannot
+# take every worker thread (see _admitted).
+_admission = AdmissionControl(
+    max_calls=max_concurrent_calls(),
+    tenant_calls=tenant_concurrent_calls(),
+    queue=admission_queue(),
+    timeout_s=admission_timeout_s(),
+)
+
+
+def _admitted(tool: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a gateway-bound tool under the hosted server's admission control.
+
+    A call over the limits waits for a slot; one that finds its credential's
+    line full or waits too long gets a busy response with retry_after_s
+    instead. stdio serves a single user and is not limited.
+    """
+
+    @functools.wraps(tool)
+    async def call(*args: Any, **kwargs: Any) -> str:
+        if not is_network_transport():
+            return await tool(*args, **kwargs)
+        tenant = credential_key()
+        try:
+            started = await _admission.acquire(tenant)
+        except Busy as exc:
+            return to_json(
+                {
+                    "error": str(exc),
+                    "status": "busy",
+                    "retry_after_s": exc.retry_after_s,
+                }
+            )
+        try:
+            return await tool(*args, **kwargs)
+        finally:
+            _admission.release(tenant, started)
+
+    return call
+
+
+def _query_key(query: Query) -> tuple[str, str, str]:
+    """Per-credential cache key for a query, insensitive to field order."""
+    canonical = json.dumps(_query_echo(query), sort_keys=True)
+    return (credential_key(), query.datasource, canonical)
+
+
+async def _cached_download_stage(
+    conn: Connector, query: Query
+) -> dict[str, Any] | None:
+    """_download_stage() through the per-credential download cache.
+
+    An entry lives for its signed URL's validity less _DOWNLOAD_URL_MARGIN_S;
+    one with less than the margin left is not stored. "No data" is never
+    cached.
+    """
+    key = _query_key(query)
+    stage = _download_cache.get(key)
+    if stage is None:
+        stage = await _inflight.do(
+            ("download", *key), lambda: _download_stage(conn, query)
+        )
+        if stage is not None and stage.get("url"):
+            ttl = _download_validity_s(stage) - _DOWNLOAD_URL_MARGIN_S
+            if ttl > 0:
+                _download_cache.set(key, stage, ttl_s=ttl)
+    return stage
+
+
+def _page_key(key: tuple[str, str, str]) -> tuple[str, str]:
+    """(credential_key, cursor) for a query key.
+
+    Cursors are derived from the query, so cached responses carry a cursor
+    that still resolves, and a repeated query reuses the stored table.
+    """
+    cursor = hashlib.sha256(json.dumps(key[1:]).encode()).hexdigest()[:24]
+    return (key[0], cursor)
+
+
+def _keep_pages(key: tuple[str, str, str], data: Any) -> None:
+    """Store a result's records table for fetch_page, if it is truncated."""
+    if not _page_store.enabled:
+        return
+    table = records_frame(data)
+    if table is None or table.shape[0] <= max_inline_rows():
+        return
+    nbytes = int(table.memory_usage(deep=True).sum())
+    _page_store.set(_page_key(key), table, nbytes)
+
+
+async def _cached_stage(conn: Connector, query: Query) -> Stage | None:
+    """_stage() through the per-credential stage cache and single-flight.
+
+    "No data" (None) is never cached: data may arrive at any time.
+    """
+    key = _query_key(query)
+    stage = _stage_cache.get(key)
+    if stage is None:
+        stage = await _inflight.do(("stage", *key), lambda: _stage(conn, query))
+        _stage_cache.set(key, stage)
+    return stage
+
+
+# (credential_key, datasource id) -> (monotonic fetch time, Datasource).
+_datasource_cache = TTLCache(
+    max_entries=_DATASOURCE_CACHE_MAX, ttl_s=_DATASOURCE_CACHE_TTL_S
+)
+
+
+async def _shared_datasource(conn: Connector, datasource_id: str) -> Datasource:
+    """_get_datasource() through single-flight; refreshes the metadata cache."""
+    key = (credential_key(), datasource_id)
+    ds = await _inflight.do(
+        ("datasource", *key), lambda: _get_datasource(conn, datasource_id)
+    )
+    _datasource_cache.set(key, (time.monotonic(), ds))
+    return ds
+
+
+async def _cached_datasource(conn: Connector, datasource_id: str) -> Datasource:
+    """Datasource metadata from the cache when fresh or revalidated.
+
+    Revalidation costs nothing on the wire: it compares the cached
+    `modified` with the caller's catalog mirror, and only a mirror within
+    its own refresh interval is trusted.
+    """
+    key = (credential_key(), datasource_id)
+    cached = _datasource_cache.get(key)
+    if cached is not None:
+        fetched_at, ds = cached
+        if time.monotonic() - fetched_at < _DATASOURCE_FRESH_S:
+            return ds
+        mirror = _catalog_mirrors.get(key[0])
+        listed = None if mirror is None else mirror.get(datasource_id)
+        if (
+            listed is not None
+            and ds.modified is not None
+            and listed.modified == ds.modified
+            and mirror.age() < catalog_refresh_s()
+        ):
+            _datasource_cache.set(key, (time.monotonic(), ds))
+            return ds
+    return await _shared_datasource(conn, datasource_id)
+
+
+async def _datasource_modified(
+    conn: Connector, datasource_id: str
+) -> datetime.datetime | None:
+    """The datasource's `modified` timestamp, or None if unknown.
+
+    Used to validate cached results, so a failed lookup means "cannot
+    validate" rather than an error: the caller just skips the cache.
+    """
+    try:
+        return (await _shared_datasource(conn, datasource_id)).modified
+    except _DATAMESH_ERRORS:
+        return None
+
+
+# credential_key -> CatalogMirror.
+_catalog_mirrors = TTLCache(
+    max_entries=_CATALOG_MIRRORS_MAX, ttl_s=_CATALOG_MIRROR_TTL_S
+)
+
+
+async def _refresh_catalog(conn: Connector, mirror: CatalogMirror) -> None:
+    listing = await _metadata_request(conn)
+    # Validating changed entries into Datasource models is CPU-bound.
+    await _run_sync(mirror.apply, listing.get("features", []))
+
+
+async def _catalog_mirror(conn: Connector) -> CatalogMirror:
+    """The caller's catalog mirror, refreshed if older than the interval.
+
+    Concurrent searches that find it stale share one refresh.
+    """
+    key = credential_key()
+    mirror = _catalog_mirrors.get(key)
+    if mirror is None:
+        mirror = CatalogMirror()
+    # Re-set on every search, so the TTL runs from the last use.
+    _catalog_mirrors.set(key, mirror)
+    if mirror.age() >= catalog_refresh_s():
+        await _inflight.do(("catalog", key), lambda: _refresh_catalog(conn, mirror))
+    return mirror
+
+
+def _invalidate_datasource(datasource_id: str) -> None:
+    """Drop cached gateway state for a datasource, for every credential."""
+    _datasource_cache.invalidate(lambda key: key[1] == datasource_id)
+    _stage_cache.invalidate(lambda key: key[1] == datasource_id)
+    _download_cache.invalidate(lambda key: key[1] == datasource_id)
+    _result_cache.invalidate(lambda key: key[1] == datasource_id)
+
+
 def _stage_summary(stage: Stage) -> dict[str, Any]:
     return {
         "container": stage.container.value,
@@ -191,6 +991,54 @@ def _stage_summary(stage: Stage) -> dict[str, Any]:
     }
 
 
+def _stage_report(stage: Stage | None, query: Query) -> dict[str, Any]:
+    """stage_query's response for one staged (or empty) query."""
+    if stage is None:
+        return {
+            "staged": False,
+            "message": "No data matches this query.",
+            "query": _query_echo(query),
+        }
+
+    out: dict[str, Any] = {"staged": True, **_stage_summary(stage)}
+    inline_limit = max_inline_bytes()
+    if stage.size <= inline_limit:
+        out["recommendation"] = (
+            "Small enough to return inline: call query_data with these parameters."
+        )
+    else:
+        detail = (
+            "query_data will return only a lazy structure summary; shrink the "
+            "result with filters, aggregation, or time_resolution"
+            if stage.container == Container.Dataset
+            else "narrow the query with filters or aggregation"
+        )
+        out["recommendation"] = (
+            f"Larger than the inline limit ({human_bytes(inline_limit)}): "
+            f"{detail}{export_clause()}."
+        )
+    if (
+        stage.container in (Container.DataFrame, Container.GeoDataFrame)
+        and stage.dlen >= DATAMESH_ROW_CAP
+    ):
+        out["warnings"] = [
+            f"Datamesh caps tabular results at {DATAMESH_ROW_CAP} rows; this "
+            "result would be truncated. Narrow the query."
+        ]
+    out["query"] = _query_echo(query)
+    return out
+
+
+# Progress messages (see common/progress.py) of the phases tools share.
+_STAGING = "Staging the query on the gateway"
+
+
+def _downloading(stage: Stage, use_dask: bool) -> str:
+    if use_dask and stage.container == Container.Dataset:
+        return "Opening the result for lazy (chunk-wise) access"
+    return f"Downloading the result ({human_bytes(stage.size)})"
+
+
 def _refusal(stage: Stage, message: str, **extra: Any) -> str:
     return to_json(
         {"refused": True, **_stage_summary(stage), "message": message, **extra}
@@ -230,8 +1078,9 @@ def _build_query(
     level_interp: Literal["nearest", "linear"] | None = None,
     coord_filters: list[CoordSelector] | None = None,
     crs: str | int | None = None,
-    aggregate_operations: list[Literal["mean", "min", "max", "std", "sum"]]
-    | None = None,
+    aggregate_operations: (
+        list[Literal["mean", "min", "max", "std", "sum"]] | None
+    ) = None,
     aggregate_spatial: bool = True,
     aggregate_temporal: bool = True,
     limit: int | None = None,
@@ -315,6 +1164,10 @@ def _build_query(
         raise ToolError(f"Invalid query parameters: {exc}") from exc
 
 
+# Parameter names _build_query accepts (datasource_id included), for
+# validating untyped per-item query objects such as stage_queries items.
+_QUERY_PARAMS = frozenset(inspect.signature(_build_query).parameters)
+
 # Shared Args documentation for the three query-shaped tools. Assembled into
 # each tool's __doc__ before registration so the MCP parameter descriptions
 # stay byte-identical across tools (FastMCP parses the docstring Args section).
@@ -348,7 +1201,7 @@ _QUERY_PARAM_DOCS = """\
 
 
 @mcp.tool(annotations=READ_TOOL)
-def search_catalog(
+async def search_catalog(
     search: str | None = None,
     time_start: str | None = None,
     time_end: str | None = None,
@@ -358,7 +1211,7 @@ def search_catalog(
     """Search the Oceanum Datamesh catalog for datasets.
 
     Args:
-        search: Text search string to filter datasources by name, description, or tags.
+        search: Text search matched against datasource name, description, tags, labels, and variable names. Results are ranked best match first, so a small limit usually suffices.
         time_start: ISO 8601 datetime for start of time range filter (e.g. "2023-01-01").
         time_end: ISO 8601 datetime for end of time range filter (e.g. "2023-12-31").
         bbox: Bounding box as [xmin, ymin, xmax, ymax] in WGS84 coordinates.
@@ -371,24 +1224,39 @@ def search_catalog(
     if limit < 1:
         raise ToolError("limit must be at least 1.")
 
-    conn = get_datamesh_connector()
-
-    timefilter = None
-    if time_start or time_end:
-        timefilter = [time_start, time_end]
+    conn = await _connector()
 
-    geofilter = None
-    if bbox:
-        geofilter = GeoFilter(type="bbox", geom=bbox)
+    start = end = None
+    try:
+        if time_start or time_end:
+            start, end = TimeFilter(times=[time_start, time_end]).times
+        if bbox:
+            bbox = list(GeoFilter(type="bbox", geom=bbox).geom)
+    except (ValueError, TypeError) as exc:
+        raise ToolError(f"Invalid catalog filter: {exc}") from exc
 
-    catalog = conn.get_catalog(
-        search=search,
-        timefilter=timefilter,
-        geofilter=geofilter,
-        limit=limit,
-    )
+    if catalog_refresh_s() > 0:
+        mirror = await _catalog_mirror(conn)
+        datasources = mirror.search(
+            text=search, start=start, end=end, bbox=bbox, limit=limit
+        )
+    else:
+        # The catalog filters Connector.get_catalog would send, built the
+        # same way.
+        params: dict[str, Any] = {"limit": limit}
+        if search:
+            params["search"] = search
+        if time_start or time_end:
+            params["in_trange"] = (
+                f"{start or datetime.datetime(1, 1, 1)}Z,"
+                f"{end or datetime.datetime(2500, 1, 1)}Z"
+            )
+        if bbox:
+            params["geom_intersects"] = shapely.geometry.box(*bbox).wkt
+        catalog = Catalog(await _metadata_request(conn, params=params))
+        datasources = [ds for ds in catalog if ds is not None]
 
-    results = [format_datasource(ds) for ds in catalog if ds is not None]
+    results = [format_datasource(ds) for ds in datasources]
     out: dict[str, Any] = {"count": len(results), "results": results}
     if not results:
         out["message"] = "No datasources found matching the search criteria."
@@ -401,7 +1269,7 @@ def search_catalog(
 
 
 @mcp.tool(annotations=READ_TOOL)
-def get_datasource_info(datasource_id: str) -> str:
+async def get_datasource_info(datasource_id: str) -> str:
     """Get full metadata for a specific datasource.
 
     Returns all fields including schema, coordinates, geometry, time range,
@@ -413,8 +1281,8 @@ def get_datasource_info(datasource_id: str) -> str:
     Returns:
         Full datasource metadata as JSON.
     """
-    conn = get_datamesh_connector()
-    ds = conn.get_datasource(datasource_id)
+    conn = await _connector()
+    ds = await _cached_datasource(conn, datasource_id)
     return to_json(format_datasource(ds))
 
 
@@ -423,7 +1291,7 @@ def get_datasource_info(datasource_id: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def stage_query(
+async def stage_query(
     datasource_id: str,
     variables: list[str] | None = None,
     time_start: str | None = None,
@@ -441,8 +1309,9 @@ def stage_query(
     level_interp: Literal["nearest", "linear"] | None = None,
     coord_filters: list[CoordSelector] | None = None,
     crs: str | int | None = None,
-    aggregate_operations: list[Literal["mean", "min", "max", "std", "sum"]]
-    | None = None,
+    aggregate_operations: (
+        list[Literal["mean", "min", "max", "std", "sum"]] | None
+    ) = None,
     aggregate_spatial: bool = True,
     aggregate_temporal: bool = True,
     limit: int | None = None,
@@ -453,7 +1322,7 @@ def stage_query(
     whether the result is small enough for query_data to return inline, and
     echoes the canonical query.
     """
-    conn = get_datamesh_connector()
+    conn = await _connector()
     query = _build_query(
         datasource_id,
         variables=variables,
@@ -478,49 +1347,193 @@ def stage_query(
         limit=limit,
     )
     try:
-        stage = _stage(conn, query)
+        async with current_progress().waiting(_STAGING):
+            stage = await _cached_stage(conn, query)
     except _DATAMESH_ERRORS as exc:
         return to_json({"error": str(exc), "query": _query_echo(query)})
+    return to_json(_stage_report(stage, query))
 
-    if stage is None:
-        return to_json(
-            {
-                "staged": False,
-                "message": "No data matches this query.",
-                "query": _query_echo(query),
-            }
+
+# Upper bound on queries per stage_queries call, so one request cannot queue
+# an unbounded number of gateway stagings.
+_STAGE_BATCH_MAX = 50
+
+
+@mcp.tool(annotations=READ_TOOL)
+@_admitted
+async def stage_queries(queries: list[dict[str, Any]]) -> str:
+    """Dry-run several queries at once: report each result size, no data.
+
+    Use this instead of repeated stage_query calls when comparing regions,
+    periods, or datasources — queries are staged concurrently, so the batch
+    takes about as long as its slowest query. Each query is validated and
+    staged independently: one bad query does not fail the others.
+
+    Args:
+        queries: Query parameter objects, each accepting exactly the parameters of stage_query (datasource_id is required), e.g. [{"datasource_id": "ds", "variables": ["hs"], "bbox": [170, -45, 175, -40]}]. At most 50 per call.
+
+    Returns:
+        JSON with one result per query in input order (as stage_query would
+        report it, or an "error"), plus the aggregate staged size of all
+        queries that staged and counts of staged, empty, and failed queries.
+    """
+    if not queries:
+        raise ToolError("queries must contain at least one query.")
+    if len(queries) > _STAGE_BATCH_MAX:
+        raise ToolError(
+            f"At most {_STAGE_BATCH_MAX} queries per call; got {len(queries)}."
         )
 
-    out: dict[str, Any] = {"staged": True, **_stage_summary(stage)}
-    inline_limit = max_inline_bytes()
-    if stage.size <= inline_limit:
-        out["recommendation"] = (
-            "Small enough to return inline: call query_data with these parameters."
+    conn = await _connector()
+    gate = asyncio.Semaphore(stage_concurrency())
+
+    async def _one(params: dict[str, Any]) -> tuple[dict[str, Any], Stage | None]:
+        unknown = sorted(set(params) - _QUERY_PARAMS)
+        if unknown:
+            return {"error": f"Unknown query parameters: {unknown}"}, None
+        if "datasource_id" not in params:
+            return {"error": "datasource_id is required."}, None
+        try:
+            query = _build_query(**params)
+        except (ToolError, TypeError) as exc:
+            return {"error": str(exc)}, None
+        try:
+            async with gate:
+                stage = await _cached_stage(conn, query)
+        except _DATAMESH_ERRORS as exc:
+            return {"error": str(exc), "query": _query_echo(query)}, None
+        return _stage_report(stage, query), stage
+
+    outcomes = await asyncio.gather(*(_one(params) for params in queries))
+
+    results = [{"index": i, **report} for i, (report, _) in enumerate(outcomes)]
+    staged = [stage for _, stage in outcomes if stage is not None]
+    total = sum(stage.size for stage in staged)
+    failed = sum(1 for report, _ in outcomes if "error" in report)
+    return to_json(
+        {
+            "count": len(results),
+            "staged": len(staged),
+            "no_data": len(results) - len(staged) - failed,
+            "failed": failed,
+            "total_size_bytes": total,
+            "total_size_human": human_bytes(total),
+            "results": results,
+        }
+    )
+
+
+async def _summarize_staged(
+    conn: Connector,
+    query: Query,
+    stage: Stage,
+    *,
+    use_dask: bool,
+    modified: datetime.datetime | None,
+    stats: bool = False,
+) -> dict[str, Any]:
+    """Download a staged query and summarize it: query_data's response body.
+
+    Run under single-flight, so concurrent identical calls share one
+    download and receive the same summary (warnings included). Downloaded
+    (not lazy) results are kept in the disk cache when one is configured
+    and the datasource's `modified` is known. stats adds value statistics
+    to a lazy summary.
+    """
+    warnings: list[str] = []
+    async with current_progress().waiting(_downloading(stage, use_dask)):
+        data = await _run_sync(
+            _fetch_staged, conn, query, stage, use_dask=use_dask, captured=warnings
         )
-    else:
-        detail = (
-            "query_data will return only a lazy structure summary; shrink the "
-            "result with filters, aggregation, or time_resolution"
-            if stage.container == Container.Dataset
-            else "narrow the query with filters or aggregation"
+    if _disk_cache is not None and modified is not None and not use_dask:
+        await _run_sync(
+            _disk_cache.put,
+            _query_key(query),
+            modified,
+            data,
+            warnings=list(warnings),
+            staged_size_bytes=stage.size,
         )
-        out["recommendation"] = (
-            f"Larger than the inline limit ({human_bytes(inline_limit)}): "
-            f"{detail}{export_clause()}."
+    if not use_dask:
+        await _run_sync(_keep_pages, _query_key(query), data)
+    out = await _run_sync(summarize_data, data, warnings=warnings, stats=stats)
+    out["staged_size_bytes"] = stage.size
+    return out
+
+
+# fit_to_budget plans for this fraction of the inline limit, leaving room
+# for estimation error, and re-stages at most this many plans.
+_FIT_HEADROOM = 0.8
+_FIT_MAX_STAGES = 3
+
+
+async def _fit_to_budget(
+    conn: Connector, query: Query, stage: Stage, budget: int
+) -> tuple[Query, Stage, dict[str, Any]]:
+    """Downsample an over-budget gridded query until it stages within budget.
+
+    Returns the query and stage to continue with (the originals if no plan
+    fits) and the report for the response. A plan that re-stages too large
+    is replanned for the observed shortfall.
+    """
+    report: dict[str, Any] = {
+        "fitted": False,
+        "budget_bytes": budget,
+        "original_size_bytes": stage.size,
+    }
+    if stage.container != Container.Dataset:
+        report["message"] = (
+            "fit_to_budget downsamples gridded datasets only; narrow tabular "
+            "queries with filters, aggregation, or limit."
         )
-    if (
-        stage.container in (Container.DataFrame, Container.GeoDataFrame)
-        and stage.dlen >= DATAMESH_ROW_CAP
-    ):
-        out["warnings"] = [
-            f"Datamesh caps tabular results at {DATAMESH_ROW_CAP} rows; this "
-            "result would be truncated. Narrow the query."
-        ]
-    out["query"] = _query_echo(query)
-    return to_json(out)
+        return query, stage, report
+
+    ds = await _cached_datasource(conn, query.datasource)
+    factor = stage.size / (budget * _FIT_HEADROOM)
+    tried: list[dict[str, Any]] = []
+    while len(tried) < _FIT_MAX_STAGES:
+        plan = plan_downsampling(ds, query, factor)
+        if plan is None or plan.changes in tried:
+            break
+        tried.append(plan.changes)
+        fitted = await _cached_stage(conn, plan.query)
+        if fitted is None:
+            break
+        report["stages"] = len(tried)
+        if fitted.size <= budget:
+            report.update(
+                fitted=True,
+                changes=plan.changes,
+                size_bytes=fitted.size,
+                query=_query_echo(plan.query),
+            )
+            return plan.query, fitted, report
+        factor *= fitted.size / (budget * _FIT_HEADROOM)
+    report["message"] = (
+        "No downsampling within this datasource's time steps and grid fits "
+        "the budget; narrow the time range, area, or variables."
+    )
+    return query, stage, report
+
 
+def _summarize_disk_cached(
+    key: tuple[str, str, str], modified: datetime.datetime
+) -> dict[str, Any] | None:
+    """query_data's response body from the disk cache, or None on a miss.
 
-def query_data(
+    The library warnings recorded with the download are replayed.
+    """
+    hit = _disk_cache.get(key, modified) if _disk_cache is not None else None
+    if hit is None:
+        return None
+    data, meta = hit
+    _keep_pages(key, data)
+    out = summarize_data(data, warnings=list(meta.get("warnings", [])))
+    out["staged_size_bytes"] = meta.get("staged_size_bytes")
+    return out
+
+
+async def query_data(
     datasource_id: str,
     variables: list[str] | None = None,
     time_start: str | None = None,
@@ -538,19 +1551,24 @@ def query_data(
     level_interp: Literal["nearest", "linear"] | None = None,
     coord_filters: list[CoordSelector] | None = None,
     crs: str | int | None = None,
-    aggregate_operations: list[Literal["mean", "min", "max", "std", "sum"]]
-    | None = None,
+    aggregate_operations: (
+        list[Literal["mean", "min", "max", "std", "sum"]] | None
+    ) = None,
     aggregate_spatial: bool = True,
     aggregate_temporal: bool = True,
     limit: int | None = None,
+    fit_to_budget: bool = False,
+    stats: bool = False,
 ) -> str:
     """Query a datasource and return small results inline.
 
     The query is staged first; results larger than the inline limit are not
-    downloaded (datasets are summarized lazily, tabular queries are refused
-    with alternatives). Use stage_query to size a query before calling this.
+    downloaded (datasets are summarized lazily with a preview read from
+    their first chunk, tabular queries are refused with alternatives) unless
+    fit_to_budget downsamples them to fit. Use
+    stage_query to size a query before calling this.
     """
-    conn = get_datamesh_connector()
+    conn = await _connector()
     query = _build_query(
         datasource_id,
         variables=variables,
@@ -574,55 +1592,126 @@ def query_data(
         aggregate_temporal=aggregate_temporal,
         limit=limit,
     )
-    warnings: list[str] = []
-    try:
-        stage = _stage(conn, query)
-        if stage is None:
-            return to_json(
-                {
-                    "status": "no_data",
-                    "message": "No data matches this query.",
-                    "query": _query_echo(query),
-                }
-            )
-        inline_limit = max_inline_bytes()
-        use_dask = False
-        if stage.size > inline_limit:
-            if stage.container == Container.Dataset:
-                # Lazy zarr access: structure only, no data download.
-                use_dask = True
-            else:
-                return _refusal(
-                    stage,
-                    f"Result is {human_bytes(stage.size)}, above the inline "
-                    f"limit of {human_bytes(inline_limit)}. Narrow the query "
-                    f"with filters or aggregation{export_clause()}.",
-                    query=_query_echo(query),
+    key = _query_key(query)
+    modified = None
+    modified_lookup = None
+    out = None
+    use_dask = False
+    fit = None
+    cached = _result_cache.get(key) if _result_cache.enabled else None
+    if cached is not None or _disk_cache is not None:
+        # One metadata read validates a cached result and skips staging and
+        # download entirely.
+        modified = await _datasource_modified(conn, query.datasource)
+    elif _result_cache.enabled:
+        # Nothing to validate: the `modified` the result will be cached under
+        # is looked up while the query stages, not before.
+        modified_lookup = asyncio.ensure_future(
+            _datasource_modified(conn, query.datasource)
+        )
+    if modified is not None:
+        # A lazy summary does not answer fit_to_budget, which wants values,
+        # or stats, which are never cached.
+        if cached is not None and cached[0] == modified:
+            if not ((fit_to_budget or stats) and cached[2]):
+                if cached[3]:
+                    # The cursor in the response must outlive its query entry.
+                    _cursor_queries.set(_page_key(key), query)
+                return cached[1]
+        if _disk_cache is not None:
+            out = await _run_sync(_summarize_disk_cached, key, modified)
+
+    if out is None:
+        try:
+            async with current_progress().waiting(_STAGING):
+                stage = await _cached_stage(conn, query)
+            if stage is None:
+                return to_json(
+                    {
+                        "status": "no_data",
+                        "message": "No data matches this query.",
+                        "query": _query_echo(query),
+                    }
                 )
-        with _captured_warnings(warnings):
-            data = conn.query(query, use_dask=use_dask)
-    except _DATAMESH_ERRORS as exc:
-        return to_json({"error": str(exc), "query": _query_echo(query)})
-
-    out = summarize_data(data, warnings=warnings)
-    out["staged_size_bytes"] = stage.size
-    return to_json(out)
+            inline_limit = max_inline_bytes()
+            if fit_to_budget and stage.size > inline_limit:
+                query, stage, fit = await _fit_to_budget(
+                    conn, query, stage, inline_limit
+                )
+                key = _query_key(query)
+            if stage.size > inline_limit:
+                if stage.container == Container.Dataset:
+                    # Lazy zarr access: structure plus a first-chunk preview.
+                    use_dask = True
+                else:
+                    return _refusal(
+                        stage,
+                        f"Result is {human_bytes(stage.size)}, above the inline "
+                        f"limit of {human_bytes(inline_limit)}. Narrow the query "
+                        f"with filters or aggregation{export_clause()}.",
+                        query=_query_echo(query),
+                        **({"fit_to_budget": fit} if fit else {}),
+                    )
+            out = await _inflight.do(
+                ("query_data", *key, use_dask, stats and use_dask),
+                lambda: _summarize_staged(
+                    conn,
+                    query,
+                    stage,
+                    use_dask=use_dask,
+                    modified=modified,
+                    stats=stats,
+                ),
+            )
+            if modified_lookup is not None:
+                modified = await modified_lookup
+        except _DATAMESH_ERRORS as exc:
+            return to_json({"error": str(exc), "query": _query_echo(query)})
+        finally:
+            if modified_lookup is not None:
+                # Not needed when the call ends without a result to cache.
+                modified_lookup.cancel()
+
+    paged = bool(out.get("truncated")) and _page_store.enabled
+    if paged:
+        page_key = _page_key(key)
+        _cursor_queries.set(page_key, query)
+        out = {
+            **out,
+            "cursor": page_key[1],
+            "note": (
+                f"{out['note']} Page through the rest with "
+                f"fetch_page(cursor, offset={len(out['data'])})."
+            ),
+        }
+    if fit is not None:
+        # Not cached: the report describes this call, not the fitted query.
+        return to_json({**out, "fit_to_budget": fit})
+    payload = to_json(out)
+    # Responses with statistics are not cached: a deadline may have cut
+    # them short.
+    if modified is not None and "stats" not in out:
+        _result_cache.set(
+            key, (modified, payload, use_dask, paged), nbytes=len(payload.encode())
+        )
+    return payload
 
 
-def _export_download_url(
+async def _export_download_url(
     conn: Connector,
     query: Query,
-    format: Literal["netcdf", "parquet", "csv"] | None,
+    format: Literal["netcdf", "zarr", "parquet", "csv"] | None,
     requested_path: str | None = None,
 ) -> str:
     """Hosted export: return a signed gateway download URL, no local file.
 
     The gateway stages the result and returns a self-authenticating URL; the
     data never touches this server's disk or the conversation. The caller (or
-    their code) fetches the URL out-of-band.
+    their code) fetches the URL out-of-band. A repeated export of the same
+    query, in any format, reuses the stage while its URL is still valid.
     """
     try:
-        stage = _download_stage(conn, query)
+        stage = await _cached_download_stage(conn, query)
     except _DATAMESH_ERRORS as exc:
         return to_json({"error": str(exc), "query": _query_echo(query)})
     if stage is None or not stage.get("url"):
@@ -639,6 +1728,11 @@ def _export_download_url(
     # advertised list rather than the local path's xarray/pandas constraints.
     is_dataset = stage.get("container") == Container.Dataset.value
     fmt = format or ("netcdf" if is_dataset else "parquet")
+    if fmt not in _GATEWAY_FORMAT:
+        raise ToolError(
+            f"format={fmt!r} writes a local store; hosted servers offer "
+            f"download links as {', '.join(_GATEWAY_FORMAT)}."
+        )
     gateway_fmt = _GATEWAY_FORMAT[fmt]
     available = stage.get("formats") or []
     if available and gateway_fmt not in available:
@@ -681,10 +1775,296 @@ def _export_download_url(
     return to_json(out)
 
 
-def export_query(
+# Sharded exports aim for this many rows per shard (from the stage's dlen),
+# within [2, _SHARD_MAX] shards; streaming exports aim for the chunk size,
+# within [2, _STREAM_SHARD_MAX]. A shard that still stages at the row cap
+# (or above the chunk size) is halved again, at most _SHARD_SPLIT_DEPTH times.
+_SHARD_ROWS = 250_000
+_SHARD_MAX = 64
+_STREAM_SHARD_MAX = 4096
+_SHARD_SPLIT_DEPTH = 3
+
+
+async def _stage_shards(
+    conn: Connector,
+    query: Query,
+    stage: Stage,
+    n: int,
+    max_bytes: int | None = None,
+) -> tuple[list[tuple[Query, Stage]] | None, dict[str, Any]]:
+    """Split a staged tabular query into n shards and stage them concurrently.
+
+    Returns the (query, stage) of every shard with data, in order, and the
+    report for the response; None instead of the list when the query offers
+    nothing to split on. Shards staging above max_bytes are split further.
+    """
+    ds = await _cached_datasource(conn, query.datasource)
+    split = shard_queries(query, ds, n)
+    if split is None:
+        return None, {
+            "applied": False,
+            "message": (
+                "Nothing to shard on: the query needs a time range, several "
+                "series times, or a coord_filters selection with several "
+                "values. Exported as a single query."
+            ),
+        }
+    axis, queries = split
+    gate = asyncio.Semaphore(stage_concurrency())
+    progress = current_progress()
+    progress.phase(f"Staging {len(queries)} sub-queries", len(queries))
+    finished = 0
+
+    async def _one(shard: Query, depth: int) -> list[tuple[Query, Stage]]:
+        nonlocal finished
+        async with gate:
+            staged = await _cached_stage(conn, shard)
+        if depth == 0:
+            finished += 1
+            progress.update(
+                finished,
+                f"{finished}/{len(queries)} sub-queries staged",
+                force=finished == len(queries),
+            )
+        if staged is None:
+            return []
+        too_big = staged.dlen >= DATAMESH_ROW_CAP or (
+            max_bytes is not None and staged.size > max_bytes
+        )
+        if too_big and depth < _SHARD_SPLIT_DEPTH:
+            halves = shard_queries(shard, ds, 2)
+            if halves is not None:
+                parts = await asyncio.gather(
+                    *(_one(half, depth + 1) for half in halves[1])
+                )
+                return [item for part in parts for item in part]
+        return [(shard, staged)]
+
+    parts = await asyncio.gather(*(_one(shard, 0) for shard in queries))
+    shards = [item for part in parts for item in part]
+    report = {
+        "applied": True,
+        "axis": axis,
+        "count": len(shards),
+        "capped": sum(1 for _, st in shards if st.dlen >= DATAMESH_ROW_CAP),
+    }
+    return shards, report
+
+
+async def _fetch_shards(
+    conn: Connector, shards: list[tuple[Query, Stage]], captured: list[str]
+) -> Any:
+    """Download staged shards concurrently and concatenate them in order."""
+    gate = asyncio.Semaphore(stage_concurrency())
+    progress = current_progress()
+    total = sum(staged.size for _, staged in shards)
+    progress.phase(f"Downloading {len(shards)} sub-queries", total)
+    received = 0
+
+    async def _one(shard: Query, staged: Stage) -> Any:
+        nonlocal received
+        async with gate:
+            frame = await _run_sync(
+                _fetch_staged, conn, shard, staged, captured=captured
+            )
+        received += staged.size
+        progress.update(
+            received,
+            f"{human_bytes(received)} of {human_bytes(total)} downloaded",
+            force=received == total,
+        )
+        return frame
+
+    frames = await asyncio.gather(*(_one(q, st) for q, st in shards))
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None
+    return await _run_sync(pd.concat, frames, ignore_index=True)
+
+
+async def _stream_shards(
+    conn: Connector,
+    shards: list[tuple[Query, Stage | None]],
+    manifest: ExportManifest,
+    parts: Path,
+    captured: list[str],
+    window: int,
+) -> None:
+    """Download the shards manifest still lacks, in order, saving each as a part.
+
+    At most `window` shards are downloaded or held at once; the next
+    download starts only after the oldest shard has been saved, so memory
+    stays bounded by `window` shards. Every saved shard is recorded in the
+    manifest. A fresh export passes each shard with the stage _stage_shards
+    made for it; a resumed one has none (None) and stages the shards it
+    still lacks again.
+    """
+    pending: list[tuple[int, asyncio.Task[Any]]] = []
+    queue = iter(manifest.remaining())
+    progress = current_progress()
+    progress.phase(f"Downloading {len(shards)} sub-queries", len(shards))
+
+    async def _fetch(shard: Query, staged: Stage | None) -> Any:
+        if staged is None:
+            staged = await _cached_stage(conn, shard)
+        if staged is None:
+            return None
+        return await _run_sync(_fetch_staged, conn, shard, staged, captured=captured)
+
+    def _start() -> None:
+        piece = next(queue, None)
+        if piece is not None:
+            pending.append((piece, asyncio.ensure_future(_fetch(*shards[piece]))))
+
+    try:
+        for _ in range(window):
+            _start()
+        while pending:
+            piece, task = pending.pop(0)
+            frame = await task
+            if frame is not None:
+                await _run_sync(write_part, parts, piece, frame)
+            del frame
+            await _run_sync(manifest.complete, piece)
+            done = len(manifest.done)
+            progress.update(
+                done,
+                f"{done}/{len(shards)} sub-queries written",
+                force=done == len(shards),
+            )
+            _start()
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
+def _write_export(
+    data: Any,
+    dest: Path,
+    fmt: str,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    manifest: ExportManifest | None = None,
+    progress: ChunkProgress | None = None,
+) -> dict[str, Any] | None:
+    """Write a query result to dest (blocking: lazy datasets fetch as they go).
+
+    A Zarr export records its pieces in manifest; dataset exports report
+    chunks written to progress. Returns the throughput report of a dataset
+    export, None otherwise.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "netcdf":
+        return write_netcdf(
+            data, dest, export_workers(), export_window_bytes(), progress
+        )
+    if fmt == "zarr":
+        return write_zarr(
+            data,
+            dest,
+            export_workers(),
+            export_window_bytes(),
+            compression,
+            compression_level,
+            manifest,
+            progress,
+        )
+    if fmt == "parquet":
+        data.to_parquet(dest)
+    else:
+        data.to_csv(dest, index=False)
+    return None
+
+
+def _remove_export(dest: Path) -> None:
+    """Delete a partial export: a file, or a Zarr store's directory."""
+    if dest.is_dir():
+        shutil.rmtree(dest, ignore_errors=True)
+    else:
+        dest.unlink(missing_ok=True)
+
+
+def _chunk_progress(progress: Progress, dest: Path) -> ChunkProgress | None:
+    """Progress notifications of chunks written to dest, if enabled."""
+    if not progress.enabled:
+        return None
+
+    def report(done: int, total: int) -> None:
+        message = f"{done}/{total} chunks written to {dest.name}"
+        progress.update(done, message, total, force=done == total)
+
+    return report
+
+
+def _export_manifest(
+    dest: Path,
+    query: Query,
+    fmt: str,
+    compression: str | None = None,
+    compression_level: int | None = None,
+) -> ExportManifest:
+    """The resume record of an export: same query, format and settings."""
+    identity = {
+        "query": _query_echo(query),
+        "format": fmt,
+        "compression": compression,
+        "compression_level": compression_level,
+    }
+    return ExportManifest(manifest_path(dest), identity)
+
+
+def _export_failure(
+    dest: Path, exc: Exception, query: Query, manifest: ExportManifest | None = None
+) -> str:
+    """Error response of a failed local export; with manifest, it can resume."""
+    out: dict[str, Any] = {"error": f"Export failed while writing {dest}: {exc}"}
+    if manifest is not None:
+        out["resumable"] = {
+            "pieces": manifest.pieces,
+            "done": len(manifest.done),
+            "message": (
+                "The finished pieces were kept. Run the same export again "
+                "(same query, format and path) to write only the rest."
+            ),
+        }
+    out["query"] = _query_echo(query)
+    return to_json(out)
+
+
+def _resampled(query: Query) -> bool:
+    """Whether the query resamples its time range to a time_resolution."""
+    resolution = query.timefilter.resolution if query.timefilter else None
+    return resolution not in (None, "native")
+
+
+def _abandon_export(
+    dest: Path, manifest: ExportManifest | None, wrote_dest: bool = True
+) -> None:
+    """Remove what a cancelled export wrote, resumable pieces included.
+
+    A cancelled call is abandoned, not failed: nothing is kept to resume.
+    dest goes only once the export has begun writing it; until then it may
+    be a file the export was about to overwrite.
+    """
+    if wrote_dest:
+        _remove_export(dest)
+    shutil.rmtree(parts_path(dest), ignore_errors=True)
+    if manifest is not None:
+        manifest.discard()
+
+
+def _export_bytes(dest: Path) -> int:
+    """Size of an export on disk (a Zarr store is a directory of chunks)."""
+    if dest.is_dir():
+        return sum(f.stat().st_size for f in dest.rglob("*") if f.is_file())
+    return dest.stat().st_size
+
+
+async def export_query(
     datasource_id: str,
     path: str | None = None,
-    format: Literal["netcdf", "parquet", "csv"] | None = None,
+    format: Literal["netcdf", "zarr", "parquet", "csv"] | None = None,
     overwrite: bool = False,
     variables: list[str] | None = None,
     time_start: str | None = None,
@@ -702,11 +2082,15 @@ def export_query(
     level_interp: Literal["nearest", "linear"] | None = None,
     coord_filters: list[CoordSelector] | None = None,
     crs: str | int | None = None,
-    aggregate_operations: list[Literal["mean", "min", "max", "std", "sum"]]
-    | None = None,
+    aggregate_operations: (
+        list[Literal["mean", "min", "max", "std", "sum"]] | None
+    ) = None,
     aggregate_spatial: bool = True,
     aggregate_temporal: bool = True,
     limit: int | None = None,
+    sharded: bool = False,
+    compression: Literal["none", "lz4", "zstd", "zlib", "blosclz"] | None = None,
+    compression_level: int | None = None,
 ) -> str:
     """Export the FULL result of a query — the data never enters the conversation.
 
@@ -715,10 +2099,14 @@ def export_query(
       download_url (choose format via `format`); `path` is ignored. Fetch the
       URL out-of-band — it needs no credential, so treat it as a secret.
     - Local (stdio): writes the result to the local file `path` (required) and
-      returns that path. Gridded datasets stream to NetCDF; tabular results
-      write Parquet or CSV.
+      returns that path. Gridded datasets stream to NetCDF or a Zarr store
+      (chunk-aligned, written in parallel); tabular results
+      write Parquet or CSV, streamed in sub-queries when large and optionally
+      sharded into concurrent ones. A streamed or Zarr export that fails part
+      way keeps its finished pieces; calling again with the same query,
+      format and path resumes it.
     """
-    conn = get_datamesh_connector()
+    conn = await _connector()
     query = _build_query(
         datasource_id,
         variables=variables,
@@ -746,20 +2134,44 @@ def export_query(
     if is_network_transport():
         # Hosted: broker a gateway download link; there is no client-visible
         # local filesystem. path/overwrite do not apply.
-        return _export_download_url(conn, query, format, requested_path=path)
+        return await _export_download_url(conn, query, format, requested_path=path)
 
     if path is None:
         raise ToolError("path is required for local (stdio) export.")
+    if (compression is not None or compression_level is not None) and (
+        format != "zarr"
+    ):
+        raise ToolError("compression settings apply to format='zarr' only.")
+    if compression_level is not None and not 1 <= compression_level <= 9:
+        raise ToolError("compression_level must be between 1 and 9.")
+    if sharded and (limit is not None or aggregate_operations):
+        raise ToolError(
+            "sharded cannot be combined with limit or aggregate_operations, "
+            "which apply to the whole result."
+        )
     dest = _resolve_export_path(path)
     if dest.exists():
-        if dest.is_dir():
+        # A Zarr store left by a failed run of this same export is resumed.
+        resuming = (
+            format == "zarr"
+            and _export_manifest(
+                dest, query, format, compression, compression_level
+            ).load()
+        )
+        if dest.is_dir() and not (
+            format == "zarr" and (resuming or is_zarr_store(dest))
+        ):
             raise ToolError(f"path is an existing directory: {dest}")
-        if not overwrite:
+        if not overwrite and not resuming:
             raise ToolError(f"File exists: {dest}. Pass overwrite=true to replace it.")
 
     warnings: list[str] = []
+    shards = sharding = manifest = None
+    stream = resumed = False
+    window = 1
     try:
-        stage = _stage(conn, query)
+        async with current_progress().waiting(_STAGING):
+            stage = await _cached_stage(conn, query)
         if stage is None:
             return to_json(
                 {
@@ -771,35 +2183,134 @@ def export_query(
 
         if stage.container == Container.Dataset:
             fmt = format or "netcdf"
-            if fmt != "netcdf":
+            if fmt not in ("netcdf", "zarr"):
                 raise ToolError(
-                    "This query returns a gridded dataset; only format='netcdf' "
-                    "is supported."
+                    "This query returns a gridded dataset; use format='netcdf' "
+                    "or 'zarr'."
+                )
+            if fmt == "zarr":
+                manifest = _export_manifest(
+                    dest, query, fmt, compression, compression_level
                 )
+                manifest.load()
         else:
             fmt = format or "parquet"
             if fmt not in ("parquet", "csv"):
                 raise ToolError(
                     "This query returns tabular data; use format='parquet' or 'csv'."
                 )
-            if stage.size > MAX_EXPORT_FRAME_BYTES:
+            size = stage.size
+            chunk = export_chunk_bytes()
+            if stage.container == Container.DataFrame:
+                manifest = _export_manifest(dest, query, fmt)
+                # An earlier run of this export stopped part way: finish its
+                # sub-queries rather than splitting the query afresh.
+                resumed = manifest.load() and isinstance(manifest.plan, dict)
+            # Plain frames are streamed to the file in sub-queries when sharded
+            # or too large to hold at once; limit and aggregation apply to the
+            # whole result, and GeoParquet metadata needs the whole frame. A
+            # resampled range is split on its bins only when asked to: bins
+            # that do not match the gateway's would be averaged twice.
+            stream = resumed or (
+                stage.container == Container.DataFrame
+                and (sharded or (size > chunk and not _resampled(query)))
+                and limit is None
+                and not aggregate_operations
+            )
+            if resumed:
+                window = stage_concurrency() if sharded else 1
+                sharding = manifest.plan["sharding"]
+            elif sharded or stream:
+                window = stage_concurrency() if sharded else 1
+                per_shard = max(1, chunk // window) if stream else None
+                n = 2
+                if sharded:
+                    n = max(n, min(_SHARD_MAX, math.ceil(stage.dlen / _SHARD_ROWS)))
+                if per_shard is not None:
+                    n = max(n, min(_STREAM_SHARD_MAX, math.ceil(size / per_shard)))
+                shards, sharding = await _stage_shards(conn, query, stage, n, per_shard)
+                if shards is not None:
+                    # The whole query's size is understated if it hit the cap.
+                    size = sum(staged.size for _, staged in shards)
+                else:
+                    stream = False
+                    if not sharded:
+                        sharding = None
+            if not stream:
+                manifest = None
+            if size > MAX_EXPORT_FRAME_BYTES and not stream:
                 return _refusal(
                     stage,
-                    f"Tabular result is {human_bytes(stage.size)}, above the "
-                    f"export limit of {human_bytes(MAX_EXPORT_FRAME_BYTES)}. "
-                    "Narrow the query.",
+                    f"Tabular result is {human_bytes(size)}, above the "
+                    f"export limit of {human_bytes(MAX_EXPORT_FRAME_BYTES)} for "
+                    "results that cannot be streamed to the file in "
+                    "sub-queries (by time range, series times, or "
+                    "coord_filters). Narrow the query.",
                     query=_query_echo(query),
                 )
 
-        with _captured_warnings(warnings):
+        if shards is not None and not stream:
+            data = await _fetch_shards(conn, shards, warnings)
+        elif not stream:
             # Datasets stream chunk-wise from lazy zarr; frames download fully.
-            data = conn.query(query, use_dask=stage.container == Container.Dataset)
+            use_dask = stage.container == Container.Dataset
+            async with current_progress().waiting(_downloading(stage, use_dask)):
+                data = await _run_sync(
+                    _fetch_staged,
+                    conn,
+                    query,
+                    stage,
+                    use_dask=use_dask,
+                    captured=warnings,
+                )
     except _DATAMESH_ERRORS as exc:
         return to_json({"error": str(exc), "query": _query_echo(query)})
 
+    if stream:
+        # Shards are saved as part files, recorded in the manifest, and
+        # joined into dest once all are in; a failed run keeps both to resume.
+        parts = parts_path(dest)
+        try:
+            if not resumed:
+                shutil.rmtree(parts, ignore_errors=True)
+                plan = {
+                    "shards": [_query_echo(shard) for shard, _ in shards],
+                    "sharding": sharding,
+                }
+                manifest.start(plan, len(shards))
+                pieces = shards
+            else:
+                manifest.start(manifest.plan, manifest.pieces)
+                pieces = [(Query(**shard), None) for shard in manifest.plan["shards"]]
+            await _stream_shards(conn, pieces, manifest, parts, warnings, window)
+        except (*_DATAMESH_ERRORS, OSError) as exc:
+            return _export_failure(dest, exc, query, manifest)
+        except asyncio.CancelledError:
+            _abandon_export(dest, manifest, wrote_dest=False)
+            raise
+        current_progress().phase(f"Joining the sub-queries into {dest.name}")
+        try:
+            writer = await _run_sync(assemble_parts, parts, manifest.pieces, dest, fmt)
+        except asyncio.CancelledError:
+            _abandon_export(dest, manifest)
+            raise
+        except OSError as exc:
+            dest.unlink(missing_ok=True)
+            return _export_failure(dest, exc, query, manifest)
+        except ValueError as exc:
+            # Pieces that do not fit together will not on a retry either.
+            dest.unlink(missing_ok=True)
+            shutil.rmtree(parts, ignore_errors=True)
+            manifest.discard()
+            return _export_failure(dest, exc, query)
+        shutil.rmtree(parts, ignore_errors=True)
+        manifest.discard()
+        # Structure from the first piece written; the row count from them all.
+        data = writer.template
+
     if data is None:
-        # The gateway can report no data on the download staging even after a
-        # successful dry-run stage (data changed in between).
+        # The gateway can report no data on the download even after a
+        # successful stage (data changed in between).
         return to_json(
             {
                 "status": "no_data",
@@ -808,33 +2319,51 @@ def export_query(
             }
         )
 
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        if fmt == "netcdf":
-            data.to_netcdf(dest)
-        elif fmt == "parquet":
-            data.to_parquet(dest)
-        else:
-            data.to_csv(dest, index=False)
-    except (*_DATAMESH_ERRORS, OSError) as exc:
-        # A mid-stream failure (zarr chunk fetch, disk) leaves a partial file.
-        dest.unlink(missing_ok=True)
-        return to_json(
-            {
-                "error": f"Export failed while writing {dest}: {exc}",
-                "query": _query_echo(query),
-            }
-        )
-
-    summary = summarize_data(data, max_rows=0, warnings=warnings)
-    return to_json(
-        {
-            "path": str(dest),
-            "format": fmt,
-            "bytes_written": dest.stat().st_size,
-            "summary": summary,
-        }
-    )
+    throughput = None
+    if not stream:
+        current_progress().phase(f"Writing {dest.name}")
+        try:
+            throughput = await _run_sync(
+                _write_export,
+                data,
+                dest,
+                fmt,
+                compression,
+                compression_level,
+                manifest,
+                _chunk_progress(current_progress(), dest),
+            )
+        except asyncio.CancelledError:
+            _abandon_export(dest, manifest)
+            raise
+        except (*_DATAMESH_ERRORS, OSError) as exc:
+            if manifest is not None:
+                # The Zarr pieces written so far stay for a retry to resume.
+                return _export_failure(dest, exc, query, manifest)
+            # A mid-stream failure (chunk fetch, disk) leaves a partial file.
+            _remove_export(dest)
+            return _export_failure(dest, exc, query)
+        if manifest is not None:
+            manifest.discard()
+
+    summary = await _run_sync(summarize_data, data, max_rows=0, warnings=warnings)
+    if stream:
+        summary["rows"] = writer.rows
+    out: dict[str, Any] = {
+        "path": str(dest),
+        "format": fmt,
+        "bytes_written": _export_bytes(dest),
+        "summary": summary,
+    }
+    if sharding is not None:
+        out["sharding"] = sharding
+    if stream:
+        out["streamed"] = True
+    if manifest is not None and manifest.skipped:
+        out["resumed"] = {"pieces": manifest.pieces, "skipped": manifest.skipped}
+    if throughput is not None:
+        out["throughput"] = throughput
+    return to_json(out)
 
 
 # Assemble the shared Args docs into each query tool's docstring BEFORE
@@ -850,6 +2379,8 @@ stage_query.__doc__ = f"""{stage_query.__doc__}
 query_data.__doc__ = f"""{query_data.__doc__}
     Args:
 {_QUERY_PARAM_DOCS}
+        fit_to_budget: For a gridded dataset larger than the inline limit, pick the finest time_resolution (then geofilter_resolution) that fits, confirm by re-staging, and return that result with a fit_to_budget report of what changed. Default false.
+        stats: For a gridded dataset larger than the inline limit (summarized lazily), also compute each variable's min, max, mean and NaN fraction by streaming over its chunks, within a time limit; a partial scan is flagged. Default false.
 
     Returns:
         JSON with the result data (coordinate-attributed records) or a
@@ -859,9 +2390,12 @@ query_data.__doc__ = f"""{query_data.__doc__}
 export_query.__doc__ = f"""{export_query.__doc__}
     Args:
         path: Local (stdio) destination file path (required on stdio; parent directories are created; confined to OCEANUM_MCP_EXPORT_DIR when set). Ignored on hosted servers, which return a download URL.
-        format: Output format: netcdf (datasets), parquet or csv (tabular). Defaults by container: dataset -> netcdf, tabular -> parquet.
+        format: Output format: netcdf or zarr (datasets), parquet or csv (tabular). Defaults by container: dataset -> netcdf, tabular -> parquet. zarr writes a local store directory, chunked like the source, with chunks written in parallel (local export only).
         overwrite: Overwrite an existing local file (default false). Local export only.
 {_QUERY_PARAM_DOCS}
+        sharded: Split a tabular export into sub-queries along its time range, series times, or largest coord_filters selection, fetch them concurrently, and append them to the file in order; avoids the per-query row cap and downloads faster. Local tabular export only; not with limit or aggregate_operations. Default false.
+        compression: Chunk compression of a zarr export: a Blosc codec (lz4, zstd, zlib, blosclz) or none. Default: the source's codec, else Zarr's default.
+        compression_level: Compression level 1-9 for compression (default 5).
 
     Returns:
         Hosted: JSON with a signed download_url, format, size, container, and
@@ -870,7 +2404,7 @@ export_query.__doc__ = f"""{export_query.__doc__}
     """
 
 stage_query = mcp.tool(annotations=READ_TOOL)(stage_query)
-query_data = mcp.tool(annotations=READ_TOOL)(query_data)
+query_data = mcp.tool(annotations=READ_TOOL)(_admitted(query_data))
 export_query = mcp.tool(
     annotations={
         "readOnlyHint": False,
@@ -878,14 +2412,84 @@ export_query = mcp.tool(
         "idempotentHint": True,
         "openWorldHint": True,
     }
-)(export_query)
+)(_admitted(export_query))
+
+
+async def _refetch_pages(
+    conn: Connector, query: Query, page_key: tuple[str, str]
+) -> Any:
+    """Download a cursor's query again after its table left the store."""
+    stage = await _cached_stage(conn, query)
+    if stage is None:
+        return None
+    data = await _run_sync(
+        _fetch_staged, conn, query, stage, use_dask=False, captured=[]
+    )
+    table = records_frame(data)
+    if table is not None:
+        nbytes = int(table.memory_usage(deep=True).sum())
+        _page_store.set(page_key, table, nbytes)
+    return table
 
 
 @mcp.tool(annotations=READ_TOOL)
-def load_datasource(datasource_id: str) -> str:
+@_admitted
+async def fetch_page(cursor: str, offset: int = 0, limit: int | None = None) -> str:
+    """Fetch more rows of a truncated query_data result, without re-querying.
+
+    query_data returns a cursor when it shows only the first rows of a
+    result; the downloaded result is kept server-side for a while, so each
+    page is served from memory.
+
+    Args:
+        cursor: The cursor from a query_data response.
+        offset: Index of the first row to return (0-based).
+        limit: Number of rows to return (default and maximum: the inline row limit).
+
+    Returns:
+        JSON with the cursor, total rows, offset, the page's records, and
+        next_offset (null after the last page).
+    """
+    if offset < 0:
+        raise ToolError("offset must not be negative.")
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1.")
+    limit = min(limit or max_inline_rows(), max_inline_rows())
+
+    page_key = (credential_key(), cursor)
+    table = _page_store.get(page_key)
+    if table is None:
+        query = _cursor_queries.get(page_key)
+        if query is None:
+            raise ToolError(
+                "Unknown or expired cursor; run query_data again for a new one."
+            )
+        conn = await _connector()
+        try:
+            table = await _inflight.do(
+                ("pages", *page_key), lambda: _refetch_pages(conn, query, page_key)
+            )
+        except _DATAMESH_ERRORS as exc:
+            return to_json({"error": str(exc), "query": _query_echo(query)})
+        if table is None:
+            return to_json(
+                {
+                    "status": "no_data",
+                    "message": "The query behind this cursor no longer returns data.",
+                    "query": _query_echo(query),
+                }
+            )
+    page = await _run_sync(page_records, table, offset, limit)
+    return to_json({"cursor": cursor, **page})
+
+
+@mcp.tool(annotations=READ_TOOL)
+@_admitted
+async def load_datasource(datasource_id: str) -> str:
     """Summarize an entire datasource.
 
-    Gridded datasources are opened lazily (no data download). Tabular
+    Gridded datasources are opened lazily; only a preview of their first
+    chunk is downloaded. Tabular
     datasources are downloaded only if under the inline size limit; use
     query_data with filters to retrieve larger ones.
 
@@ -896,14 +2500,14 @@ def load_datasource(datasource_id: str) -> str:
         JSON structure summary with shape, variables, and preview values for
         small datasources.
     """
-    conn = get_datamesh_connector()
+    conn = await _connector()
     try:
         query = Query(datasource=datasource_id)
     except (ValueError, TypeError) as exc:
         raise ToolError(f"Invalid datasource_id: {exc}") from exc
     warnings: list[str] = []
     try:
-        stage = _stage(conn, query)
+        stage = await _stage(conn, query)
         if stage is None:
             return to_json(
                 {
@@ -924,11 +2528,14 @@ def load_datasource(datasource_id: str) -> str:
                 f"filters{export_clause()}.",
                 datasource_id=datasource_id,
             )
-        with _captured_warnings(warnings):
-            data = conn.load_datasource(datasource_id)
+        data = await _run_sync(
+            _load_staged, conn, datasource_id, stage, captured=warnings
+        )
+        # Summarizing a lazy dataset reads chunks through the gateway too.
+        summary = await _run_sync(summarize_data, data, warnings=warnings)
     except _DATAMESH_ERRORS as exc:
         return to_json({"error": str(exc), "datasource_id": datasource_id})
-    return to_json(summarize_data(data, warnings=warnings))
+    return to_json(summary)
 
 
 # ---------------------------------------------------------------------------
@@ -944,7 +2551,7 @@ def load_datasource(datasource_id: str) -> str:
         "openWorldHint": True,
     }
 )
-def update_metadata(
+async def update_metadata(
     datasource_id: str,
     name: str | None = None,
     description: str | None = None,
@@ -970,7 +2577,7 @@ def update_metadata(
     Returns:
         Updated datasource metadata.
     """
-    conn = get_datamesh_connector()
+    conn = await _connector()
 
     props: dict[str, Any] = {}
     if name is not None:
@@ -986,7 +2593,16 @@ def update_metadata(
     if details is not None:
         props["details"] = details
 
-    ds = conn.update_metadata(datasource_id, **props)
+    # Read-modify-write through the library's Datasource model.
+    ds = await _run_sync(conn.update_metadata, datasource_id, **props)
+    _invalidate_datasource(datasource_id)
+    # The gateway's response is the new metadata, as the caller sees it.
+    _datasource_cache.set((credential_key(), datasource_id), (time.monotonic(), ds))
+    # The caller's own searches see the change at once; other credentials'
+    # mirrors pick it up within the refresh interval.
+    mirror = _catalog_mirrors.get(credential_key())
+    if mirror is not None:
+        mirror.expire()
     return to_json(format_datasource(ds))
 
 
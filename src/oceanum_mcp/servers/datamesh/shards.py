@@ -0,0 +1,161 @@
+"""Splitting a tabular query into disjoint sub-queries (shards).
+
+A sharded export stages and downloads the shards concurrently and
+concatenates them, so a large result downloads several times faster and
+is not truncated at the gateway's per-query row cap. The shards partition
+the original query along one axis, tried in this order:
+
+- a time range, cut into near-equal intervals;
+- a series time selection, cut into groups of times;
+- the coord_filters selection with the most values, cut into groups.
+
+Range shards end one microsecond before the next begins, so a row stamped
+exactly on a boundary lands in one shard only. The first and last shards
+keep the query's own bounds, open if the query left them open: the
+datasource's coverage in the catalog may be stale, so it only places the
+split points between shards. A range resampled to a time_resolution is split
+only on that resolution's bin boundaries, so no bin is averaged in two
+shards; a resolution whose bins depend on where the data starts (7D, W, ME)
+is not split by time at all.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+import pandas as pd
+from oceanum.datamesh.datasource import Datasource
+from oceanum.datamesh.query import Query
+
+from oceanum_mcp.servers.datamesh.downsample import resolve_time
+
+_BOUNDARY = pd.Timedelta(microseconds=1)
+
+
+def _groups(values: list[Any], n: int) -> list[list[Any]]:
+    """values cut into min(n, len(values)) contiguous, near-equal groups."""
+    n = min(n, len(values))
+    size, extra = divmod(len(values), n)
+    groups, start = [], 0
+    for i in range(n):
+        end = start + size + (i < extra)
+        groups.append(values[start:end])
+        start = end
+    return groups
+
+
+def _bin_starts(
+    start: pd.Timestamp, end: pd.Timestamp, resolution: str
+) -> pd.DatetimeIndex | None:
+    """Bin boundaries of resampling to resolution within [start, end].
+
+    None if the bins are anchored to the first time in the data, which is
+    not known here: steps that do not divide a day, and calendar offsets
+    other than month, quarter and year starts.
+    """
+    try:
+        offset = pd.tseries.frequencies.to_offset(resolution)
+    except ValueError:
+        return None
+    if isinstance(offset, (pd.offsets.Tick, pd.offsets.Day)):
+        origin = pd.Timestamp("2001-01-01")
+        step = (origin + offset) - origin
+        if step <= pd.Timedelta(0) or pd.Timedelta(days=1) % step:
+            return None
+        return pd.date_range(start.floor("D"), end, freq=offset)
+    if isinstance(
+        offset, (pd.offsets.MonthBegin, pd.offsets.QuarterBegin, pd.offsets.YearBegin)
+    ):
+        return pd.date_range(start, end, freq=offset)
+    return None
+
+
+def _split_points(
+    start: pd.Timestamp, end: pd.Timestamp, n: int, resolution: str
+) -> list[pd.Timestamp]:
+    """Up to n - 1 times strictly inside (start, end) to cut the range at."""
+    points = pd.date_range(start, end, periods=n + 1)[1:-1]
+    if resolution != "native":
+        bins = _bin_starts(start, end, resolution)
+        if bins is None or len(bins) == 0:
+            return []
+        # Each point moves back to the start of the bin it falls in.
+        points = bins[(bins.searchsorted(points, side="right") - 1).clip(0)]
+    elif (end - start) / n >= pd.Timedelta(seconds=2):
+        # Whole-second boundaries keep the shards' times readable.
+        points = points.floor("s")
+    return sorted({point for point in points if start < point < end})
+
+
+def _split_range(
+    echo: dict[str, Any], query: Query, ds: Datasource, n: int
+) -> list[dict[str, Any]] | None:
+    timefilter = echo.get("timefilter") or {"type": "range", "times": [None, None]}
+    times = query.timefilter.times if query.timefilter else [None, None]
+    start, end = (resolve_time(t) for t in times)
+    # The split points are placed within the query's range clipped to the
+    # catalog's coverage; the shards themselves keep the query's bounds.
+    lower, upper = start, end
+    if ds.tstart is not None:
+        tstart = resolve_time(ds.tstart)
+        tend = resolve_time(ds.tend or datetime.timedelta(0))
+        lower = tstart if start is None else max(start, tstart)
+        upper = tend if end is None else min(end, tend)
+    if lower is None or upper is None or upper - lower <= _BOUNDARY * n:
+        return None
+    points = _split_points(lower, upper, n, timefilter.get("resolution") or "native")
+    if not points:
+        return None
+    edges: list[Any] = [timefilter["times"][0], *points, timefilter["times"][1]]
+    shards = []
+    for i in range(len(points) + 1):
+        first, last = edges[i], edges[i + 1]
+        if isinstance(first, pd.Timestamp):
+            first = first.isoformat()
+        if isinstance(last, pd.Timestamp):
+            last = (last - _BOUNDARY).isoformat()
+        shards.append(
+            {
+                **echo,
+                "timefilter": {**timefilter, "type": "range", "times": [first, last]},
+            }
+        )
+    return shards
+
+
+def shard_queries(
+    query: Query, ds: Datasource, n: int
+) -> tuple[str, list[Query]] | None:
+    """(axis description, up to n shards) of a query; None if it cannot split.
+
+    Fewer than n shards come back when the chosen selection has fewer
+    values than that.
+    """
+    echo = query.model_dump(mode="json", exclude_none=True, warnings=False)
+    timefilter = echo.get("timefilter")
+    shards: list[dict[str, Any]] | None = None
+    axis = "time"
+    if timefilter is None or timefilter["type"] == "range":
+        shards = _split_range(echo, query, ds, n)
+    elif timefilter["type"] == "series" and len(timefilter["times"]) > 1:
+        shards = [
+            {**echo, "timefilter": {**timefilter, "times": group}}
+            for group in _groups(timefilter["times"], n)
+        ]
+    if shards is None:
+        selections = echo.get("coordfilter") or []
+        widest = max(
+            range(len(selections)),
+            key=lambda i: len(selections[i]["values"]),
+            default=None,
+        )
+        if widest is None or len(selections[widest]["values"]) < 2:
+            return None
+        axis = f"coord:{selections[widest]['coord']}"
+        shards = []
+        for group in _groups(selections[widest]["values"], n):
+            coordfilter = list(selections)
+            coordfilter[widest] = {**selections[widest], "values": group}
+            shards.append({**echo, "coordfilter": coordfilter})
+    return axis, [Query(**shard) for shard in shards]
@@ -0,0 +1,496 @@
+"""Incremental file writers for local (stdio) exports.
+
+A streaming tabular export downloads its result as a sequence of
+sub-queries and appends each piece to the destination file as it arrives,
+so memory holds one piece at a time rather than the whole result.
+
+A lazy (zarr-backed) dataset export is latency-bound: every chunk is a
+separate request. write_netcdf fetches chunks on a pool of workers of its
+own while the NetCDF writes, which the HDF5 library serialises, proceed
+one at a time; the number of workers is capped so the chunks they hold fit
+a byte window.
+
+Pieces of one result can disagree on column types (an all-null column, or
+integers that became floats where another piece had gaps). The first piece
+fixes the file's columns and Parquet schema; later pieces are conformed to
+it, and a piece that cannot be cast is an error.
+
+Both kinds of export can resume after a failure (a chunk fetch error, a
+full disk). Each is cut into numbered pieces — sub-queries saved as part
+files until the last one lands, or slabs of a Zarr store written by
+region — and an ExportManifest next to the destination records the plan
+and the pieces finished. Running the same export again finds the manifest
+and writes only the pieces it lacks.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+import dask
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xarray as xr
+from dask.callbacks import Callback
+
+from oceanum_mcp.common.cancellation import dask_callbacks, raise_if_cancelled
+
+# Called with (chunks written so far, chunks in the export) as a write
+# proceeds; estimated from the share of dask tasks finished.
+ChunkProgress = Callable[[int, int], None]
+
+
+class ExportManifest:
+    """Sidecar record of the pieces of an export already on disk.
+
+    The identity (canonical query, format, and settings) says which export
+    the record belongs to; the plan says how that export was cut into
+    `pieces` numbered pieces. The plan is saved before the first piece is
+    written and `done` after each one, by atomic replacement, so the file is
+    never half-written. With path None the record lives in memory only.
+    """
+
+    def __init__(self, path: Path | None, identity: dict[str, Any]) -> None:
+        self.path = path
+        # Round-tripped through JSON so it compares equal to a saved one.
+        self.identity = json.loads(json.dumps(identity))
+        self.plan: Any = None
+        self.pieces = 0
+        self.done: set[int] = set()
+        # Pieces already done when this run started.
+        self.skipped = 0
+
+    def load(self) -> bool:
+        """Take up the saved plan and progress, if saved for this identity."""
+        if self.path is None:
+            return False
+        try:
+            saved = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return False
+        if not isinstance(saved, dict) or saved.get("identity") != self.identity:
+            return False
+        self.plan = saved.get("plan")
+        self.pieces = int(saved.get("pieces", 0))
+        self.done = set(saved.get("done", ()))
+        return True
+
+    def start(self, plan: Any, pieces: int) -> bool:
+        """Write under plan from here on; True if it continues the saved one.
+
+        A plan other than the saved one starts the record over.
+        """
+        plan = json.loads(json.dumps(plan))
+        resumed = plan == self.plan and pieces == self.pieces
+        if not resumed:
+            self.plan, self.pieces, self.done = plan, pieces, set()
+            self._save()
+        self.skipped = len(self.done)
+        return resumed
+
+    def remaining(self) -> list[int]:
+        return [piece for piece in range(self.pieces) if piece not in self.done]
+
+    def complete(self, piece: int) -> None:
+        self.done.add(piece)
+        self._save()
+
+    def discard(self) -> None:
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "identity": self.identity,
+            "plan": self.plan,
+            "pieces": self.pieces,
+            "done": sorted(self.done),
+        }
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(record))
+        os.replace(tmp, self.path)
+
+
+def manifest_path(dest: Path) -> Path:
+    """Where the manifest of an export to dest lives."""
+    return dest.with_name(f"{dest.name}.manifest.json")
+
+
+def parts_path(dest: Path) -> Path:
+    """Directory holding the finished pieces of a streamed export to dest."""
+    return dest.with_name(f"{dest.name}.parts")
+
+
+class TableWriter:
+    """Appends DataFrames to a Parquet (one row group each) or CSV file.
+
+    Not thread-safe; one export drives it from one worker thread at a time.
+    """
+
+    def __init__(self, dest: Path, fmt: Literal["parquet", "csv"]) -> None:
+        self.dest = dest
+        self.fmt = fmt
+        self.rows = 0
+        # Zero-row frame with the file's columns and dtypes, once known.
+        self.template: pd.DataFrame | None = None
+        self._parquet: pq.ParquetWriter | None = None
+        self._schema: pa.Schema | None = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        first = self.template is None
+        if first:
+            self.dest.parent.mkdir(parents=True, exist_ok=True)
+            self.template = frame.iloc[:0]
+        else:
+            frame = frame.reindex(columns=self.template.columns)
+        if self.fmt == "parquet":
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._schema = table.schema
+                self._parquet = pq.ParquetWriter(self.dest, self._schema)
+            elif not table.schema.equals(self._schema):
+                try:
+                    table = table.cast(self._schema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+                    raise ValueError(
+                        f"Rows {self.rows}+ do not match the columns written "
+                        f"so far: {exc}"
+                    ) from exc
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(
+                self.dest, mode="w" if first else "a", header=first, index=False
+            )
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def write_part(parts: Path, piece: int, frame: pd.DataFrame) -> None:
+    """Save one piece of a streamed tabular export as Parquet, atomically."""
+    parts.mkdir(parents=True, exist_ok=True)
+    tmp = parts / f".{piece:05d}.tmp"
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, parts / f"{piece:05d}.parquet")
+
+
+def assemble_parts(
+    parts: Path, pieces: int, dest: Path, fmt: Literal["parquet", "csv"]
+) -> TableWriter:
+    """Append the saved pieces to dest in order, one in memory at a time.
+
+    Pieces without a part file had no rows. Returns the (closed) writer for
+    its row count and template; the part files are left for the caller.
+    """
+    writer = TableWriter(dest, fmt)
+    try:
+        for piece in range(pieces):
+            raise_if_cancelled()
+            part = parts / f"{piece:05d}.parquet"
+            if part.exists():
+                writer.write(pd.read_parquet(part))
+    finally:
+        writer.close()
+    return writer
+
+
+def _chunk_stats(ds: xr.Dataset) -> tuple[int, int]:
+    """(number of chunks, bytes of the largest chunk) over a dataset's variables."""
+    count = largest = 0
+    for var in ds.variables.values():
+        if var.chunks is None:
+            continue
+        count += math.prod(len(c) for c in var.chunks)
+        largest = max(
+            largest, math.prod(max(c) for c in var.chunks) * var.dtype.itemsize
+        )
+    return count, largest
+
+
+class _TaskCounter(Callback):
+    """Reports a dask computation's finished tasks as chunks to a ChunkProgress.
+
+    The computation covers `chunks` of the export's `total`, after `offset`
+    already written. Passed to one compute() call rather than registered
+    globally, so concurrent exports do not see each other's tasks.
+    """
+
+    def __init__(
+        self, report: ChunkProgress, offset: int, chunks: int, total: int
+    ) -> None:
+        self._report = report
+        self._offset = offset
+        self._chunks = chunks
+        self._total = total
+        self._tasks = 1
+
+    def _start_state(self, dsk: Any, state: dict[str, Any]) -> None:
+        states = ("ready", "waiting", "running", "finished")
+        self._tasks = max(1, sum(len(state[k]) for k in states))
+
+    def _posttask(self, key: Any, result: Any, dsk: Any, state: Any, id: Any) -> None:
+        done = self._chunks * len(state["finished"]) // self._tasks
+        self._report(self._offset + done, self._total)
+
+
+def _compute(
+    store: Any,
+    pool: ThreadPoolExecutor,
+    progress: ChunkProgress | None = None,
+    offset: int = 0,
+    chunks: int = 0,
+    total: int = 0,
+) -> None:
+    callbacks = dask_callbacks()
+    if progress is not None:
+        callbacks.append(_TaskCounter(progress, offset, chunks, total)._callback)
+    dask.compute(store, scheduler="threads", pool=pool, callbacks=callbacks)
+
+
+def _pool_size(ds: xr.Dataset, workers: int, window_bytes: int) -> int:
+    """workers, fewer if that many of the largest chunk would exceed
+    window_bytes (never fewer than one)."""
+    _, largest = _chunk_stats(ds)
+    if largest:
+        return max(1, min(workers, window_bytes // largest))
+    return workers
+
+
+def _report(workers: int, chunks: int, nbytes: int, started: float) -> dict[str, Any]:
+    seconds = max(time.monotonic() - started, 1e-6)
+    return {
+        "workers": workers,
+        "chunks": chunks,
+        "bytes": int(nbytes),
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(nbytes / 1e6 / seconds, 2),
+        "chunks_per_s": round(chunks / seconds, 2),
+    }
+
+
+def _run_store(
+    ds: xr.Dataset,
+    store: Any,
+    workers: int,
+    window_bytes: int,
+    progress: ChunkProgress | None = None,
+) -> dict[str, Any]:
+    """Compute a delayed store of ds on a dedicated pool; the throughput report.
+
+    At most `workers` chunks are fetched at once (see _pool_size).
+    """
+    workers = _pool_size(ds, workers, window_bytes)
+    chunks = _chunk_stats(ds)[0]
+    started = time.monotonic()
+    with ThreadPoolExecutor(workers, thread_name_prefix="export") as pool:
+        _compute(store, pool, progress, 0, chunks, chunks)
+    return _report(workers, chunks, ds.nbytes, started)
+
+
+def write_netcdf(
+    ds: xr.Dataset,
+    dest: Path,
+    workers: int,
+    window_bytes: int,
+    progress: ChunkProgress | None = None,
+) -> dict[str, Any]:
+    """Write a dataset to NetCDF, fetching lazy chunks concurrently.
+
+    Returns the throughput report for the export response.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    store = ds.to_netcdf(dest, compute=False)
+    return _run_store(ds, store, workers, window_bytes, progress)
+
+
+# Blosc codecs format="zarr" exports accept as `compression`; "none" writes
+# uncompressed chunks. Levels run 1-9 (default 5).
+ZARR_CODECS = ("lz4", "zstd", "zlib", "blosclz")
+_ZARR_DEFAULT_LEVEL = 5
+
+# Chunks per worker in each piece of a Zarr export: pieces are what a resumed
+# export skips, so they stay small, but each keeps the pool busy.
+_CHUNKS_PER_WORKER = 4
+
+# Source encodings that carry over to a Zarr store: CF packing and time
+# units. Backend-specific ones (NetCDF zlib/contiguous, source chunking)
+# would be rejected or misapplied.
+_ZARR_KEPT_ENCODING = (
+    "dtype",
+    "_FillValue",
+    "scale_factor",
+    "add_offset",
+    "units",
+    "calendar",
+)
+
+
+def is_zarr_store(path: Path) -> bool:
+    """Whether path holds Zarr (v2 or v3) group metadata."""
+    return any(
+        (path / name).exists() for name in (".zgroup", ".zmetadata", "zarr.json")
+    )
+
+
+def _zarr_encoding(
+    ds: xr.Dataset, compression: str | None, level: int | None
+) -> tuple[xr.Dataset, dict[str, dict[str, Any]]]:
+    """(dataset with Zarr-compatible chunks, per-variable encoding).
+
+    Zarr needs equal chunks along each dimension (the last may be shorter);
+    irregular dask chunking is evened out to its largest chunk, and every
+    variable is written with its (first) dask chunk as the store chunk, so
+    each dask task writes whole chunks of its own.
+    """
+    compressor: Any = "source"
+    if compression == "none":
+        compressor = None
+    elif compression is not None:
+        from numcodecs import Blosc
+
+        compressor = Blosc(
+            cname=compression,
+            clevel=_ZARR_DEFAULT_LEVEL if level is None else level,
+            shuffle=Blosc.SHUFFLE,
+        )
+    encoding: dict[str, dict[str, Any]] = {}
+    for name, var in ds.variables.items():
+        enc = {k: v for k, v in var.encoding.items() if k in _ZARR_KEPT_ENCODING}
+        if var.chunks is not None:
+            uneven = {
+                dim: max(c)
+                for dim, c in zip(var.dims, var.chunks)
+                if len(set(c[:-1])) > 1 or c[-1] > c[0]
+            }
+            if uneven:
+                ds[name] = var = var.chunk(uneven)
+            enc["chunks"] = tuple(c[0] for c in var.chunks)
+        if compressor != "source":
+            enc["compressor"] = compressor
+        elif "compressor" in var.encoding:
+            enc["compressor"] = var.encoding["compressor"]
+        encoding[str(name)] = enc
+    return ds, encoding
+
+
+def _zarr_slabs(ds: xr.Dataset, workers: int) -> tuple[str | None, list[int]]:
+    """(dimension, edges along it) of the slabs a Zarr export is written in.
+
+    The dimension is the leading one of the largest lazy variable. Edges
+    fall on chunk boundaries every lazy variable along it shares, so slabs
+    written by region never share a store chunk, and are spaced to span
+    about _CHUNKS_PER_WORKER chunks per worker.
+    """
+    lazy = [var for var in ds.variables.values() if var.chunks and var.ndim]
+    if not lazy:
+        return None, []
+    dim = max(lazy, key=lambda var: var.size).dims[0]
+    if not ds.sizes[dim]:
+        return None, []
+    common: set[int] | None = None
+    chunks = 0
+    for var in lazy:
+        if dim not in var.dims:
+            continue
+        sizes = var.chunks[var.dims.index(dim)]
+        edges = set(itertools.accumulate(sizes, initial=0))
+        common = edges if common is None else common & edges
+        chunks += math.prod(len(c) for c in var.chunks)
+    edges = sorted(common or ())
+    step = max(1, math.ceil(workers * _CHUNKS_PER_WORKER * (len(edges) - 1) / chunks))
+    slabs = edges[::step]
+    if slabs[-1] != edges[-1]:
+        slabs.append(edges[-1])
+    return str(dim), [int(edge) for edge in slabs]
+
+
+def _zarr_piece(
+    ds: xr.Dataset, dim: str | None, edges: list[int], piece: int
+) -> tuple[xr.Dataset, dict[str, slice] | None]:
+    """(variables, store region) of one piece of a Zarr export.
+
+    Piece 0 holds the lazy variables without the slab dimension, written
+    whole; piece i the slab between edges i-1 and i.
+    """
+    if piece == 0:
+        doomed = [n for n, v in ds.variables.items() if not v.chunks or dim in v.dims]
+        return ds.drop_vars(doomed), None
+    region = {dim: slice(edges[piece - 1], edges[piece])}
+    part = ds.isel(region)
+    return (
+        part.drop_vars([n for n, v in part.variables.items() if dim not in v.dims]),
+        region,
+    )
+
+
+def write_zarr(
+    ds: xr.Dataset,
+    dest: Path,
+    workers: int,
+    window_bytes: int,
+    compression: str | None = None,
+    level: int | None = None,
+    manifest: ExportManifest | None = None,
+    progress: ChunkProgress | None = None,
+) -> dict[str, Any]:
+    """Write a dataset to a Zarr store, chunk-aligned and in parallel.
+
+    The store's chunks follow the dataset's dask (source) chunks, so
+    workers write distinct chunks without locking. compression is one of
+    ZARR_CODECS or "none"; None keeps the source's compressor if it had
+    one, else Zarr's default.
+
+    The store is written in pieces, each recorded in manifest when done:
+    first the metadata and the variables without the slab dimension, then
+    slabs along it (see _zarr_slabs). If manifest continues an earlier run
+    with the same slabs, the pieces it lists are skipped and the store that
+    run left is completed; otherwise an existing store at dest is replaced.
+    Returns the throughput report (of the pieces written) for the export
+    response.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    ds, encoding = _zarr_encoding(ds.copy(), compression, level)
+    dim, edges = _zarr_slabs(ds, workers)
+    if manifest is None:
+        manifest = ExportManifest(None, {})
+    manifest.start({"dim": dim, "edges": edges}, max(len(edges), 1))
+    workers = _pool_size(ds, workers, window_bytes)
+    chunks = nbytes = 0
+    # Pieces skipped on a resume count as written for progress.
+    total = _chunk_stats(ds)[0]
+    offset = total - sum(
+        _chunk_stats(_zarr_piece(ds, dim, edges, piece)[0])[0]
+        for piece in manifest.remaining()
+    )
+    started = time.monotonic()
+    with ThreadPoolExecutor(workers, thread_name_prefix="export") as pool:
+        for piece in manifest.remaining():
+            raise_if_cancelled()
+            if piece == 0:
+                # Metadata and in-memory variables are written here; the
+                # delayed write of the lazy ones is left to the pieces.
+                ds.to_zarr(dest, mode="w", encoding=encoding, compute=False)
+            part, region = _zarr_piece(ds, dim, edges, piece)
+            if part.variables:
+                # Existing arrays keep the store's encoding; none is passed.
+                store = part.to_zarr(dest, mode="r+", region=region, compute=False)
+                count = _chunk_stats(part)[0]
+                _compute(store, pool, progress, offset + chunks, count, total)
+                chunks += count
+                nbytes += part.nbytes
+            manifest.complete(piece)
+    return _report(workers, chunks, nbytes, started)
@@ -1,12 +1,14 @@
 """Shared test fixtures.
 
 Tests run against the real fastmcp and oceanum packages; only the network
-boundary (Connector / FileSystem / staging) is mocked.
+boundary (Connector / FileSystem / staging / staged download, or the async
+gateway client's transport) is mocked.
 """
 
-from typing import Iterator
+from typing import Any, Callable, Iterator
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
 from oceanum.datamesh.query import Container, Query, Stage
@@ -33,15 +35,112 @@ def make_stage(
 
 @pytest.fixture
 def mock_conn() -> Iterator[MagicMock]:
-    """Mock Connector patched into the datamesh server module."""
+    """Mock Connector patched into the datamesh server module.
+
+    The calling credential is pinned too, since per-user caches key on it.
+    Datasource `modified` timestamps are reported unknown, which keeps the
+    query_data result cache out of the way; result cache tests set one.
+    """
     conn = MagicMock()
-    with patch.object(datamesh_server, "get_datamesh_connector", return_value=conn):
+    with (
+        patch.object(datamesh_server, "get_datamesh_connector", return_value=conn),
+        patch.object(datamesh_server, "credential_key", return_value="test-user"),
+        patch.object(datamesh_server, "_datasource_modified", return_value=None),
+    ):
         yield conn
 
 
+@pytest.fixture(autouse=True)
+def clean_datamesh_caches() -> Iterator[None]:
+    """Per-user datamesh caches must not leak entries between tests."""
+    caches = (
+        datamesh_server._datasource_cache,
+        datamesh_server._stage_cache,
+        datamesh_server._download_cache,
+        datamesh_server._result_cache,
+        datamesh_server._catalog_mirrors,
+        datamesh_server._page_store,
+        datamesh_server._cursor_queries,
+        datamesh_server._inflight,
+        datamesh_server._admission,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
 @pytest.fixture
 def mock_stage() -> Iterator[MagicMock]:
     """Patch the datamesh server's staging helper; defaults to a small dataset."""
     with patch.object(datamesh_server, "_stage") as stager:
         stager.return_value = make_stage()
         yield stager
+
+
+@pytest.fixture
+def mock_fetch() -> Iterator[MagicMock]:
+    """Patch the datamesh server's download-from-stage helper."""
+    with patch.object(datamesh_server, "_fetch_staged") as fetcher:
+        yield fetcher
+
+
+class FakeGateway:
+    """Canned Datamesh gateway behind an httpx.MockTransport.
+
+    Sessions are served automatically; other endpoints answer from `routes`,
+    keyed by (method, path), with an httpx.Response or a callable taking the
+    request. Every request is recorded for assertions.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], Any] = {}
+        self.requests: list[httpx.Request] = []
+
+    def route(
+        self,
+        method: str,
+        path: str,
+        response: httpx.Response | Callable[[httpx.Request], httpx.Response],
+    ) -> None:
+        self.routes[(method, path)] = response
+
+    def calls(self, method: str, path: str) -> list[httpx.Request]:
+        return [r for r in self.requests if r.method == method and r.url.path == path]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        key = (request.method, request.url.path)
+        if key in self.routes:
+            response = self.routes[key]
+            return response(request) if callable(response) else response
+        if key == ("GET", "/session/"):
+            return httpx.Response(
+                200,
+                json={
+                    "id": "sess-1",
+                    "user": "test-user",
+                    "creation_time": "2024-01-01T00:00:00Z",
+                    "end_time": "2024-01-01T01:00:00Z",
+                    "write": False,
+                },
+            )
+        if request.method == "DELETE" and request.url.path.startswith("/session/"):
+            return httpx.Response(200)
+        return httpx.Response(404, json={"detail": f"no route {key}"})
+
+
+@pytest.fixture
+def gateway_http(
+    mock_conn: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[FakeGateway]:
+    """Route the server's shared async gateway client to a FakeGateway."""
+    monkeypatch.setenv("DATAMESH_SERVICE", "https://gw.test")
+    mock_conn._gateway = "https://gw.test"
+    mock_conn._auth_headers = {"Authorization": "Token test"}
+    mock_conn._session_params = {}
+    fake = FakeGateway()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    with patch.object(datamesh_server, "get_gateway_http", return_value=client):
+        yield fake
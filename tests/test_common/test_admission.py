@@ -0,0 +1,85 @@
+"""Tests for per-tenant admission control."""
+
+import asyncio
+
+import pytest
+
+from oceanum_mcp.common.admission import AdmissionControl, Busy
+
+
+async def test_tenant_limit_queues_without_blocking_other_tenants():
+    admission = AdmissionControl(max_calls=3, tenant_calls=1, queue=4, timeout_s=5)
+    started = await admission.acquire("heavy")
+    waiting = asyncio.ensure_future(admission.acquire("heavy"))
+    await asyncio.sleep(0)
+    assert admission.stats()["waiting"] == 1
+
+    # Another tenant runs at once despite the heavy tenant's queued call.
+    other = await admission.acquire("light")
+    assert admission.stats()["running"] == 2
+
+    admission.release("heavy", started)
+    second = await waiting
+    admission.release("heavy", second)
+    admission.release("light", other)
+    assert admission.stats() == {
+        "running": 0,
+        "waiting": 0,
+        "admitted": 3,
+        "refused": 0,
+    }
+
+
+async def test_freed_slot_goes_to_first_waiter_that_can_run():
+    admission = AdmissionControl(max_calls=2, tenant_calls=2, queue=4, timeout_s=5)
+    heavy = [await admission.acquire("heavy") for _ in range(2)]
+    order = []
+
+    async def call(tenant):
+        await admission.acquire(tenant)
+        order.append(tenant)
+
+    waiters = [
+        asyncio.ensure_future(call(tenant)) for tenant in ("heavy", "light", "heavy")
+    ]
+    await asyncio.sleep(0)
+    admission.release("heavy", heavy[0])
+    admission.release("heavy", heavy[1])
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert order == ["heavy", "light"]
+    assert admission.stats()["waiting"] == 1
+    for waiter in waiters:
+        waiter.cancel()
+
+
+async def test_full_line_and_timeout_are_busy():
+    admission = AdmissionControl(max_calls=1, tenant_calls=1, queue=1, timeout_s=0.01)
+    started = await admission.acquire("a")
+    waiting = asyncio.ensure_future(admission.acquire("a"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Busy, match="1 running, 1 waiting") as full:
+        await admission.acquire("a")
+    assert full.value.retry_after_s == 5  # no call has finished yet
+    with pytest.raises(Busy, match="No free slot"):
+        await waiting
+
+    admission.release("a", started)
+    assert admission.stats()["refused"] == 2
+    assert admission.stats()["running"] == 0
+
+
+async def test_cancelled_waiter_gives_back_its_slot():
+    admission = AdmissionControl(max_calls=1, tenant_calls=1, queue=2, timeout_s=5)
+    started = await admission.acquire("a")
+    cancelled = asyncio.ensure_future(admission.acquire("a"))
+    await asyncio.sleep(0)
+
+    # Granted and cancelled in the same loop iteration.
+    admission.release("a", started)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert admission.stats()["running"] == 0
+    admission.release("a", await admission.acquire("a"))
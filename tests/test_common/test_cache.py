@@ -0,0 +1,173 @@
+"""Tests for the shared in-process caches."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from oceanum_mcp.common.cache import ByteLRUCache, SingleFlight, TTLCache
+
+
+def test_get_set_counts_hits_and_misses():
+    cache = TTLCache(max_entries=4, ttl_s=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_entries_expire():
+    cache = TTLCache(max_entries=4, ttl_s=10)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_per_entry_ttl_overrides_default():
+    cache = TTLCache(max_entries=4, ttl_s=10)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1, ttl_s=1000)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=500.0):
+        assert cache.get("a") == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(max_entries=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_none_is_never_stored():
+    cache = TTLCache(max_entries=2, ttl_s=60)
+    cache.set("a", None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_by_predicate():
+    cache = TTLCache(max_entries=8, ttl_s=60)
+    cache.set(("u1", "ds-a"), 1)
+    cache.set(("u2", "ds-a"), 2)
+    cache.set(("u1", "ds-b"), 3)
+    assert cache.invalidate(lambda key: key[1] == "ds-a") == 2
+    assert cache.get(("u1", "ds-b")) == 3
+    assert cache.get(("u1", "ds-a")) is None
+
+
+def test_byte_cache_evicts_lru_by_total_size():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.set("a", "A", nbytes=4)
+    cache.set("b", "B", nbytes=4)
+    assert cache.get("a") == "A"  # b is now least recently used
+    cache.set("c", "C", nbytes=4)
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 2, "bytes": 8}
+
+
+def test_byte_cache_replacing_entry_reaccounts_size():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.set("a", "small", nbytes=2)
+    cache.set("a", "large", nbytes=9)
+    assert cache.stats()["bytes"] == 9
+    assert cache.invalidate(lambda key: key == "a") == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_byte_cache_skips_oversized_values_and_disabled_budget():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.set("big", "x", nbytes=11)
+    assert cache.get("big") is None
+    off = ByteLRUCache(max_bytes=0)
+    assert not off.enabled
+    off.set("a", "A", nbytes=1)
+    assert off.get("a") is None
+
+
+def test_byte_cache_entries_expire_and_release_bytes():
+    cache = ByteLRUCache(max_bytes=10, ttl_s=10)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=100.0):
+        cache.set("a", "A", nbytes=4)
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == "A"
+    with patch("oceanum_mcp.common.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": calls}
+
+    tasks = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    assert calls == 1
+    assert results[0] is results[1] is results[2]
+    assert flight.stats() == {"leaders": 1, "coalesced": 2, "in_flight": 0}
+
+
+async def test_single_flight_forgets_finished_calls_and_distinct_keys():
+    flight = SingleFlight()
+
+    async def work():
+        return object()
+
+    first = await flight.do("k", work)
+    assert await flight.do("k", work) is not first
+    assert await flight.do("other", work) is not first
+    assert flight.stats()["coalesced"] == 0
+
+
+async def test_single_flight_shares_exceptions():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flight.do("k", fail)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        assert isinstance(outcome, ValueError)
+
+
+async def test_single_flight_follower_retries_when_leader_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return calls
+
+    leader = asyncio.create_task(flight.do("k", work))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+    # The follower re-ran the work itself instead of inheriting the cancel.
+    assert await follower == 2
@@ -0,0 +1,56 @@
+"""Tests for cancelling blocking work on worker threads."""
+
+import threading
+import time
+
+import dask
+import dask.array as da
+import pytest
+
+from oceanum_mcp.common.cancellation import (
+    Cancelled,
+    cancellable,
+    dask_callbacks,
+    raise_if_cancelled,
+    wait,
+)
+
+
+def test_checks_do_nothing_outside_cancellable():
+    raise_if_cancelled()
+    wait(0)
+    assert dask_callbacks() == []
+
+
+def test_raises_once_event_set():
+    event = threading.Event()
+    with cancellable(event):
+        raise_if_cancelled()
+        event.set()
+        with pytest.raises(Cancelled):
+            raise_if_cancelled()
+    raise_if_cancelled()  # the event is no longer in scope
+
+
+def test_wait_returns_early_when_cancelled():
+    event = threading.Event()
+    threading.Timer(0.05, event.set).start()
+    started = time.monotonic()
+    with cancellable(event), pytest.raises(Cancelled):
+        wait(10)
+    assert time.monotonic() - started < 5
+
+
+def test_dask_compute_stops_before_next_task():
+    event = threading.Event()
+    ran = []
+
+    def work(block):
+        ran.append(block)
+        event.set()
+        return block
+
+    array = da.ones(10, chunks=1).map_blocks(work, dtype=float)
+    with cancellable(event), pytest.raises(Cancelled):
+        dask.compute(array, scheduler="sync", callbacks=dask_callbacks())
+    assert len(ran) == 1
@@ -80,6 +80,66 @@ def test_max_inline_rows_default_and_validation():
             max_inline_rows()
 
 
+def test_result_cache_bytes_default_and_validation():
+    from oceanum_mcp.common.config import result_cache_bytes
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert result_cache_bytes() == 64_000_000
+    with patch.dict(os.environ, {"OCEANUM_MCP_RESULT_CACHE_BYTES": "0"}, clear=True):
+        assert result_cache_bytes() == 0
+    for bad, match in (("-1", "not be negative"), ("lots", "integer byte count")):
+        env = {"OCEANUM_MCP_RESULT_CACHE_BYTES": bad}
+        with patch.dict(os.environ, env, clear=True):
+            with pytest.raises(ValueError, match=match):
+                result_cache_bytes()
+
+
+def test_cache_dir_only_on_stdio(tmp_path):
+    from oceanum_mcp.common.config import cache_dir, cache_dir_max_bytes
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert cache_dir() is None
+        assert cache_dir_max_bytes() == 5_000_000_000
+    with patch.dict(os.environ, {"OCEANUM_MCP_CACHE_DIR": str(tmp_path)}, clear=True):
+        assert cache_dir() == tmp_path.resolve()
+        try:
+            set_transport("http")
+            assert cache_dir() is None
+        finally:
+            set_transport("stdio")
+    with patch.dict(os.environ, {"OCEANUM_MCP_CACHE_MAX_BYTES": "0"}, clear=True):
+        with pytest.raises(ValueError, match="at least 1"):
+            cache_dir_max_bytes()
+
+
+def test_catalog_refresh_default_and_validation():
+    from oceanum_mcp.common.config import catalog_refresh_s
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert catalog_refresh_s() == 300.0
+    with patch.dict(os.environ, {"OCEANUM_MCP_CATALOG_REFRESH_S": "0"}, clear=True):
+        assert catalog_refresh_s() == 0.0
+    for bad, match in (("-5", "not be negative"), ("soon", "number of seconds")):
+        env = {"OCEANUM_MCP_CATALOG_REFRESH_S": bad}
+        with patch.dict(os.environ, env, clear=True):
+            with pytest.raises(ValueError, match=match):
+                catalog_refresh_s()
+
+
+def test_stage_concurrency_default_and_validation():
+    from oceanum_mcp.common.config import stage_concurrency
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert stage_concurrency() == 8
+    with patch.dict(os.environ, {"OCEANUM_MCP_STAGE_CONCURRENCY": "3"}, clear=True):
+        assert stage_concurrency() == 3
+    for bad, match in (("0", "at least 1"), ("many", "integer")):
+        env = {"OCEANUM_MCP_STAGE_CONCURRENCY": bad}
+        with patch.dict(os.environ, env, clear=True):
+            with pytest.raises(ValueError, match=match):
+                stage_concurrency()
+
+
 def test_transport_flag():
     assert not is_network_transport()
     try:
@@ -90,3 +150,108 @@ def test_transport_flag():
     finally:
         set_transport("stdio")
     assert not is_network_transport()
+
+
+def test_page_store_bytes_default_and_validation():
+    from oceanum_mcp.common.config import page_store_bytes
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert page_store_bytes() == 256_000_000
+    with patch.dict(os.environ, {"OCEANUM_MCP_PAGE_STORE_BYTES": "0"}, clear=True):
+        assert page_store_bytes() == 0
+    for bad, match in (("-1", "not be negative"), ("lots", "integer byte count")):
+        env = {"OCEANUM_MCP_PAGE_STORE_BYTES": bad}
+        with patch.dict(os.environ, env, clear=True):
+            with pytest.raises(ValueError, match=match):
+                page_store_bytes()
+
+
+def test_preview_bytes_default_and_validation():
+    from oceanum_mcp.common.config import preview_bytes
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert preview_bytes() == 16_000_000
+    with patch.dict(os.environ, {"OCEANUM_MCP_PREVIEW_BYTES": "0"}, clear=True):
+        assert preview_bytes() == 0
+    for bad, match in (("-1", "not be negative"), ("lots", "integer byte count")):
+        with patch.dict(os.environ, {"OCEANUM_MCP_PREVIEW_BYTES": bad}, clear=True):
+            with pytest.raises(ValueError, match=match):
+                preview_bytes()
+
+
+def test_stats_limits_default_and_validation():
+    from oceanum_mcp.common.config import stats_memory_bytes, stats_timeout_s
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert stats_timeout_s() == 20.0
+        assert stats_memory_bytes() == 512_000_000
+    env = {"OCEANUM_MCP_STATS_TIMEOUT_S": "2.5", "OCEANUM_MCP_STATS_MEMORY_BYTES": "9"}
+    with patch.dict(os.environ, env, clear=True):
+        assert stats_timeout_s() == 2.5
+        assert stats_memory_bytes() == 9
+    for name, read in (
+        ("OCEANUM_MCP_STATS_TIMEOUT_S", stats_timeout_s),
+        ("OCEANUM_MCP_STATS_MEMORY_BYTES", stats_memory_bytes),
+    ):
+        with patch.dict(os.environ, {name: "0"}, clear=True):
+            with pytest.raises(ValueError, match="positive"):
+                read()
+
+
+def test_export_chunk_bytes_default_and_validation():
+    from oceanum_mcp.common.config import export_chunk_bytes
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert export_chunk_bytes() == 256_000_000
+    for bad, match in (("0", "positive"), ("big", "integer byte count")):
+        with patch.dict(
+            os.environ, {"OCEANUM_MCP_EXPORT_CHUNK_BYTES": bad}, clear=True
+        ):
+            with pytest.raises(ValueError, match=match):
+                export_chunk_bytes()
+
+
+def test_export_engine_defaults_and_validation():
+    from oceanum_mcp.common.config import export_window_bytes, export_workers
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert export_workers() == 8
+        assert export_window_bytes() == 512_000_000
+    env = {"OCEANUM_MCP_EXPORT_WORKERS": "0", "OCEANUM_MCP_EXPORT_WINDOW_BYTES": "0"}
+    with patch.dict(os.environ, env, clear=True):
+        with pytest.raises(ValueError, match="at least 1"):
+            export_workers()
+        with pytest.raises(ValueError, match="positive"):
+            export_window_bytes()
+
+
+def test_admission_defaults_and_validation():
+    from oceanum_mcp.common.config import (
+        admission_queue,
+        admission_timeout_s,
+        max_concurrent_calls,
+        tenant_concurrent_calls,
+    )
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert max_concurrent_calls() == 16
+        assert tenant_concurrent_calls() == 4
+        assert admission_queue() == 8
+        assert admission_timeout_s() == 30.0
+    with patch.dict(os.environ, {"OCEANUM_MCP_ADMISSION_QUEUE": "0"}, clear=True):
+        assert admission_queue() == 0
+    env = {
+        "OCEANUM_MCP_MAX_CONCURRENT_CALLS": "0",
+        "OCEANUM_MCP_TENANT_CONCURRENT_CALLS": "lots",
+        "OCEANUM_MCP_ADMISSION_QUEUE": "-1",
+        "OCEANUM_MCP_ADMISSION_TIMEOUT_S": "0",
+    }
+    with patch.dict(os.environ, env, clear=True):
+        with pytest.raises(ValueError, match="at least 1"):
+            max_concurrent_calls()
+        with pytest.raises(ValueError, match="integer"):
+            tenant_concurrent_calls()
+        with pytest.raises(ValueError, match="not be negative"):
+            admission_queue()
+        with pytest.raises(ValueError, match="positive"):
+            admission_timeout_s()
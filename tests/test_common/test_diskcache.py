@@ -0,0 +1,103 @@
+"""Tests for the persistent on-disk result cache."""
+
+import os
+
+import geopandas
+import numpy as np
+import pandas as pd
+import xarray as xr
+from shapely.geometry import Point
+
+from oceanum_mcp.common.diskcache import DiskResultCache
+
+KEY = ("user-hash", "test-ds", '{"datasource": "test-ds"}')
+
+
+def test_frame_round_trips_as_parquet(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    df = pd.DataFrame({"temp": [15.0, 16.0]})
+    assert cache.put(KEY, "2024-01-01", df, warnings=["capped"])
+
+    data, meta = cache.get(KEY, "2024-01-01")
+    pd.testing.assert_frame_equal(data, df)
+    assert meta["warnings"] == ["capped"]
+    assert list((tmp_path / "user-hash").glob("*.parquet"))
+
+
+def test_dataset_round_trips_as_netcdf(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    ds = xr.Dataset({"hs": (("time",), np.array([1.0, 2.0]))})
+    cache.put(KEY, "v1", ds)
+
+    data, _ = cache.get(KEY, "v1")
+    assert data["hs"].values.tolist() == [1.0, 2.0]
+    assert list((tmp_path / "user-hash").glob("*.nc"))
+
+
+def test_geodataframe_keeps_geometry(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    gdf = geopandas.GeoDataFrame({"id": [1]}, geometry=[Point(174, -41)])
+    cache.put(KEY, "v1", gdf)
+
+    data, _ = cache.get(KEY, "v1")
+    assert isinstance(data, geopandas.GeoDataFrame)
+    assert data.geometry[0].x == 174
+
+
+def test_changed_modified_is_a_miss_and_removes_entry(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    cache.put(KEY, "v1", pd.DataFrame({"x": [1]}))
+    assert cache.get(KEY, "v2") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_credentials_get_separate_directories(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    cache.put(KEY, "v1", pd.DataFrame({"x": [1]}))
+    assert cache.get(("other-hash", *KEY[1:]), "v1") is None
+
+
+def test_evicts_least_recently_used_beyond_budget(tmp_path):
+    frame = pd.DataFrame({"x": np.arange(1000)})
+    probe = DiskResultCache(tmp_path / "probe", max_bytes=10**8)
+    probe.put(KEY, "v", frame)
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = DiskResultCache(tmp_path / "c", max_bytes=int(entry_bytes * 2.5))
+    keys = [("user-hash", "ds", f"q{i}") for i in range(3)]
+    cache.put(keys[0], "v", frame)
+    cache.put(keys[1], "v", frame)
+    # Age both entries, then use keys[0] so keys[1] is the one evicted.
+    for path in (tmp_path / "c" / "user-hash").glob("*.json"):
+        os.utime(path, (1, 1))
+    assert cache.get(keys[0], "v") is not None
+    cache.put(keys[2], "v", frame)
+
+    assert cache.get(keys[1], "v") is None
+    assert cache.get(keys[0], "v") is not None
+    assert cache.get(keys[2], "v") is not None
+    assert cache.stats()["bytes"] <= int(entry_bytes * 2.5)
+
+
+def test_uncacheable_and_oversized_results_not_stored(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10)
+    assert not cache.put(KEY, "v1", None)
+    assert not cache.put(KEY, "v1", pd.DataFrame({"x": np.arange(1000)}))
+    assert cache.stats() == {"entries": 0, "bytes": 0}
+
+
+def test_unserializable_result_not_stored(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    mixed = pd.DataFrame({"x": pd.array([1, "a"], dtype=object)})
+    assert not cache.put(KEY, "v1", mixed)
+    assert not cache.put(KEY, "v1", xr.Dataset({"x": ("i", mixed["x"].values)}))
+    # No partial file is left behind.
+    assert list(tmp_path.rglob("*")) == [tmp_path / "user-hash"]
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = DiskResultCache(tmp_path, max_bytes=10**8)
+    cache.put(KEY, "v1", pd.DataFrame({"x": [1]}))
+    for path in (tmp_path / "user-hash").glob("*.parquet"):
+        path.write_bytes(b"not parquet")
+    assert cache.get(KEY, "v1") is None
@@ -7,9 +7,15 @@ import numpy as np
 import pandas as pd
 import pytest
 import xarray as xr
+from oceanum.datamesh.exceptions import DatameshConnectError
 
 from oceanum_mcp.common.config import set_transport
-from oceanum_mcp.common.formatting import human_bytes, summarize_data
+from oceanum_mcp.common.formatting import (
+    human_bytes,
+    page_records,
+    records_frame,
+    summarize_data,
+)
 
 
 def _dataset(n: int = 3) -> xr.Dataset:
@@ -58,6 +64,73 @@ def test_lazy_dataset_flagged_without_values():
     assert "note" in out
 
 
+def _grid() -> xr.Dataset:
+    shape = (48, 50, 60)
+    return xr.Dataset(
+        {
+            "hs": (("time", "lat", "lon"), np.random.rand(*shape)),
+            "tp": (("time", "lat", "lon"), np.random.rand(*shape)),
+        },
+        coords={
+            "time": pd.date_range("2024-01-01", periods=48, freq="h"),
+            "lat": np.arange(50.0),
+            "lon": np.arange(60.0),
+        },
+    ).chunk({"time": 24, "lat": 25, "lon": 8})
+
+
+def test_lazy_dataset_previews_head_of_first_chunk():
+    ds = _grid()
+    out = summarize_data(ds, max_rows=20)
+    preview = out["preview"]
+    assert preview["variables"] == ["hs", "tp"]
+    # Innermost dim capped by its first chunk, the rest fill the row budget.
+    assert preview["selection"] == {"time": 1, "lat": 2, "lon": 8}
+    assert preview["bytes_read"] == 2 * 24 * 25 * 8 * 8
+    assert len(preview["data"]) == 16
+    assert preview["data"][9]["hs"] == pytest.approx(float(ds.hs.values[0, 1, 1]))
+    assert "preview" in out["note"]
+
+
+def test_lazy_preview_uses_stored_chunks_and_byte_budget():
+    ds = _grid()
+    ds["hs"].encoding["chunks"] = (1, 5, 5)
+    with patch.dict(os.environ, {"OCEANUM_MCP_PREVIEW_BYTES": "30000"}):
+        out = summarize_data(ds, max_rows=20)
+    # tp's first chunk (38.4 kB) does not fit after hs's 200 B.
+    assert out["preview"]["variables"] == ["hs"]
+    assert out["preview"]["bytes_read"] == 5 * 5 * 8
+    assert out["preview"]["selection"] == {"time": 1, "lat": 4, "lon": 5}
+
+
+def test_lazy_preview_disabled_or_structure_only():
+    with patch.dict(os.environ, {"OCEANUM_MCP_PREVIEW_BYTES": "0"}):
+        assert "preview" not in summarize_data(_grid())
+    assert "preview" not in summarize_data(_grid(), max_rows=0)
+    with patch.dict(os.environ, {"OCEANUM_MCP_PREVIEW_BYTES": "10"}):
+        out = summarize_data(_grid())
+    assert "preview" not in out
+    assert "not downloaded" in out["note"]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [DatameshConnectError("Server error 503"), KeyError("hs/0.0.0"), OSError("EIO")],
+)
+def test_failed_preview_read_keeps_summary(error):
+    ds = _dataset().chunk({"time": 1})
+    full = ds["hs"].data
+
+    def fail(block):
+        raise error
+
+    ds["hs"] = ds["hs"].copy(data=full.map_blocks(fail, meta=full._meta))
+    out = summarize_data(ds)
+    assert out["lazy"] is True
+    assert "preview" not in out
+    assert "not downloaded" in out["note"]
+
+
 def test_lazy_dataset_chunked_coords_not_computed():
     # Chunked (remote) coordinates must not be downloaded for first/last.
     ds = xr.Dataset(
@@ -127,3 +200,23 @@ def test_geodataframe_records_use_wkt():
 def test_warnings_attached():
     out = summarize_data(None, warnings=["row cap hit"])
     assert out["warnings"] == ["row cap hit"]
+
+
+def test_page_records_walks_a_table():
+    df = pd.DataFrame({"x": range(25)})
+    first = page_records(df, 0, 10)
+    assert first["rows"] == 25
+    assert [r["x"] for r in first["data"]] == list(range(10))
+    assert first["next_offset"] == 10
+    last = page_records(df, 20, 10)
+    assert [r["x"] for r in last["data"]] == list(range(20, 25))
+    assert last["next_offset"] is None
+    assert page_records(df, 30, 10)["data"] == []
+
+
+def test_records_frame_skips_lazy_datasets():
+    ds = _dataset(4)
+    assert list(records_frame(ds).columns) == ["time", "hs"]
+    assert records_frame(ds.chunk({"time": 2})) is None
+    df = pd.DataFrame({"x": [1]})
+    assert records_frame(df) is df
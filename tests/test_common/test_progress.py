@@ -0,0 +1,97 @@
+"""Tests for MCP progress notifications."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+from oceanum_mcp.common import progress as progress_module
+from oceanum_mcp.common.progress import Progress, current_progress
+
+
+class _Context:
+    """Stands in for a FastMCP Context, recording progress notifications."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.sent: list[tuple[float, float | None, str | None]] = []
+        self.fail = fail
+
+    async def report_progress(self, progress, total=None, message=None):
+        if self.fail:
+            raise ConnectionError("client went away")
+        self.sent.append((progress, total, message))
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_phases_continue_increasing_with_growing_total():
+    context = _Context()
+    progress = Progress(context)
+
+    progress.phase("Staging")
+    progress.update(3, "3 s", force=True)
+    progress.phase("Writing", total=10)
+    progress.update(4, "4/10", force=True)
+    progress.update(4, "again", force=True)  # no advance: dropped
+    await _settle()
+
+    values = [sent[0] for sent in context.sent]
+    assert values == sorted(set(values))
+    assert context.sent[-1] == (9, 15, "4/10")
+
+
+async def test_updates_are_throttled_and_sent_in_order_from_threads():
+    context = _Context()
+    progress = Progress(context)
+    progress.phase("Writing", total=100)
+
+    def work():
+        for done in range(1, 101):
+            progress.update(done, f"{done}/100")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    await _settle()
+
+    values = [sent[0] for sent in context.sent]
+    assert values == sorted(values)
+    assert len(values) < 10  # one per interval, plus the phase start
+
+
+async def test_waiting_sends_heartbeats_until_done():
+    context = _Context()
+    with patch.object(progress_module, "_HEARTBEAT_S", 0.01):
+        async with Progress(context).waiting("Staging"):
+            await asyncio.sleep(0.05)
+    await _settle()
+    assert context.sent[0][2] == "Staging"
+    assert any("s)" in message for _, _, message in context.sent[1:])
+
+
+async def test_lost_client_does_not_fail_the_call():
+    progress = Progress(_Context(fail=True))
+    progress.phase("Writing", total=2)
+    progress.update(1, "1/2", force=True)
+    await _settle()
+
+
+async def test_disabled_outside_a_request():
+    progress = current_progress()
+    assert not progress.enabled
+    progress.phase("Writing", total=1)
+    async with progress.waiting("Staging"):
+        pass
+
+
+async def test_one_progress_per_request_context():
+    context = _Context()
+    with patch.object(progress_module, "get_context", return_value=context):
+        first = current_progress()
+        assert first.enabled
+        assert current_progress() is first
+    assert current_progress() is not first
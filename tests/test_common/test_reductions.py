@@ -0,0 +1,96 @@
+"""Tests for bounded-cost statistics of lazy datasets."""
+
+import itertools
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import xarray as xr
+from oceanum.datamesh.exceptions import DatameshConnectError
+
+from oceanum_mcp.common.reductions import lazy_statistics
+
+
+def _lazy(values: np.ndarray) -> xr.Dataset:
+    return xr.Dataset(
+        {
+            "hs": (("time", "x"), values),
+            "name": (("time",), np.array(["a"] * values.shape[0])),
+        }
+    ).chunk({"time": 2, "x": 5})
+
+
+def test_statistics_match_numpy_and_ignore_nans():
+    values = np.random.rand(20, 10)
+    values[0] = np.nan
+    out = lazy_statistics(_lazy(values), deadline_s=60, memory_bytes=10**8)
+    hs = out["variables"]["hs"]
+    assert out["complete"] is True
+    assert hs["scanned_fraction"] == 1.0
+    assert hs["min"] == np.nanmin(values)
+    assert hs["max"] == np.nanmax(values)
+    assert hs["mean"] == pytest.approx(np.nanmean(values))
+    assert hs["nan_fraction"] == 0.05
+    assert out["skipped"] == {"name": "not numeric"}
+
+
+def test_all_nan_variable_has_no_range():
+    out = lazy_statistics(
+        _lazy(np.full((4, 10), np.nan)), deadline_s=60, memory_bytes=10**8
+    )
+    assert out["variables"]["hs"] == {"scanned_fraction": 1.0, "nan_fraction": 1.0}
+
+
+def test_deadline_returns_partial_scan():
+    values = np.arange(200.0).reshape(20, 10)
+    # Each clock read advances one second: the deadline falls mid-variable.
+    clock = itertools.count()
+    with patch(
+        "oceanum_mcp.common.reductions.time.monotonic",
+        side_effect=lambda: float(next(clock)),
+    ):
+        out = lazy_statistics(_lazy(values), deadline_s=3.5, memory_bytes=10**8)
+    hs = out["variables"]["hs"]
+    assert out["complete"] is False
+    assert 0 < hs["scanned_fraction"] < 1
+    assert hs["min"] == 0.0
+    assert hs["max"] < 199.0
+
+
+def test_deadline_before_start_skips_variables():
+    out = lazy_statistics(_lazy(np.zeros((4, 10))), deadline_s=0, memory_bytes=10**8)
+    assert out["complete"] is False
+    assert out["variables"] == {}
+    assert out["skipped"]["hs"] == "deadline reached"
+
+
+def test_chunks_over_memory_cap_are_skipped():
+    out = lazy_statistics(_lazy(np.zeros((4, 10))), deadline_s=60, memory_bytes=40)
+    assert out["skipped"]["hs"] == "chunks larger than the memory cap"
+
+
+def test_chunk_read_error_reported_per_variable():
+    ds = _lazy(np.arange(200.0).reshape(20, 10))
+    full = ds["hs"].data
+
+    def fail_after(rows):
+        def read(block, block_info=None):
+            if block_info[0]["array-location"][0][0] >= rows:
+                raise DatameshConnectError("Server error 503")
+            return block
+
+        return read
+
+    ds["hs"] = ds["hs"].copy(data=full.map_blocks(fail_after(10), dtype=float))
+    ds["tp"] = ds["hs"].copy(data=full.map_blocks(fail_after(0), dtype=float))
+    ds["ok"] = ds["hs"].copy(data=full)
+    with patch("oceanum_mcp.common.reductions.os.cpu_count", return_value=1):
+        out = lazy_statistics(ds, deadline_s=60, memory_bytes=10**8)
+
+    assert out["complete"] is False
+    hs = out["variables"]["hs"]
+    assert hs["scanned_fraction"] == 0.5
+    assert hs["max"] == 99.0
+    assert "503" in hs["error"]
+    assert "503" in out["skipped"]["tp"]
+    assert out["variables"]["ok"]["scanned_fraction"] == 1.0
@@ -1,12 +1,19 @@
 """Tests for the Datamesh MCP server."""
 
+import asyncio
+import datetime
 import importlib
 import json
+import threading
+import time
 import warnings
 from unittest.mock import MagicMock, patch
 
+import anyio
+import httpx
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 import xarray as xr
 from fastmcp.exceptions import ToolError
@@ -16,9 +23,11 @@ from oceanum.datamesh.exceptions import (
     DatameshQueryError,
     DatameshSessionError,
 )
-from oceanum.datamesh.query import Container, CoordSelector, GeoFilter, Query
+from oceanum.datamesh.query import Container, CoordSelector, Query
 
 import oceanum_mcp.servers.datamesh.server as server
+from oceanum_mcp.common.cancellation import Cancelled, cancellable
+from oceanum_mcp.servers.datamesh.catalog import CatalogMirror
 from tests.conftest import make_stage
 
 
@@ -46,14 +55,6 @@ def _mock_datasource(**kwargs):
     return ds
 
 
-def _mock_catalog(datasources):
-    """Create a mock Catalog object."""
-    catalog = MagicMock()
-    catalog.__len__ = MagicMock(return_value=len(datasources))
-    catalog.__iter__ = MagicMock(return_value=iter(datasources))
-    return catalog
-
-
 def _small_dataset() -> xr.Dataset:
     return xr.Dataset(
         {"hs": (("time",), np.array([1.0, 2.0, 3.0]))},
@@ -61,62 +62,280 @@ def _small_dataset() -> xr.Dataset:
     )
 
 
+def _feature(id="test-ds", **props):
+    """A datasource as the metadata service returns it (GeoJSON Feature)."""
+    return {
+        "type": "Feature",
+        "id": id,
+        "geometry": {"type": "Point", "coordinates": [174.0, -41.0]},
+        "properties": {"name": "Test Dataset", "driver": "onzarr", **props},
+    }
+
+
+def _catalog_json(*features):
+    return {"type": "FeatureCollection", "features": list(features)}
+
+
 class TestSearchCatalog:
-    def test_returns_results_with_count(self, mock_conn):
-        ds = _mock_datasource(id="era5-waves", name="ERA5 Waves", tags=["wave"])
-        mock_conn.get_catalog.return_value = _mock_catalog([ds])
+    """Searches sent to the gateway (catalog mirror disabled)."""
+
+    @pytest.fixture(autouse=True)
+    def _no_mirror(self, monkeypatch):
+        monkeypatch.setenv("OCEANUM_MCP_CATALOG_REFRESH_S", "0")
+
+    @staticmethod
+    def _serve(gateway_http, *features):
+        gateway_http.route(
+            "GET", "/datasource/", httpx.Response(200, json=_catalog_json(*features))
+        )
+
+    def _params(self, gateway_http):
+        return gateway_http.calls("GET", "/datasource/")[-1].url.params
+
+    async def test_returns_results_with_count(self, gateway_http):
+        self._serve(
+            gateway_http, _feature("era5-waves", name="ERA5 Waves", tags=["wave"])
+        )
 
-        parsed = json.loads(server.search_catalog(search="wave"))
+        parsed = json.loads(await server.search_catalog(search="wave"))
         assert parsed["count"] == 1
         assert parsed["results"][0]["id"] == "era5-waves"
-        assert mock_conn.get_catalog.call_args.kwargs["limit"] == 20
+        assert self._params(gateway_http)["limit"] == "20"
+        assert self._params(gateway_http)["search"] == "wave"
 
-    def test_no_sentinel_times(self, mock_conn):
-        mock_conn.get_catalog.return_value = _mock_catalog([])
+    async def test_no_sentinel_times(self, gateway_http):
+        self._serve(gateway_http)
 
-        server.search_catalog(time_start="2023-01-01")
-        assert mock_conn.get_catalog.call_args.kwargs["timefilter"] == [
-            "2023-01-01",
-            None,
-        ]
+        await server.search_catalog(time_start="2023-01-01")
+        # Same open-ended range the library's get_catalog would send.
+        assert (
+            self._params(gateway_http)["in_trange"]
+            == "2023-01-01 00:00:00Z,2500-01-01 00:00:00Z"
+        )
 
-    def test_empty_catalog(self, mock_conn):
-        mock_conn.get_catalog.return_value = _mock_catalog([])
+    async def test_empty_catalog(self, gateway_http):
+        self._serve(gateway_http)
 
-        parsed = json.loads(server.search_catalog(search="nonexistent"))
+        parsed = json.loads(await server.search_catalog(search="nonexistent"))
         assert parsed["count"] == 0
         assert "No datasources found" in parsed["message"]
 
-    def test_note_when_limit_reached(self, mock_conn):
-        ds = _mock_datasource()
-        mock_conn.get_catalog.return_value = _mock_catalog([ds])
+    async def test_note_when_limit_reached(self, gateway_http):
+        self._serve(gateway_http, _feature())
 
-        parsed = json.loads(server.search_catalog(search="wave", limit=1))
+        parsed = json.loads(await server.search_catalog(search="wave", limit=1))
         assert "more matches may exist" in parsed["note"]
 
-    def test_with_bbox(self, mock_conn):
-        mock_conn.get_catalog.return_value = _mock_catalog([])
+    async def test_with_bbox(self, gateway_http):
+        self._serve(gateway_http)
+
+        await server.search_catalog(bbox=[120, -50, 180, 10])
+        assert self._params(gateway_http)["geom_intersects"].startswith("POLYGON")
 
-        server.search_catalog(bbox=[120, -50, 180, 10])
-        geofilter = mock_conn.get_catalog.call_args.kwargs["geofilter"]
-        assert isinstance(geofilter, GeoFilter)
+    async def test_auth_headers_sent(self, gateway_http):
+        self._serve(gateway_http)
 
-    def test_rejects_nonpositive_limit(self, mock_conn):
+        await server.search_catalog(search="wave")
+        request = gateway_http.calls("GET", "/datasource/")[-1]
+        assert request.headers["Authorization"] == "Token test"
+
+    async def test_rejects_nonpositive_limit(self, gateway_http):
         with pytest.raises(ToolError, match="at least 1"):
-            server.search_catalog(search="wave", limit=0)
-        mock_conn.get_catalog.assert_not_called()
+            await server.search_catalog(search="wave", limit=0)
+        assert not gateway_http.requests
+
+    async def test_invalid_time_raises_tool_error(self, gateway_http):
+        with pytest.raises(ToolError, match="Invalid catalog filter"):
+            await server.search_catalog(time_start="not-a-date")
+
+
+class TestCatalogMirror:
+    """Searches answered from the per-credential catalog mirror."""
+
+    @pytest.fixture
+    def listing(self, gateway_http):
+        features = [
+            _feature(
+                "era5-waves",
+                name="ERA5 Waves",
+                tags=["wave"],
+                tstart="1980-01-01T00:00:00Z",
+                modified="2024-01-01T00:00:00Z",
+            ),
+            _feature(
+                "sst-global",
+                name="Global SST",
+                description="Sea surface temperature",
+                tstart="2020-01-01T00:00:00Z",
+                tend="2021-01-01T00:00:00Z",
+                modified="2024-01-01T00:00:00Z",
+            ),
+        ]
+        gateway_http.route(
+            "GET",
+            "/datasource/",
+            lambda request: httpx.Response(200, json=_catalog_json(*features)),
+        )
+        return features
+
+    def _listings(self, gateway_http):
+        return len(gateway_http.calls("GET", "/datasource/"))
+
+    async def test_searches_answered_locally_after_one_load(
+        self, gateway_http, listing
+    ):
+        first = json.loads(await server.search_catalog(search="wave"))
+        second = json.loads(await server.search_catalog(search="temperature"))
+        assert [r["id"] for r in first["results"]] == ["era5-waves"]
+        assert [r["id"] for r in second["results"]] == ["sst-global"]
+        assert self._listings(gateway_http) == 1
+        # The full listing is fetched unfiltered.
+        assert "search" not in gateway_http.calls("GET", "/datasource/")[0].url.params
+
+    async def test_time_and_bbox_filters(self, gateway_http, listing):
+        parsed = json.loads(
+            await server.search_catalog(
+                time_start="2022-01-01", bbox=[170, -45, 178, -40]
+            )
+        )
+        assert [r["id"] for r in parsed["results"]] == ["era5-waves"]
+        parsed = json.loads(await server.search_catalog(bbox=[0, 0, 1, 1]))
+        assert parsed["count"] == 0
+
+    async def test_relative_time(self, gateway_http, listing):
+        parsed = json.loads(await server.search_catalog(time_start="-P7D"))
+        assert [r["id"] for r in parsed["results"]] == ["era5-waves"]
+
+    async def test_limit(self, gateway_http, listing):
+        parsed = json.loads(await server.search_catalog(limit=1))
+        assert parsed["count"] == 1
+        assert "more matches may exist" in parsed["note"]
+
+    async def test_refreshes_after_interval(self, gateway_http, listing, monkeypatch):
+        await server.search_catalog(search="wave")
+        listing.append(_feature("new-ds", name="New waves", tags=["wave"]))
+        monkeypatch.setenv("OCEANUM_MCP_CATALOG_REFRESH_S", "0.000001")
+
+        parsed = json.loads(await server.search_catalog(search="wave"))
+        assert {r["id"] for r in parsed["results"]} == {"era5-waves", "new-ds"}
+        assert self._listings(gateway_http) == 2
+
+    async def test_mirror_in_use_is_kept(self, gateway_http, listing):
+        # Searched more often than the TTL, the mirror outlives it.
+        with patch.object(server, "_catalog_mirrors", server.TTLCache(4, 0.2)):
+            for _ in range(3):
+                await server.search_catalog(search="wave")
+                await asyncio.sleep(0.12)
+        assert self._listings(gateway_http) == 1
+
+    async def test_mirrors_are_per_credential(self, gateway_http, listing):
+        await server.search_catalog(search="wave")
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.search_catalog(search="wave")
+        assert self._listings(gateway_http) == 2
+
+    async def test_update_metadata_expires_own_mirror(
+        self, gateway_http, listing, mock_conn
+    ):
+        mock_conn.update_metadata.return_value = _mock_datasource(id="era5-waves")
+        await server.search_catalog(search="wave")
+        await server.update_metadata(datasource_id="era5-waves", name="Renamed")
+        await server.search_catalog(search="wave")
+        assert self._listings(gateway_http) == 2
 
 
 class TestGetDatasourceInfo:
-    def test_returns_metadata(self, mock_conn):
-        ds = _mock_datasource(id="my-ds", name="My Dataset", driver="onzarr")
-        mock_conn.get_datasource.return_value = ds
+    async def test_returns_metadata(self, gateway_http):
+        gateway_http.route(
+            "GET",
+            "/datasource/my-ds",
+            httpx.Response(200, json=_feature("my-ds", name="My Dataset")),
+        )
 
-        parsed = json.loads(server.get_datasource_info("my-ds"))
+        parsed = json.loads(await server.get_datasource_info("my-ds"))
         assert parsed["id"] == "my-ds"
         assert parsed["name"] == "My Dataset"
         assert parsed["driver"] == "onzarr"
 
+    async def test_not_found_raises_connect_error(self, gateway_http):
+        with pytest.raises(DatameshConnectError, match="not found"):
+            await server.get_datasource_info("missing-ds")
+
+    @staticmethod
+    def _serve(gateway_http, modified="2024-01-01T00:00:00Z", name="My Dataset"):
+        gateway_http.route(
+            "GET",
+            "/datasource/my-ds",
+            httpx.Response(200, json=_feature("my-ds", name=name, modified=modified)),
+        )
+
+    @staticmethod
+    def _mirror(modified):
+        mirror = CatalogMirror()
+        mirror.apply([_feature("my-ds", modified=modified)])
+        server._catalog_mirrors.set("test-user", mirror)
+
+    async def test_repeat_calls_served_from_cache(self, gateway_http):
+        self._serve(gateway_http)
+        first = await server.get_datasource_info("my-ds")
+        second = await server.get_datasource_info("my-ds")
+        assert first == second
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 1
+
+    async def test_cache_is_per_credential(self, gateway_http):
+        self._serve(gateway_http)
+        await server.get_datasource_info("my-ds")
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.get_datasource_info("my-ds")
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 2
+
+    async def test_stale_entry_revalidated_by_mirror(self, gateway_http, monkeypatch):
+        self._serve(gateway_http)
+        await server.get_datasource_info("my-ds")
+        monkeypatch.setattr(server, "_DATASOURCE_FRESH_S", 0.0)
+        self._mirror("2024-01-01T00:00:00Z")
+        await server.get_datasource_info("my-ds")
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 1
+
+    async def test_stale_entry_refetched_when_modified_changed(
+        self, gateway_http, monkeypatch
+    ):
+        self._serve(gateway_http)
+        await server.get_datasource_info("my-ds")
+        monkeypatch.setattr(server, "_DATASOURCE_FRESH_S", 0.0)
+        self._mirror("2024-06-01T00:00:00Z")
+        self._serve(gateway_http, modified="2024-06-01T00:00:00Z", name="Changed")
+        parsed = json.loads(await server.get_datasource_info("my-ds"))
+        assert parsed["name"] == "Changed"
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 2
+
+    async def test_stale_entry_refetched_without_mirror(
+        self, gateway_http, monkeypatch
+    ):
+        self._serve(gateway_http)
+        await server.get_datasource_info("my-ds")
+        monkeypatch.setattr(server, "_DATASOURCE_FRESH_S", 0.0)
+        await server.get_datasource_info("my-ds")
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 2
+
+    async def test_update_metadata_refreshes_entry(self, gateway_http, mock_conn):
+        self._serve(gateway_http)
+        await server.get_datasource_info("my-ds")
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.get_datasource_info("my-ds")
+        mock_conn.update_metadata.return_value = _mock_datasource(
+            id="my-ds", name="Renamed"
+        )
+
+        await server.update_metadata(datasource_id="my-ds", name="Renamed")
+        parsed = json.loads(await server.get_datasource_info("my-ds"))
+        assert parsed["name"] == "Renamed"
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 2
+        # Other credentials' entries are dropped, not rewritten.
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.get_datasource_info("my-ds")
+        assert len(gateway_http.calls("GET", "/datasource/my-ds")) == 3
+
 
 class TestBuildQuery:
     def test_range_times_without_sentinels(self):
@@ -209,78 +428,430 @@ class TestBuildQuery:
 
 
 class TestStageQuery:
-    def test_small_dataset_recommends_inline(self, mock_conn, mock_stage):
+    async def test_small_dataset_recommends_inline(self, mock_conn, mock_stage):
         mock_stage.return_value = make_stage(Container.Dataset, size=1000, dlen=10)
 
-        parsed = json.loads(server.stage_query(datasource_id="test-ds"))
+        parsed = json.loads(await server.stage_query(datasource_id="test-ds"))
         assert parsed["staged"] is True
         assert parsed["container"] == "dataset"
         assert parsed["size_bytes"] == 1000
         assert "query_data" in parsed["recommendation"]
         assert parsed["query"]["datasource"] == "test-ds"
 
-    def test_large_dataset_recommends_export(self, mock_conn, mock_stage):
+    async def test_large_dataset_recommends_export(self, mock_conn, mock_stage):
         mock_stage.return_value = make_stage(Container.Dataset, size=10**9)
 
-        parsed = json.loads(server.stage_query(datasource_id="test-ds"))
+        parsed = json.loads(await server.stage_query(datasource_id="test-ds"))
         assert "export_query" in parsed["recommendation"]
 
-    def test_row_cap_warning(self, mock_conn, mock_stage):
+    async def test_row_cap_warning(self, mock_conn, mock_stage):
         mock_stage.return_value = make_stage(
             Container.DataFrame, size=10**9, dlen=3_000_000
         )
 
-        parsed = json.loads(server.stage_query(datasource_id="test-ds"))
+        parsed = json.loads(await server.stage_query(datasource_id="test-ds"))
         assert any("caps tabular" in w for w in parsed["warnings"])
 
-    def test_no_data(self, mock_conn, mock_stage):
+    async def test_no_data(self, mock_conn, mock_stage):
         mock_stage.return_value = None
 
-        parsed = json.loads(server.stage_query(datasource_id="test-ds"))
+        parsed = json.loads(await server.stage_query(datasource_id="test-ds"))
         assert parsed["staged"] is False
 
-    def test_stage_error_echoes_query(self, mock_conn, mock_stage):
+    async def test_stage_error_echoes_query(self, mock_conn, mock_stage):
         mock_stage.side_effect = DatameshQueryError("bad datasource")
 
-        parsed = json.loads(server.stage_query(datasource_id="test-ds"))
+        parsed = json.loads(await server.stage_query(datasource_id="test-ds"))
         assert "bad datasource" in parsed["error"]
         assert parsed["query"]["datasource"] == "test-ds"
 
 
+class TestStageCache:
+    """Stages are reused per (credential, canonical query)."""
+
+    async def test_stage_then_query_stages_once(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0]})
+
+        await server.stage_query(datasource_id="test-ds", variables=["temp"])
+        parsed = json.loads(
+            await server.query_data(datasource_id="test-ds", variables=["temp"])
+        )
+        assert parsed["rows"] == 1
+        assert mock_stage.call_count == 1
+        assert server._stage_cache.stats()["hits"] == 1
+        assert server._stage_cache.stats()["misses"] == 1
+
+    async def test_different_queries_not_shared(self, mock_conn, mock_stage):
+        await server.stage_query(datasource_id="test-ds", variables=["a"])
+        await server.stage_query(datasource_id="test-ds", variables=["b"])
+        assert mock_stage.call_count == 2
+
+    async def test_never_shared_across_credentials(self, mock_conn, mock_stage):
+        await server.stage_query(datasource_id="test-ds")
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.stage_query(datasource_id="test-ds")
+        assert mock_stage.call_count == 2
+
+    async def test_no_data_not_cached(self, mock_conn, mock_stage):
+        mock_stage.return_value = None
+        await server.stage_query(datasource_id="test-ds")
+        await server.stage_query(datasource_id="test-ds")
+        assert mock_stage.call_count == 2
+
+    async def test_errors_not_cached(self, mock_conn, mock_stage):
+        mock_stage.side_effect = [DatameshConnectError("blip"), make_stage()]
+        assert (
+            "blip"
+            in json.loads(await server.stage_query(datasource_id="test-ds"))["error"]
+        )
+        assert json.loads(await server.stage_query(datasource_id="test-ds"))["staged"]
+
+    async def test_update_metadata_invalidates_datasource(self, mock_conn, mock_stage):
+        mock_conn.update_metadata.return_value = _mock_datasource(id="test-ds")
+        await server.stage_query(datasource_id="test-ds")
+        await server.stage_query(datasource_id="other-ds")
+
+        await server.update_metadata(datasource_id="test-ds", name="Renamed")
+        await server.stage_query(datasource_id="test-ds")
+        await server.stage_query(datasource_id="other-ds")
+        assert mock_stage.call_count == 3
+
+
+class TestStageQueries:
+    async def test_reports_each_query_and_aggregate_size(self, mock_conn, mock_stage):
+        mock_stage.side_effect = [
+            make_stage(size=100),
+            make_stage(Container.DataFrame, size=250),
+        ]
+        parsed = json.loads(
+            await server.stage_queries(
+                [
+                    {"datasource_id": "ds-aa", "bbox": [170, -45, 175, -40]},
+                    {"datasource_id": "ds-bb", "time_start": "2024-01-01"},
+                ]
+            )
+        )
+        assert parsed["count"] == parsed["staged"] == 2
+        assert parsed["total_size_bytes"] == 350
+        assert [r["index"] for r in parsed["results"]] == [0, 1]
+        assert parsed["results"][0]["query"]["datasource"] == "ds-aa"
+        assert parsed["results"][1]["container"] == "dataframe"
+
+    async def test_errors_reported_per_item(self, mock_conn, mock_stage):
+        mock_stage.side_effect = [None, DatameshQueryError("bad variable")]
+        parsed = json.loads(
+            await server.stage_queries(
+                [
+                    {"datasource_id": "empty-ds"},
+                    {"datasource_id": "test-ds", "variables": ["nope"]},
+                    {"datasource_id": "test-ds", "times": ["x"], "time_start": "2024"},
+                    {"datasource_id": "test-ds", "colour": "blue"},
+                    {"variables": ["hs"]},
+                ]
+            )
+        )
+        results = parsed["results"]
+        assert results[0]["staged"] is False
+        assert results[1]["error"] == "bad variable"
+        assert results[1]["query"]["variables"] == ["nope"]
+        assert "not both" in results[2]["error"]
+        assert "colour" in results[3]["error"]
+        assert "datasource_id" in results[4]["error"]
+        assert (parsed["staged"], parsed["no_data"], parsed["failed"]) == (0, 1, 4)
+        assert parsed["total_size_bytes"] == 0
+        # Invalid items never reach the gateway.
+        assert mock_stage.call_count == 2
+
+    async def test_concurrency_bounded(self, mock_conn, mock_stage, monkeypatch):
+        monkeypatch.setenv("OCEANUM_MCP_STAGE_CONCURRENCY", "2")
+        in_flight = peak = 0
+
+        async def _slow_stage(conn, query):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_stage(size=1)
+
+        mock_stage.side_effect = _slow_stage
+        parsed = json.loads(
+            await server.stage_queries(
+                [{"datasource_id": "test-ds", "variables": [f"v{i}"]} for i in range(6)]
+            )
+        )
+        assert parsed["total_size_bytes"] == 6
+        assert peak == 2
+
+    async def test_shares_stage_cache_with_query_tools(self, mock_conn, mock_stage):
+        await server.stage_queries([{"datasource_id": "test-ds"}])
+        await server.stage_query(datasource_id="test-ds")
+        assert mock_stage.call_count == 1
+
+    async def test_batch_size_limits(self, mock_conn):
+        with pytest.raises(ToolError, match="at least one"):
+            await server.stage_queries([])
+        with pytest.raises(ToolError, match="At most"):
+            await server.stage_queries([{"datasource_id": "test-ds"}] * 51)
+
+
+class TestSingleFlight:
+    """Identical concurrent calls for one credential share one gateway call."""
+
+    async def test_concurrent_identical_query_data_download_once(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        started = threading.Event()
+        release = threading.Event()
+
+        def _slow_fetch(conn, query, stage, **kwargs):
+            started.set()
+            assert release.wait(timeout=5)
+            warnings.warn("shared warning")
+            return pd.DataFrame({"x": [1, 2]})
+
+        mock_fetch.side_effect = _slow_fetch
+        calls = [
+            asyncio.create_task(server.query_data(datasource_id="test-ds"))
+            for _ in range(3)
+        ]
+        await asyncio.to_thread(started.wait, 5)
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert mock_fetch.call_count == 1
+        assert mock_stage.call_count == 1
+        assert results[0] == results[1] == results[2]
+        assert json.loads(results[0])["warnings"] == ["shared warning"]
+        assert server._inflight.stats()["coalesced"] >= 2
+
+    async def test_different_credentials_not_coalesced(self, mock_conn, mock_stage):
+        release = asyncio.Event()
+
+        async def _slow_stage(conn, query):
+            await release.wait()
+            return make_stage(size=100)
+
+        mock_stage.side_effect = _slow_stage
+        users = iter(["alice", "bob"])
+        with patch.object(server, "credential_key", side_effect=lambda: next(users)):
+            calls = [
+                asyncio.create_task(server.stage_query(datasource_id="test-ds"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(*calls)
+        assert mock_stage.call_count == 2
+        assert server._inflight.stats()["coalesced"] == 0
+
+    async def test_concurrent_get_datasource_info_fetches_once(self, mock_conn):
+        release = asyncio.Event()
+        ds = _mock_datasource(id="my-ds")
+
+        async def _slow_get(conn, datasource_id):
+            await release.wait()
+            return ds
+
+        with patch.object(server, "_get_datasource", side_effect=_slow_get) as get:
+            calls = [
+                asyncio.create_task(server.get_datasource_info("my-ds"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            first, second = await asyncio.gather(*calls)
+        assert get.call_count == 1
+        assert first == second
+
+
+class TestResultCache:
+    """query_data results are reused while the datasource is unmodified."""
+
+    V1 = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    V2 = datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def modified(self, mock_conn):
+        with patch.object(
+            server, "_datasource_modified", return_value=self.V1
+        ) as lookup:
+            yield lookup
+
+    @pytest.fixture(autouse=True)
+    def _frame(self, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.return_value = pd.DataFrame({"x": [1, 2]})
+
+    async def test_hit_skips_stage_and_download(self, modified, mock_stage, mock_fetch):
+        first = await server.query_data(datasource_id="test-ds")
+        server._stage_cache.clear()  # a hit must not need the stage either
+        second = await server.query_data(datasource_id="test-ds")
+        assert first == second
+        assert mock_stage.call_count == 1
+        assert mock_fetch.call_count == 1
+        assert server._result_cache.stats()["hits"] == 1
+
+    async def test_miss_looks_up_modified_while_staging(self, mock_conn, mock_stage):
+        staged = asyncio.Event()
+
+        async def lookup(conn, datasource_id):
+            # Answers only once staging has begun: a lookup awaited before
+            # staging would time out here.
+            await asyncio.wait_for(staged.wait(), timeout=1)
+            return self.V1
+
+        def stage(conn, query):
+            staged.set()
+            return make_stage(Container.DataFrame, size=100)
+
+        mock_stage.side_effect = stage
+        with patch.object(server, "_datasource_modified", side_effect=lookup):
+            parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert parsed["rows"] == 2
+        # Cached under the modified found alongside.
+        assert server._result_cache.stats()["entries"] == 1
+
+    async def test_modified_change_refetches(self, modified, mock_stage, mock_fetch):
+        await server.query_data(datasource_id="test-ds")
+        modified.return_value = self.V2
+        server._stage_cache.clear()
+        mock_fetch.return_value = pd.DataFrame({"x": [3]})
+
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert parsed["rows"] == 1
+        assert mock_fetch.call_count == 2
+        # The refreshed result replaced the stale one.
+        assert server._result_cache.stats()["entries"] == 1
+
+    async def test_unknown_modified_not_cached(self, mock_conn, mock_fetch):
+        await server.query_data(datasource_id="test-ds")
+        await server.query_data(datasource_id="test-ds")
+        assert mock_fetch.call_count == 2
+        assert server._result_cache.stats()["entries"] == 0
+
+    async def test_never_shared_across_credentials(self, modified, mock_fetch):
+        await server.query_data(datasource_id="test-ds")
+        with patch.object(server, "credential_key", return_value="other-user"):
+            await server.query_data(datasource_id="test-ds")
+        assert mock_fetch.call_count == 2
+
+    async def test_errors_not_cached(self, modified, mock_fetch):
+        mock_fetch.side_effect = [DatameshQueryError("boom"), pd.DataFrame({"x": [1]})]
+        assert "error" in json.loads(await server.query_data(datasource_id="test-ds"))
+        assert "error" not in json.loads(
+            await server.query_data(datasource_id="test-ds")
+        )
+
+    async def test_update_metadata_invalidates(self, modified, mock_conn, mock_fetch):
+        mock_conn.update_metadata.return_value = _mock_datasource(id="test-ds")
+        await server.query_data(datasource_id="test-ds")
+        await server.update_metadata(datasource_id="test-ds", name="Renamed")
+        assert server._result_cache.stats()["entries"] == 0
+
+    async def test_metadata_lookup_failure_means_unknown(self):
+        # Not under mock_conn, which stubs out this lookup.
+        with (
+            patch.object(server, "credential_key", return_value="test-user"),
+            patch.object(
+                server, "_get_datasource", side_effect=DatameshConnectError("down")
+            ),
+        ):
+            assert await server._datasource_modified(MagicMock(), "test-ds") is None
+
+
+class TestDiskCache:
+    """query_data results persist on disk across processes (stdio only)."""
+
+    V1 = TestResultCache.V1
+
+    @pytest.fixture(autouse=True)
+    def disk(self, tmp_path, mock_conn, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(
+            Container.DataFrame, size=100, dlen=3_000_000
+        )
+        with (
+            patch.object(server, "_datasource_modified", return_value=self.V1),
+            patch.object(server, "_result_cache", server.ByteLRUCache(0)),
+            patch.object(
+                server, "_disk_cache", server.DiskResultCache(tmp_path, 10**8)
+            ) as cache,
+        ):
+            yield cache
+
+    async def test_hit_skips_stage_and_download(self, mock_stage, mock_fetch):
+        def _download(conn, query, stage, **kwargs):
+            warnings.warn("row cap hit")
+            return pd.DataFrame({"temp": [15.0, 16.0]})
+
+        mock_fetch.side_effect = _download
+        first = await server.query_data(datasource_id="test-ds")
+        server._stage_cache.clear()  # as after a restart
+        second = await server.query_data(datasource_id="test-ds")
+
+        assert first == second
+        assert json.loads(second)["warnings"] == ["row cap hit"]
+        assert mock_fetch.call_count == 1
+        assert mock_stage.call_count == 1
+
+    async def test_modified_change_refetches(self, disk, mock_fetch):
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0]})
+        await server.query_data(datasource_id="test-ds")
+        with patch.object(
+            server, "_datasource_modified", return_value=TestResultCache.V2
+        ):
+            await server.query_data(datasource_id="test-ds")
+        assert mock_fetch.call_count == 2
+        assert disk.stats()["entries"] == 1
+
+    async def test_lazy_results_not_stored(self, disk, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(Container.Dataset, size=10**12)
+        mock_fetch.return_value = _small_dataset()
+        await server.query_data(datasource_id="test-ds")
+        assert disk.stats()["entries"] == 0
+
+
 class TestQueryData:
-    def test_small_dataframe_inline(self, mock_conn, mock_stage):
+    async def test_small_dataframe_inline(self, mock_conn, mock_stage, mock_fetch):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
-        mock_conn.query.return_value = pd.DataFrame({"temp": [15.0, 16.0]})
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0, 16.0]})
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert parsed["container"] == "dataframe"
         assert parsed["rows"] == 2
         assert parsed["truncated"] is False
         assert parsed["data"][0]["temp"] == 15.0
         assert parsed["staged_size_bytes"] == 100
-        assert mock_conn.query.call_args.kwargs["use_dask"] is False
+        assert mock_fetch.call_args.kwargs["use_dask"] is False
 
-    def test_truncation_flagged(self, mock_conn, mock_stage):
+    async def test_truncation_flagged(self, mock_conn, mock_stage, mock_fetch):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
-        mock_conn.query.return_value = pd.DataFrame({"x": range(150)})
+        mock_fetch.return_value = pd.DataFrame({"x": range(150)})
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert parsed["truncated"] is True
         assert len(parsed["data"]) == 100  # DEFAULT_MAX_INLINE_ROWS
         assert "note" in parsed
 
-    def test_large_frame_refused_without_download(self, mock_conn, mock_stage):
+    async def test_large_frame_refused_without_download(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
         mock_stage.return_value = make_stage(Container.DataFrame, size=10**9)
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert parsed["refused"] is True
         assert "export_query" in parsed["message"]
         # stdio wording is the local-file variant, not the hosted download link.
         assert "write the full result to a file" in parsed["message"]
-        mock_conn.query.assert_not_called()
+        mock_fetch.assert_not_called()
 
-    def test_refusal_names_export_query_download_on_network_transport(
-        self, mock_conn, mock_stage
+    async def test_refusal_names_export_query_download_on_network_transport(
+        self, mock_conn, mock_stage, mock_fetch
     ):
         # On a hosted transport the "too large" message points at export_query,
         # which returns a download link there (not a local file).
@@ -289,82 +860,350 @@ class TestQueryData:
         mock_stage.return_value = make_stage(Container.DataFrame, size=10**9)
         try:
             set_transport("http")
-            parsed = json.loads(server.query_data(datasource_id="test-ds"))
+            parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         finally:
             set_transport("stdio")
         assert parsed["refused"] is True
         assert "export_query" in parsed["message"]
         assert "download link" in parsed["message"]
 
-    def test_large_dataset_goes_lazy(self, mock_conn, mock_stage):
+    async def test_large_dataset_goes_lazy(self, mock_conn, mock_stage, mock_fetch):
         mock_stage.return_value = make_stage(Container.Dataset, size=10**9)
-        mock_conn.query.return_value = _small_dataset().chunk({"time": 1})
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
-        assert mock_conn.query.call_args.kwargs["use_dask"] is True
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert mock_fetch.call_args.kwargs["use_dask"] is True
         assert parsed["lazy"] is True
         assert "data" not in parsed
+        # Values come only from the first-chunk preview.
+        assert parsed["preview"]["selection"]["time"] == 1
+        assert parsed["preview"]["data"]
 
-    def test_small_dataset_values_have_coordinates(self, mock_conn, mock_stage):
+    async def test_lazy_dataset_stats_on_request(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        mock_stage.return_value = make_stage(Container.Dataset, size=10**9)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+
+        plain = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert "stats" not in plain
+        parsed = json.loads(
+            await server.query_data(datasource_id="test-ds", stats=True)
+        )
+        assert parsed["stats"]["complete"] is True
+        assert set(parsed["stats"]["variables"]) == set(_small_dataset().data_vars)
+
+    async def test_small_dataset_values_have_coordinates(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
         mock_stage.return_value = make_stage(Container.Dataset, size=100)
-        mock_conn.query.return_value = _small_dataset()
+        mock_fetch.return_value = _small_dataset()
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert parsed["container"] == "dataset"
         assert parsed["data"][0]["hs"] == 1.0
         assert "time" in parsed["data"][0]
 
-    def test_library_warnings_surfaced(self, mock_conn, mock_stage):
+    async def test_library_warnings_surfaced(self, mock_conn, mock_stage, mock_fetch):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
 
         def _query_with_warning(*args, **kwargs):
             warnings.warn("Query limited to 2000000 rows")
             return pd.DataFrame({"x": [1]})
 
-        mock_conn.query.side_effect = _query_with_warning
+        mock_fetch.side_effect = _query_with_warning
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert any("2000000 rows" in w for w in parsed["warnings"])
 
-    def test_query_error_echoes_query(self, mock_conn, mock_stage):
+    async def test_repeated_warning_surfaced_every_time(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+
+        def _query_with_warning(*args, **kwargs):
+            warnings.warn("Query limited to 2000000 rows")
+            return pd.DataFrame({"x": [1]})
+
+        mock_fetch.side_effect = _query_with_warning
+
+        for _ in range(2):
+            parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+            assert parsed["warnings"] == ["Query limited to 2000000 rows"]
+
+    async def test_concurrent_downloads_overlap_and_keep_own_warnings(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        # Both downloads must be in flight at once: if captures were
+        # serialized, the second would never reach the barrier and the first
+        # would time out waiting for it.
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _slow_query(conn, query, stage, **kwargs):
+            barrier.wait()
+            warnings.warn(f"warning for {query.variables[0]}")
+            barrier.wait()
+            return pd.DataFrame({"x": [1]})
+
+        mock_fetch.side_effect = _slow_query
+        a, b = await asyncio.gather(
+            server.query_data(datasource_id="test-ds", variables=["a"]),
+            server.query_data(datasource_id="test-ds", variables=["b"]),
+        )
+        assert json.loads(a)["warnings"] == ["warning for a"]
+        assert json.loads(b)["warnings"] == ["warning for b"]
+
+    async def test_warnings_outside_capture_not_collected(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
-        mock_conn.query.side_effect = DatameshConnectError("server error: 500")
+        mock_fetch.return_value = pd.DataFrame({"x": [1]})
+
+        with pytest.warns(UserWarning, match="unrelated"):
+            warnings.warn("unrelated")
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert "warnings" not in parsed
+
+    async def test_query_error_echoes_query(self, mock_conn, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.side_effect = DatameshConnectError("server error: 500")
 
         parsed = json.loads(
-            server.query_data(datasource_id="test-ds", variables=["Hs"])
+            await server.query_data(datasource_id="test-ds", variables=["Hs"])
         )
         assert "error" in parsed
         assert parsed["query"]["datasource"] == "test-ds"
         assert parsed["query"]["variables"] == ["Hs"]
 
-    def test_session_error_returns_structured_error(self, mock_conn, mock_stage):
+    async def test_session_error_returns_structured_error(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
         mock_stage.side_effect = DatameshSessionError("bad token")
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert "bad token" in parsed["error"]
         assert parsed["query"]["datasource"] == "test-ds"
 
-    def test_midsize_eager_dataset_shows_values(self, mock_conn, mock_stage):
+    async def test_midsize_eager_dataset_shows_values(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
         # Eager datasets between 1 MB and the inline limit must include
         # values, not a false "larger than inline limit" note.
         mock_stage.return_value = make_stage(Container.Dataset, size=2_000_000)
         big = xr.Dataset({"v": (("x",), np.zeros(300_000))})
-        mock_conn.query.return_value = big
+        mock_fetch.return_value = big
 
-        parsed = json.loads(server.query_data(datasource_id="test-ds"))
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
         assert parsed["lazy"] is False
         assert len(parsed["data"]) == 100  # DEFAULT_MAX_INLINE_ROWS
         assert parsed["truncated"] is True
 
 
+class TestFetchPage:
+    async def _truncated(self, mock_stage, mock_fetch, rows: int = 250) -> dict:
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.return_value = pd.DataFrame({"x": range(rows)})
+        return json.loads(await server.query_data(datasource_id="test-ds"))
+
+    async def test_truncated_result_carries_cursor(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        parsed = await self._truncated(mock_stage, mock_fetch)
+        assert parsed["cursor"]
+        assert "fetch_page" in parsed["note"]
+
+    async def test_complete_result_has_no_cursor(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        parsed = await self._truncated(mock_stage, mock_fetch, rows=5)
+        assert "cursor" not in parsed
+
+    async def test_pages_served_without_download(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        cursor = (await self._truncated(mock_stage, mock_fetch))["cursor"]
+        page = json.loads(await server.fetch_page(cursor, offset=100))
+        assert page["rows"] == 250
+        assert [r["x"] for r in page["data"]] == list(range(100, 200))
+        assert page["next_offset"] == 200
+        last = json.loads(await server.fetch_page(cursor, offset=200, limit=500))
+        assert len(last["data"]) == 50
+        assert last["next_offset"] is None
+        assert mock_fetch.call_count == 1
+
+    async def test_evicted_table_is_downloaded_again(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        cursor = (await self._truncated(mock_stage, mock_fetch))["cursor"]
+        server._page_store.clear()
+        page = json.loads(await server.fetch_page(cursor, offset=240))
+        assert [r["x"] for r in page["data"]] == list(range(240, 250))
+        assert mock_fetch.call_count == 2
+        assert mock_fetch.call_args.kwargs["use_dask"] is False
+        assert mock_stage.call_count == 1  # stage reused from the stage cache
+
+    async def test_unknown_cursor_and_bad_paging(self, mock_conn):
+        with pytest.raises(ToolError, match="Unknown or expired cursor"):
+            await server.fetch_page("nope")
+        with pytest.raises(ToolError, match="offset"):
+            await server.fetch_page("nope", offset=-1)
+        with pytest.raises(ToolError, match="limit"):
+            await server.fetch_page("nope", limit=0)
+
+    async def test_cursor_is_private_to_its_credential(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        cursor = (await self._truncated(mock_stage, mock_fetch))["cursor"]
+        with patch.object(server, "credential_key", return_value="other-user"):
+            with pytest.raises(ToolError, match="Unknown or expired cursor"):
+                await server.fetch_page(cursor)
+
+    async def test_store_disabled_issues_no_cursor(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        with patch.object(server, "_page_store", server.ByteLRUCache(max_bytes=0)):
+            parsed = await self._truncated(mock_stage, mock_fetch)
+        assert parsed["truncated"] is True
+        assert "cursor" not in parsed
+
+
+class TestFitToBudget:
+    """query_data(fit_to_budget=True) against an hourly 0.25-degree grid."""
+
+    @pytest.fixture(autouse=True)
+    def datasource(self, monkeypatch):
+        # Plans target 80% of the limit: 1 MB, so a 20 MB result needs 20x.
+        monkeypatch.setenv("OCEANUM_MCP_MAX_INLINE_BYTES", "1250000")
+        ds = server.Datasource(
+            id="test-ds",
+            name="Hourly grid",
+            driver="onzarr",
+            coordinates={"t": "time", "x": "lon", "y": "lat"},
+            tstart="2000-01-01T00:00:00Z",
+            tend="2001-01-01T00:00:00Z",
+            geom={
+                "type": "Polygon",
+                "coordinates": [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]],
+            },
+            schema={
+                "dims": {"time": 8785, "lon": 41, "lat": 41},
+                "coords": {},
+                "data_vars": {},
+                "attrs": {},
+            },
+        )
+        with patch.object(server, "_cached_datasource", return_value=ds):
+            yield
+
+    @staticmethod
+    def _sizes(mock_stage, sizes):
+        """Stage each query at the size its time resolution maps to."""
+        mock_stage.side_effect = lambda conn, q: make_stage(
+            Container.Dataset,
+            size=sizes[q.timefilter.resolution if q.timefilter else "native"],
+        )
+
+    async def test_downsamples_and_reports(self, mock_conn, mock_stage, mock_fetch):
+        self._sizes(mock_stage, {"native": 2 * 10**7, "1D": 1000})
+        mock_fetch.return_value = _small_dataset()
+
+        parsed = json.loads(
+            await server.query_data(
+                datasource_id="test-ds",
+                time_start="2000-02-01",
+                time_end="2000-03-01",
+                fit_to_budget=True,
+            )
+        )
+        fit = parsed["fit_to_budget"]
+        assert fit["fitted"] is True
+        assert fit["changes"] == {"time_resolution": "1D", "time_resample": "mean"}
+        assert fit["original_size_bytes"] == 2 * 10**7
+        assert fit["size_bytes"] == 1000
+        assert fit["stages"] == 1
+        assert fit["query"]["timefilter"]["resolution"] == "1D"
+        assert parsed["data"]
+        assert mock_fetch.call_args.kwargs["use_dask"] is False
+        assert mock_fetch.call_args.args[1].timefilter.resolution == "1D"
+
+    async def test_replans_when_restage_is_still_too_large(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        # 1D comes back 5x over target, so the replan asks for 100x: 7D.
+        self._sizes(mock_stage, {"native": 2 * 10**7, "1D": 5 * 10**6, "7D": 1000})
+        mock_fetch.return_value = _small_dataset()
+
+        parsed = json.loads(
+            await server.query_data(
+                datasource_id="test-ds",
+                time_start="2000-01-01",
+                time_end="2000-12-31",
+                fit_to_budget=True,
+            )
+        )
+        assert parsed["fit_to_budget"]["changes"]["time_resolution"] == "7D"
+        assert parsed["fit_to_budget"]["stages"] == 2
+
+    async def test_unfittable_falls_back_to_lazy_summary(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        mock_stage.return_value = make_stage(Container.Dataset, size=10**15)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+
+        parsed = json.loads(
+            await server.query_data(datasource_id="test-ds", fit_to_budget=True)
+        )
+        assert parsed["lazy"] is True
+        assert parsed["fit_to_budget"]["fitted"] is False
+        assert "narrow" in parsed["fit_to_budget"]["message"]
+        assert mock_stage.call_count == 1
+
+    async def test_tabular_refusal_explains(self, mock_conn, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=10**9)
+
+        parsed = json.loads(
+            await server.query_data(datasource_id="test-ds", fit_to_budget=True)
+        )
+        assert parsed["refused"] is True
+        assert "gridded datasets only" in parsed["fit_to_budget"]["message"]
+        mock_fetch.assert_not_called()
+
+    async def test_small_results_untouched(self, mock_conn, mock_stage, mock_fetch):
+        mock_stage.return_value = make_stage(Container.Dataset, size=1000)
+        mock_fetch.return_value = _small_dataset()
+
+        parsed = json.loads(
+            await server.query_data(datasource_id="test-ds", fit_to_budget=True)
+        )
+        assert "fit_to_budget" not in parsed
+        assert mock_stage.call_count == 1
+
+    async def test_cached_lazy_summary_not_reused(
+        self, mock_conn, mock_stage, mock_fetch
+    ):
+        self._sizes(mock_stage, {"native": 2 * 10**7, "1D": 1000})
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+        modified = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        with patch.object(server, "_datasource_modified", return_value=modified):
+            await server.query_data(datasource_id="test-ds")
+            assert server._result_cache.stats()["entries"] == 1
+
+            mock_fetch.return_value = _small_dataset()
+            parsed = json.loads(
+                await server.query_data(datasource_id="test-ds", fit_to_budget=True)
+            )
+        assert parsed["fit_to_budget"]["fitted"] is True
+
+
 class TestExportQuery:
-    def test_frame_to_parquet(self, mock_conn, mock_stage, tmp_path):
+    async def test_frame_to_parquet(self, mock_conn, mock_stage, mock_fetch, tmp_path):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
-        mock_conn.query.return_value = pd.DataFrame({"temp": [15.0, 16.0]})
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0, 16.0]})
         dest = tmp_path / "out.parquet"
 
         parsed = json.loads(
-            server.export_query(datasource_id="test-ds", path=str(dest))
+            await server.export_query(datasource_id="test-ds", path=str(dest))
         )
         assert dest.exists()
         assert parsed["format"] == "parquet"
@@ -374,161 +1213,859 @@ class TestExportQuery:
         assert "truncated" not in parsed["summary"]
         assert "note" not in parsed["summary"]
 
-    def test_frame_to_csv(self, mock_conn, mock_stage, tmp_path):
+    async def test_frame_to_csv(self, mock_conn, mock_stage, mock_fetch, tmp_path):
         mock_stage.return_value = make_stage(Container.DataFrame, size=100)
-        mock_conn.query.return_value = pd.DataFrame({"temp": [15.0]})
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0]})
         dest = tmp_path / "out.csv"
 
         parsed = json.loads(
-            server.export_query(datasource_id="test-ds", path=str(dest), format="csv")
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), format="csv"
+            )
         )
         assert parsed["format"] == "csv"
         assert "temp" in dest.read_text()
 
-    def test_dataset_to_netcdf_streams_lazily(self, mock_conn, mock_stage, tmp_path):
+    async def test_dataset_to_netcdf_streams_lazily(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
         mock_stage.return_value = make_stage(Container.Dataset, size=100)
-        mock_conn.query.return_value = _small_dataset()
+        mock_fetch.return_value = _small_dataset()
         dest = tmp_path / "out.nc"
 
         parsed = json.loads(
-            server.export_query(datasource_id="test-ds", path=str(dest))
+            await server.export_query(datasource_id="test-ds", path=str(dest))
         )
         assert dest.exists()
         assert parsed["format"] == "netcdf"
-        assert mock_conn.query.call_args.kwargs["use_dask"] is True
+        assert mock_fetch.call_args.kwargs["use_dask"] is True
+
+    async def test_dataset_to_zarr_store(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        mock_stage.return_value = make_stage(Container.Dataset, size=100)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+        dest = tmp_path / "out.zarr"
+
+        for overwrite in (False, True):
+            parsed = json.loads(
+                await server.export_query(
+                    datasource_id="test-ds",
+                    path=str(dest),
+                    format="zarr",
+                    compression="lz4",
+                    compression_level=7,
+                    overwrite=overwrite,
+                )
+            )
+            assert parsed["format"] == "zarr"
+            assert parsed["bytes_written"] > 0
+            assert parsed["throughput"]["chunks"] >= 3
+        written = xr.open_zarr(dest)
+        assert written["hs"].encoding["compressor"].clevel == 7
+        with pytest.raises(ToolError, match="overwrite"):
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), format="zarr"
+            )
+
+    async def test_failed_zarr_export_resumes_without_overwrite(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        mock_stage.return_value = make_stage(Container.Dataset, size=100)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+        ds = _small_dataset().chunk({"time": 1})
+        full = ds["hs"].data
+
+        def fail(block):
+            raise OSError("No space left on device")
+
+        ds["hs"] = ds["hs"].copy(data=full.map_blocks(fail, meta=full._meta))
+        mock_fetch.return_value = ds
+        dest = tmp_path / "out.zarr"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), format="zarr"
+            )
+        )
+        assert "No space left" in parsed["error"]
+        assert "resumable" in parsed
+        assert dest.exists()
+
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), format="zarr"
+            )
+        )
+        assert parsed["resumed"] == {"pieces": 2, "skipped": 1}
+        assert not (tmp_path / "out.zarr.manifest.json").exists()
+        assert list(xr.open_zarr(dest)["hs"].values) == [1.0, 2.0, 3.0]
+
+    async def test_progress_reported_through_stage_and_chunks(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        from oceanum_mcp.common import progress
+
+        sent = []
+
+        class Context:
+            async def report_progress(self, value, total=None, message=None):
+                sent.append((value, total, message))
+
+        mock_stage.return_value = make_stage(Container.Dataset, size=100)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
+        with patch.object(progress, "get_context", return_value=Context()):
+            await server.export_query(
+                datasource_id="test-ds", path=str(tmp_path / "out.nc")
+            )
+            await asyncio.sleep(0.01)
+
+        # Notifications queued while one is sent collapse to the latest.
+        assert sent[-1][2] == "3/3 chunks written to out.nc"
+        assert [value for value, _, _ in sent] == sorted(value for value, _, _ in sent)
+
+    async def test_cancelled_export_stops_and_removes_partial_file(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("OCEANUM_MCP_EXPORT_WORKERS", "1")
+        mock_stage.return_value = make_stage(Container.Dataset, size=100)
+        ds = _small_dataset().chunk({"time": 1})
+        full = ds["hs"].data
+        started = threading.Event()
+        blocks = []
+
+        def slow(block):
+            blocks.append(block)
+            started.set()
+            time.sleep(0.2)
+            return block
+
+        ds["hs"] = ds["hs"].copy(data=full.map_blocks(slow, meta=full._meta))
+        mock_fetch.return_value = ds
+        dest = tmp_path / "out.zarr"
+
+        task = asyncio.ensure_future(
+            server.export_query(datasource_id="test-ds", path=str(dest), format="zarr")
+        )
+        await anyio.to_thread.run_sync(started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The chunk being written finished; the rest never started.
+        assert len(blocks) < 3
+        assert not dest.exists()
+        assert not (tmp_path / "out.zarr.manifest.json").exists()
+
+    async def test_zarr_refuses_plain_directory_and_bad_settings(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        with pytest.raises(ToolError, match="existing directory"):
+            await server.export_query(
+                datasource_id="test-ds",
+                path=str(tmp_path),
+                format="zarr",
+                overwrite=True,
+            )
+        with pytest.raises(ToolError, match="format='zarr' only"):
+            await server.export_query(
+                datasource_id="test-ds",
+                path=str(tmp_path / "out.nc"),
+                compression="zstd",
+            )
+        with pytest.raises(ToolError, match="between 1 and 9"):
+            await server.export_query(
+                datasource_id="test-ds",
+                path=str(tmp_path / "out.zarr"),
+                format="zarr",
+                compression_level=12,
+            )
+
+    async def test_netcdf_export_reports_throughput(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("OCEANUM_MCP_EXPORT_WORKERS", "3")
+        mock_stage.return_value = make_stage(Container.Dataset, size=100)
+        mock_fetch.return_value = _small_dataset().chunk({"time": 1})
 
-    def test_dataset_rejects_csv(self, mock_conn, mock_stage, tmp_path):
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(tmp_path / "out.nc")
+            )
+        )
+        assert parsed["throughput"]["workers"] == 3
+        assert parsed["throughput"]["chunks"] >= 3
+        assert set(parsed["throughput"]) >= {"mb_per_s", "chunks_per_s", "seconds"}
+
+    async def test_dataset_rejects_csv(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
         mock_stage.return_value = make_stage(Container.Dataset, size=100)
 
         with pytest.raises(ToolError, match="netcdf"):
-            server.export_query(
+            await server.export_query(
                 datasource_id="test-ds",
                 path=str(tmp_path / "out.csv"),
                 format="csv",
             )
 
-    def test_path_required_on_stdio(self, mock_conn, mock_stage):
+    async def test_path_required_on_stdio(self, mock_conn, mock_stage, mock_fetch):
         with pytest.raises(ToolError, match="path is required"):
-            server.export_query(datasource_id="test-ds")
+            await server.export_query(datasource_id="test-ds")
 
-    def test_refuses_overwrite(self, mock_conn, mock_stage, tmp_path):
+    async def test_refuses_overwrite(self, mock_conn, mock_stage, mock_fetch, tmp_path):
         dest = tmp_path / "exists.nc"
         dest.write_text("data")
 
         with pytest.raises(ToolError, match="overwrite"):
-            server.export_query(datasource_id="test-ds", path=str(dest))
+            await server.export_query(datasource_id="test-ds", path=str(dest))
 
-    def test_oversized_frame_refused(self, mock_conn, mock_stage, tmp_path):
+    async def test_oversized_unsplittable_frame_refused(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        # No time coverage or selections: nothing to stream sub-queries by.
         mock_stage.return_value = make_stage(Container.DataFrame, size=3 * 10**9)
+        ds = server.Datasource(id="test-ds", name="Static", driver="onsql")
 
-        parsed = json.loads(
-            server.export_query(
-                datasource_id="test-ds", path=str(tmp_path / "out.parquet")
+        with patch.object(server, "_cached_datasource", return_value=ds):
+            parsed = json.loads(
+                await server.export_query(
+                    datasource_id="test-ds", path=str(tmp_path / "out.parquet")
+                )
             )
-        )
         assert parsed["refused"] is True
-        mock_conn.query.assert_not_called()
+        assert "streamed" in parsed["message"]
+        mock_fetch.assert_not_called()
 
-    def test_none_result_writes_nothing(self, mock_conn, mock_stage, tmp_path):
+    async def test_none_result_writes_nothing(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
         mock_stage.return_value = make_stage(Container.Dataset, size=100)
-        mock_conn.query.return_value = None
+        mock_fetch.return_value = None
         dest = tmp_path / "out.nc"
 
         parsed = json.loads(
-            server.export_query(datasource_id="test-ds", path=str(dest))
+            await server.export_query(datasource_id="test-ds", path=str(dest))
         )
         assert parsed["status"] == "no_data"
         assert not dest.exists()
 
-    def test_write_failure_cleans_partial_file(self, mock_conn, mock_stage, tmp_path):
+    async def test_write_failure_cleans_partial_file(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
         mock_stage.return_value = make_stage(Container.Dataset, size=100)
         broken = MagicMock()
         broken.to_netcdf.side_effect = DatameshConnectError("chunk fetch failed")
-        mock_conn.query.return_value = broken
+        mock_fetch.return_value = broken
         dest = tmp_path / "out.nc"
 
         parsed = json.loads(
-            server.export_query(datasource_id="test-ds", path=str(dest))
+            await server.export_query(datasource_id="test-ds", path=str(dest))
         )
         assert "chunk fetch failed" in parsed["error"]
         assert not dest.exists()
 
-    def test_export_dir_confinement(self, mock_conn, mock_stage, tmp_path, monkeypatch):
+    async def test_export_dir_confinement(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
         monkeypatch.setenv("OCEANUM_MCP_EXPORT_DIR", str(tmp_path / "allowed"))
         with pytest.raises(ToolError, match="OCEANUM_MCP_EXPORT_DIR"):
-            server.export_query(
+            await server.export_query(
                 datasource_id="test-ds", path=str(tmp_path / "escape.nc")
             )
 
 
+class TestShardedExport:
+    """Local tabular export in sub-queries (sharded=True, or streamed because
+    it is large), four days of observations."""
+
+    @pytest.fixture(autouse=True)
+    def datasource(self):
+        ds = server.Datasource(
+            id="test-ds",
+            name="Observations",
+            driver="onsql",
+            tstart="2000-01-01T00:00:00Z",
+            tend="2000-01-05T00:00:00Z",
+        )
+        with patch.object(server, "_cached_datasource", return_value=ds):
+            yield
+
+    @staticmethod
+    def _bounds(q):
+        """A shard's time range; the outer shards keep the query's open ends."""
+        start, end = q.timefilter.times
+        return (
+            pd.Timestamp(start or "2000-01-01"),
+            pd.Timestamp(end or "2000-01-05"),
+        )
+
+    @classmethod
+    def _serve(
+        cls, mock_stage, mock_fetch, whole_dlen, shard_dlen=100_000, whole_size=100
+    ):
+        """The whole query stages at whole_dlen rows, every shard at shard_dlen.
+
+        Each shard stages at 100 bytes and downloads as one row stamped with
+        its start time.
+        """
+
+        def stage(conn, q):
+            if q.timefilter is None:
+                return make_stage(Container.DataFrame, size=whole_size, dlen=whole_dlen)
+            dlen = shard_dlen(q) if callable(shard_dlen) else shard_dlen
+            return make_stage(Container.DataFrame, size=100, dlen=dlen)
+
+        mock_stage.side_effect = stage
+        mock_fetch.side_effect = lambda conn, q, st, **kw: pd.DataFrame(
+            {"time": [cls._bounds(q)[0]]}
+        )
+
+    async def test_shards_fetched_and_concatenated_in_order(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        self._serve(mock_stage, mock_fetch, whole_dlen=1_000_000)
+        dest = tmp_path / "out.parquet"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), sharded=True
+            )
+        )
+        assert parsed["sharding"] == {
+            "applied": True,
+            "axis": "time",
+            "count": 4,
+            "capped": 0,
+        }
+        written = pd.read_parquet(dest)
+        assert list(written["time"]) == list(
+            pd.date_range("2000-01-01", periods=4, freq="1D")
+        )
+
+    async def test_shard_at_row_cap_split_again(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        def shard_dlen(q):
+            start, end = self._bounds(q)
+            # Half-day shards still hit the cap; quarter days do not.
+            return server.DATAMESH_ROW_CAP if end - start > pd.Timedelta("7h") else 1
+
+        self._serve(
+            mock_stage,
+            mock_fetch,
+            whole_dlen=server.DATAMESH_ROW_CAP,
+            shard_dlen=shard_dlen,
+        )
+        dest = tmp_path / "out.parquet"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), sharded=True
+            )
+        )
+        # 8 half-day shards, each halved into quarter days.
+        assert parsed["sharding"]["count"] == 16
+        assert parsed["sharding"]["capped"] == 0
+        assert pd.read_parquet(dest)["time"].is_monotonic_increasing
+
+    async def test_concurrency_bounded(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("OCEANUM_MCP_STAGE_CONCURRENCY", "2")
+        self._serve(mock_stage, mock_fetch, whole_dlen=2_000_000 - 1)
+        active = peak = 0
+        lock = threading.Lock()
+        fetch = mock_fetch.side_effect
+
+        def tracked(*args, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                threading.Event().wait(0.01)
+                return fetch(*args, **kwargs)
+            finally:
+                with lock:
+                    active -= 1
+
+        mock_fetch.side_effect = tracked
+        await server.export_query(
+            datasource_id="test-ds",
+            path=str(tmp_path / "out.parquet"),
+            sharded=True,
+        )
+        assert mock_fetch.call_count == 8
+        assert peak == 2
+
+    async def test_nothing_to_shard_exports_whole(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.return_value = pd.DataFrame({"x": [1]})
+        with patch.object(
+            server,
+            "_cached_datasource",
+            return_value=server.Datasource(id="test-ds", name="Static", driver="onsql"),
+        ):
+            parsed = json.loads(
+                await server.export_query(
+                    datasource_id="test-ds",
+                    path=str(tmp_path / "out.parquet"),
+                    sharded=True,
+                )
+            )
+        assert parsed["sharding"]["applied"] is False
+        assert mock_fetch.call_count == 1
+
+    async def test_large_frame_streams_one_shard_at_a_time(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        # Above the 2 GB in-memory limit; 1 GB chunks stream it in 3 pieces.
+        monkeypatch.setenv("OCEANUM_MCP_EXPORT_CHUNK_BYTES", "1000000000")
+        self._serve(mock_stage, mock_fetch, whole_dlen=1000, whole_size=3 * 10**9)
+        active = peak = 0
+        lock = threading.Lock()
+        fetch = mock_fetch.side_effect
+
+        def tracked(*args, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                threading.Event().wait(0.01)
+                return fetch(*args, **kwargs)
+            finally:
+                with lock:
+                    active -= 1
+
+        mock_fetch.side_effect = tracked
+        dest = tmp_path / "out.parquet"
+
+        parsed = json.loads(
+            await server.export_query(datasource_id="test-ds", path=str(dest))
+        )
+        assert parsed["streamed"] is True
+        assert parsed["sharding"]["count"] == 3
+        # The open query stays open at both ends: nothing outside the
+        # catalog's coverage is cut off.
+        fetched = sorted(
+            (call.args[1] for call in mock_fetch.call_args_list),
+            key=lambda q: self._bounds(q)[0],
+        )
+        assert fetched[0].timefilter.times[0] is None
+        assert fetched[-1].timefilter.times[1] is None
+        assert parsed["summary"]["rows"] == 3
+        assert mock_fetch.call_count == 3
+        assert peak == 1
+        written = pd.read_parquet(dest)
+        assert written["time"].is_monotonic_increasing
+        assert pq.ParquetFile(dest).num_row_groups == 3
+
+    async def test_streamed_shards_staged_once(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        # Many shards overflow the stage cache; an export must not rely on it.
+        monkeypatch.setenv("OCEANUM_MCP_EXPORT_CHUNK_BYTES", "1000")
+        self._serve(mock_stage, mock_fetch, whole_dlen=1000, whole_size=40_000)
+        dest = tmp_path / "out.parquet"
+
+        with patch.object(server, "_stage_cache", server.TTLCache(1, 300)):
+            parsed = json.loads(
+                await server.export_query(datasource_id="test-ds", path=str(dest))
+            )
+        count = parsed["sharding"]["count"]
+        assert count == 40
+        # The whole query once, then every shard once.
+        assert mock_stage.call_count == 1 + count
+        assert mock_fetch.call_count == count
+
+    async def test_large_resampled_frame_downloaded_whole(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("OCEANUM_MCP_EXPORT_CHUNK_BYTES", "100000000")
+        mock_stage.return_value = make_stage(Container.DataFrame, size=5 * 10**8)
+        mock_fetch.return_value = pd.DataFrame({"time": [pd.Timestamp("2000-01-01")]})
+        dest = tmp_path / "out.parquet"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds",
+                path=str(dest),
+                time_start="2000-01-01",
+                time_end="2000-12-31",
+                time_resolution="1MS",
+                time_resample="mean",
+            )
+        )
+        assert "streamed" not in parsed
+        assert mock_stage.call_count == 1
+        assert mock_fetch.call_args.args[1].timefilter.resolution == "1MS"
+
+    async def test_sharded_csv_streams_with_one_header(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        self._serve(mock_stage, mock_fetch, whole_dlen=1_000_000)
+        dest = tmp_path / "out.csv"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), format="csv", sharded=True
+            )
+        )
+        assert parsed["streamed"] is True
+        assert dest.read_text().splitlines() == [
+            "time",
+            "2000-01-01",
+            "2000-01-02",
+            "2000-01-03",
+            "2000-01-04",
+        ]
+
+    async def test_stream_failure_resumes_where_it_stopped(
+        self, mock_conn, mock_stage, mock_fetch, tmp_path
+    ):
+        self._serve(mock_stage, mock_fetch, whole_dlen=1_000_000)
+        fetch = mock_fetch.side_effect
+
+        def flaky(conn, q, st, **kw):
+            if self._bounds(q)[0].day == 3:
+                raise DatameshConnectError("connection reset")
+            return fetch(conn, q, st, **kw)
+
+        mock_fetch.side_effect = flaky
+        dest = tmp_path / "out.parquet"
+
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), sharded=True
+            )
+        )
+        assert "connection reset" in parsed["error"]
+        assert parsed["resumable"]["pieces"] == 4
+        assert parsed["resumable"]["done"] == 2
+        assert not dest.exists()
+        assert (tmp_path / "out.parquet.manifest.json").exists()
+
+        mock_fetch.reset_mock()
+        mock_fetch.side_effect = fetch
+        parsed = json.loads(
+            await server.export_query(
+                datasource_id="test-ds", path=str(dest), sharded=True
+            )
+        )
+        assert parsed["resumed"] == {"pieces": 4, "skipped": 2}
+        assert mock_fetch.call_count == 2
+        assert list(pd.read_parquet(dest)["time"]) == list(
+            pd.date_range("2000-01-01", periods=4, freq="1D")
+        )
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["out.parquet"]
+
+    async def test_rejects_limit(self, mock_conn, tmp_path):
+        with pytest.raises(ToolError, match="sharded"):
+            await server.export_query(
+                datasource_id="test-ds",
+                path=str(tmp_path / "out.parquet"),
+                limit=10,
+                sharded=True,
+            )
+
+
 class _Resp:
     """Minimal stand-in for a requests.Response from the gateway."""
 
-    def __init__(self, status_code, payload=None, text=""):
+    def __init__(self, status_code, payload=None, text="", content=b""):
         self.status_code = status_code
         self._payload = payload
         self.text = text
+        self.content = content
 
     def json(self):
         if self._payload is None:
             raise ValueError("no json body")
         return self._payload
 
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self):
+        pass
+
 
 class TestDownloadStage:
     """The gateway-contact helper behind hosted export (not mocked out)."""
 
     @staticmethod
-    def _conn(resp=None, exc=None):
-        conn = MagicMock()
-        conn._gateway = "https://gw.test"
-        if exc is not None:
-            conn._retried_request.side_effect = exc
-        else:
-            conn._retried_request.return_value = resp
-        return conn
-
-    def _run(self, conn):
-        with patch.object(server.Session, "acquire", return_value=MagicMock(header={})):
-            return server._download_stage(conn, Query(datasource="test-ds"))
+    async def _run():
+        return await server._download_stage(
+            server.get_datamesh_connector(), Query(datasource="test-ds")
+        )
 
-    def test_success_returns_dict_with_long_timeout(self):
-        conn = self._conn(_Resp(200, {"url": "https://gw.test/x?a=b", "size": 10}))
-        out = self._run(conn)
+    async def test_success_returns_dict_with_long_timeout(self, gateway_http):
+        gateway_http.route(
+            "POST",
+            "/oceanql/download/",
+            httpx.Response(200, json={"url": "https://gw.test/x?a=b", "size": 10}),
+        )
+        out = await self._run()
         assert out["url"] == "https://gw.test/x?a=b"
+        request = gateway_http.calls("POST", "/oceanql/download/")[0]
         # The stage read timeout (not the 10s default) must be used.
-        assert (
-            conn._retried_request.call_args.kwargs["timeout"][1]
-            == server.DATAMESH_STAGE_READ_TIMEOUT
+        assert request.extensions["timeout"]["read"] == (
+            server.DATAMESH_STAGE_READ_TIMEOUT
+        )
+        assert request.headers["X-DATAMESH-SESSIONID"] == "sess-1"
+        assert json.loads(request.content)["datasource"] == "test-ds"
+
+    async def test_204_returns_none(self, gateway_http):
+        gateway_http.route("POST", "/oceanql/download/", httpx.Response(204))
+        assert await self._run() is None
+
+    async def test_400_with_detail_raises_query_error(self, gateway_http):
+        gateway_http.route(
+            "POST",
+            "/oceanql/download/",
+            httpx.Response(400, json={"detail": "bad datasource"}),
         )
-        assert conn._retried_request.call_args.args[0].endswith("/oceanql/download/")
-
-    def test_204_returns_none(self):
-        assert self._run(self._conn(_Resp(204))) is None
-
-    def test_400_with_detail_raises_query_error(self):
-        conn = self._conn(_Resp(400, {"detail": "bad datasource"}, text="{}"))
         with pytest.raises(DatameshQueryError, match="bad datasource"):
-            self._run(conn)
+            await self._run()
 
-    def test_error_without_detail_raises_connect_error(self):
-        conn = self._conn(_Resp(500, None, text="upstream boom"))
+    async def test_error_without_detail_raises_connect_error(self, gateway_http):
+        gateway_http.route(
+            "POST", "/oceanql/download/", httpx.Response(500, text="upstream boom")
+        )
         with pytest.raises(DatameshConnectError, match="upstream boom"):
-            self._run(conn)
+            await self._run()
+
+    async def test_transport_error_raises_connect_error(self, gateway_http):
+        def _refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
 
-    def test_attribute_error_becomes_toolerror(self):
-        conn = self._conn(exc=AttributeError("no _retried_request"))
+        gateway_http.route("POST", "/oceanql/download/", _refuse)
+        with pytest.raises(DatameshConnectError, match="connection refused"):
+            await self._run()
+
+    async def test_session_failure_raises_session_error(self, gateway_http):
+        gateway_http.route("GET", "/session/", httpx.Response(403, text="denied"))
+        with pytest.raises(DatameshSessionError, match="denied"):
+            await self._run()
+        assert not gateway_http.calls("POST", "/oceanql/download/")
+
+    async def test_attribute_error_becomes_toolerror(self, gateway_http):
+        del server.get_datamesh_connector()._auth_headers
         with pytest.raises(ToolError, match="oceanum version"):
-            self._run(conn)
+            await self._run()
+
+    async def test_session_closed_even_on_error(self, gateway_http):
+        gateway_http.route(
+            "POST", "/oceanql/download/", httpx.Response(500, text="boom")
+        )
+        with pytest.raises(DatameshConnectError):
+            await self._run()
+        assert gateway_http.calls("DELETE", "/session/sess-1")
 
-    def test_session_closed_even_on_error(self):
+
+class TestFetchStaged:
+    """Downloading from an existing stage, without staging again."""
+
+    @staticmethod
+    def _conn(resp):
+        conn = MagicMock()
+        conn._gateway = "https://gw.test"
+        conn.http_session.request.return_value = resp
+        return conn
+
+    def _run(self, conn, stage, **kwargs):
+        with patch.object(server.Session, "acquire", return_value=MagicMock(header={})):
+            return server._fetch_staged(
+                conn, Query(datasource="test-ds"), stage, **kwargs
+            )
+
+    def test_downloads_frame_without_restaging(self):
+        df = pd.DataFrame({"temp": [15.0, 16.0]})
+        conn = self._conn(_Resp(200, content=df.to_parquet()))
+
+        out = self._run(conn, make_stage(Container.DataFrame, size=100))
+        pd.testing.assert_frame_equal(out, df)
+        conn._stage_request.assert_not_called()
+        conn.query.assert_not_called()
+        request = conn.http_session.request.call_args.kwargs
+        assert request["url"].endswith("/oceanql/")
+        assert request["headers"]["Accept"] == "application/parquet"
+        assert request["stream"] is True
+
+    def test_downloads_eager_dataset_as_netcdf(self):
+        conn = self._conn(_Resp(200, content=_small_dataset().to_netcdf()))
+
+        out = self._run(conn, make_stage(Container.Dataset, size=100))
+        assert isinstance(out, xr.Dataset)
+        assert out["hs"].values.tolist() == [1.0, 2.0, 3.0]
+        headers = conn.http_session.request.call_args.kwargs["headers"]
+        assert headers["Accept"] == "application/x-netcdf4"
+
+    def test_lazy_dataset_opens_staged_qhash(self):
+        conn = self._conn(None)
+        with patch.object(server, "_open_lazy", return_value="lazy") as opener:
+            out = self._run(conn, make_stage(Container.Dataset), use_dask=True)
+        assert out == "lazy"
+        opener.assert_called_once_with(conn, "qhash", "query")
+        conn.http_session.request.assert_not_called()
+
+    def test_row_cap_warning_reemitted(self):
+        conn = self._conn(_Resp(200, content=pd.DataFrame({"x": [1]}).to_parquet()))
+        stage = make_stage(Container.DataFrame, size=100, dlen=3_000_000)
+
+        with pytest.warns(UserWarning, match="limited to 2000000 rows"):
+            self._run(conn, stage)
+
+    def test_204_returns_none(self):
+        conn = self._conn(_Resp(204))
+        assert self._run(conn, make_stage(Container.DataFrame)) is None
+
+    def test_cancel_stops_download_between_blocks(self):
+        resp = _Resp(200, content=b"x" * (3 * server._DOWNLOAD_BLOCK_BYTES))
+        resp.close = MagicMock()
+        conn = self._conn(resp)
+        cancel = threading.Event()
+        blocks = resp.iter_content
+
+        def cancel_after_first(chunk_size):
+            for block in blocks(chunk_size):
+                yield block
+                cancel.set()
+
+        resp.iter_content = cancel_after_first
+        with cancellable(cancel), pytest.raises(Cancelled):
+            self._run(conn, make_stage(Container.DataFrame, size=100))
+        resp.close.assert_called_once()
+
+    def test_error_with_detail_raises_query_error(self):
+        conn = self._conn(_Resp(400, {"detail": "bad variable"}, text="{}"))
+        with pytest.raises(DatameshQueryError, match="bad variable"):
+            self._run(conn, make_stage(Container.DataFrame))
+
+    def test_session_closed_after_download(self):
         sess = MagicMock(header={})
-        conn = self._conn(exc=AttributeError("boom"))
+        conn = self._conn(_Resp(500, None, text="boom"))
         with patch.object(server.Session, "acquire", return_value=sess):
-            with pytest.raises(ToolError):
-                server._download_stage(conn, Query(datasource="test-ds"))
+            with pytest.raises(DatameshConnectError, match="boom"):
+                server._fetch_staged(
+                    conn, Query(datasource="test-ds"), make_stage(Container.DataFrame)
+                )
         sess.close.assert_called_once()
 
+    def test_single_stage_disabled_falls_back_to_conn_query(self, monkeypatch):
+        monkeypatch.setenv("OCEANUM_MCP_SINGLE_STAGE", "0")
+        conn = self._conn(None)
+        conn.query.return_value = "via-library"
+
+        out = self._run(conn, make_stage(Container.DataFrame))
+        assert out == "via-library"
+        conn.http_session.request.assert_not_called()
+
+
+class TestSingleStagePerCall:
+    """Each data tool makes exactly one staging request to the gateway."""
+
+    @pytest.fixture
+    def gateway(self, gateway_http, mock_conn):
+        gateway_http.route(
+            "POST",
+            "/oceanql/stage/",
+            httpx.Response(
+                200,
+                json=make_stage(Container.DataFrame, size=100).model_dump(mode="json"),
+            ),
+        )
+        mock_conn.http_session.request.return_value = _Resp(
+            200, content=pd.DataFrame({"temp": [15.0, 16.0]}).to_parquet()
+        )
+        with patch.object(server.Session, "acquire", return_value=MagicMock(header={})):
+            yield gateway_http
+
+    def _stage_calls(self, gateway):
+        return len(gateway.calls("POST", "/oceanql/stage/"))
+
+    async def test_query_data(self, gateway, mock_conn):
+        parsed = json.loads(await server.query_data(datasource_id="test-ds"))
+        assert parsed["rows"] == 2
+        assert self._stage_calls(gateway) == 1
+        mock_conn._stage_request.assert_not_called()
+        mock_conn.query.assert_not_called()
+
+    async def test_export_query(self, gateway, mock_conn, tmp_path):
+        dest = tmp_path / "out.parquet"
+        parsed = json.loads(
+            await server.export_query(datasource_id="test-ds", path=str(dest))
+        )
+        assert parsed["format"] == "parquet"
+        assert dest.exists()
+        assert self._stage_calls(gateway) == 1
+        mock_conn.query.assert_not_called()
+
+    async def test_load_datasource(self, gateway, mock_conn, tmp_path):
+        pq = tmp_path / "ds.parquet"
+        pd.DataFrame({"temp": [15.0]}).to_parquet(pq)
+        mock_conn._data_request.return_value = str(pq)
+
+        parsed = json.loads(await server.load_datasource(datasource_id="test-ds"))
+        assert parsed["rows"] == 1
+        assert self._stage_calls(gateway) == 1
+        mock_conn.load_datasource.assert_not_called()
+
+
+class TestAsyncStaging:
+    """Staging awaits the gateway on the event loop, not on a worker thread."""
+
+    async def test_concurrent_stagings_overlap_without_threads(
+        self, gateway_http, mock_conn, monkeypatch
+    ):
+        # Both stagings must be in flight at once; the gate only opens when
+        # the second arrives. Worker threads are disallowed for the duration.
+        arrived = []
+        gate = asyncio.Event()
+
+        async def _slow_stage(request):
+            arrived.append(json.loads(request.content)["variables"])
+            if len(arrived) == 2:
+                gate.set()
+            await asyncio.wait_for(gate.wait(), timeout=5)
+            return httpx.Response(
+                200, json=make_stage(size=100).model_dump(mode="json")
+            )
+
+        gateway_http.route("POST", "/oceanql/stage/", _slow_stage)
+
+        async def _connector():
+            return mock_conn
+
+        async def _no_threads(*args, **kwargs):
+            raise AssertionError("staging must not use a worker thread")
+
+        monkeypatch.setattr(server, "_connector", _connector)
+        monkeypatch.setattr(server.anyio.to_thread, "run_sync", _no_threads)
+        a, b = await asyncio.gather(
+            server.stage_query(datasource_id="test-ds", variables=["a"]),
+            server.stage_query(datasource_id="test-ds", variables=["b"]),
+        )
+        assert json.loads(a)["size_bytes"] == json.loads(b)["size_bytes"] == 100
+        assert sorted(arrived) == [["a"], ["b"]]
+
+    def test_shared_client_per_event_loop(self):
+        from oceanum_mcp.common.client import get_gateway_http
+
+        async def _get():
+            return get_gateway_http(), get_gateway_http()
+
+        first, again = asyncio.run(_get())
+        assert first is again
+        other, _ = asyncio.run(_get())
+        assert other is not first
+
 
 class TestExportQueryHosted:
     """export_query on a network transport brokers a gateway download URL."""
@@ -550,9 +2087,9 @@ class TestExportQueryHosted:
             "url": url or "https://datamesh.oceanum.io/oceanql/abc$?auth=u&sig=xyz",
         }
 
-    def test_returns_download_url_not_path(self, mock_conn):
+    async def test_returns_download_url_not_path(self, mock_conn):
         with patch.object(server, "_download_stage", return_value=self._stage()):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert "path" not in parsed
         assert parsed["download_url"].endswith("&f=parquet")
         assert parsed["download_url"].startswith("https://datamesh.oceanum.io/oceanql/")
@@ -561,114 +2098,255 @@ class TestExportQueryHosted:
         assert parsed["available_formats"] == ["nc", "parquet", "csv"]
         assert "self-authenticating" in parsed["note"]
 
-    def test_path_ignored_on_hosted(self, mock_conn, tmp_path):
+    async def test_path_ignored_on_hosted(self, mock_conn, tmp_path):
         # A path arg does not cause a local write on hosted; a URL is returned
         # and the response signals the path was ignored.
         dest = tmp_path / "ignored.parquet"
         with patch.object(server, "_download_stage", return_value=self._stage()):
             parsed = json.loads(
-                server.export_query(datasource_id="test-ds", path=str(dest))
+                await server.export_query(datasource_id="test-ds", path=str(dest))
             )
         assert "download_url" in parsed
         assert "path" not in parsed
         assert not dest.exists(), "hosted export must not write a local file"
         assert "ignored on hosted" in parsed["note"]
 
-    def test_url_without_query_string_uses_question_mark(self, mock_conn):
+    async def test_url_without_query_string_uses_question_mark(self, mock_conn):
         stage = self._stage(url="https://datamesh.oceanum.io/oceanql/bare")
         with patch.object(server, "_download_stage", return_value=stage):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert parsed["download_url"].endswith("/oceanql/bare?f=parquet")
 
-    def test_missing_url_is_no_data(self, mock_conn):
+    async def test_missing_url_is_no_data(self, mock_conn):
         stage = {"container": "dataframe", "size": 1, "formats": ["parquet"]}
         with patch.object(server, "_download_stage", return_value=stage):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert parsed["status"] == "no_data"
 
-    def test_dataset_defaults_to_netcdf_format_token(self, mock_conn):
+    async def test_zarr_is_local_only(self, mock_conn):
+        stage = self._stage(container="dataset")
+        with patch.object(server, "_download_stage", return_value=stage):
+            with pytest.raises(ToolError, match="local store"):
+                await server.export_query(datasource_id="test-ds", format="zarr")
+
+    async def test_dataset_defaults_to_netcdf_format_token(self, mock_conn):
         with patch.object(
             server, "_download_stage", return_value=self._stage(container="dataset")
         ):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert parsed["format"] == "netcdf"
         assert parsed["download_url"].endswith("&f=nc")
 
-    def test_dataset_can_export_csv_when_advertised(self, mock_conn):
+    async def test_repeat_reuses_download_stage_in_any_format(self, mock_conn):
+        with patch.object(
+            server, "_download_stage", return_value=self._stage()
+        ) as download:
+            first = json.loads(await server.export_query(datasource_id="test-ds"))
+            again = json.loads(
+                await server.export_query(datasource_id="test-ds", format="csv")
+            )
+        assert download.call_count == 1
+        assert first["download_url"].endswith("sig=xyz&f=parquet")
+        assert again["download_url"].endswith("sig=xyz&f=csv")
+
+    async def test_url_near_expiry_is_not_reused(self, mock_conn):
+        signed = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        url = (
+            "https://bucket.s3.amazonaws.com/abc?X-Amz-Date="
+            f"{signed}&X-Amz-Expires=60&X-Amz-Signature=xyz"
+        )
+        with patch.object(
+            server, "_download_stage", return_value=self._stage(url=url)
+        ) as download:
+            for _ in range(2):
+                await server.export_query(datasource_id="test-ds")
+        assert download.call_count == 2
+
+    @pytest.mark.parametrize(
+        ("stage", "left"),
+        [
+            ({"expires_in": 900}, 900),
+            ({"expires_at": "2001-09-09T01:46:40Z"}, 10**9),
+            ({"url": "https://x/y?Expires=1000000000&Signature=s"}, 10**9),
+            ({"url": "https://x/y?sig=s"}, server._DOWNLOAD_URL_DEFAULT_VALIDITY_S),
+        ],
+    )
+    def test_validity_from_response_or_url(self, stage, left):
+        stage = {"url": "https://x/y", **stage}
+        with patch.object(server.time, "time", return_value=0.0):
+            assert server._download_validity_s(stage) == left
+
+    async def test_dataset_can_export_csv_when_advertised(self, mock_conn):
         # The gateway serves CSV for a point-extracted dataset; validation is
         # against the advertised formats, not the container.
         with patch.object(
             server, "_download_stage", return_value=self._stage(container="dataset")
         ):
             parsed = json.loads(
-                server.export_query(datasource_id="test-ds", format="csv")
+                await server.export_query(datasource_id="test-ds", format="csv")
             )
         assert parsed["download_url"].endswith("&f=csv")
 
-    def test_rejects_format_not_advertised(self, mock_conn):
+    async def test_rejects_format_not_advertised(self, mock_conn):
         stage = self._stage(container="dataset")
         stage["formats"] = ["nc"]  # only NetCDF offered
         with patch.object(server, "_download_stage", return_value=stage):
             with pytest.raises(ToolError, match="not available"):
-                server.export_query(datasource_id="test-ds", format="csv")
+                await server.export_query(datasource_id="test-ds", format="csv")
 
-    def test_large_download_warns_but_returns_url(self, mock_conn):
+    async def test_large_download_warns_but_returns_url(self, mock_conn):
         big = self._stage(size=5 * 10**9)
         with patch.object(server, "_download_stage", return_value=big):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert "download_url" in parsed
         assert "warning" in parsed and "Large download" in parsed["warning"]
 
-    def test_no_data(self, mock_conn):
+    async def test_no_data(self, mock_conn):
         with patch.object(server, "_download_stage", return_value=None):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert parsed["status"] == "no_data"
 
-    def test_gateway_error_echoes_query(self, mock_conn):
+    async def test_gateway_error_echoes_query(self, mock_conn):
         with patch.object(
             server, "_download_stage", side_effect=DatameshQueryError("bad query")
         ):
-            parsed = json.loads(server.export_query(datasource_id="test-ds"))
+            parsed = json.loads(await server.export_query(datasource_id="test-ds"))
         assert "bad query" in parsed["error"]
         assert parsed["query"]["datasource"] == "test-ds"
 
 
+class TestAdmission:
+    """Hosted data tools run under per-credential admission control."""
+
+    @pytest.fixture(autouse=True)
+    def _http(self):
+        from oceanum_mcp.common.config import set_transport
+
+        set_transport("http")
+        yield
+        set_transport("stdio")
+
+    async def test_busy_response_when_line_full(self, mock_conn):
+        from oceanum_mcp.common.admission import AdmissionControl
+
+        release = asyncio.Event()
+        stage = {"container": "dataframe", "size": 1, "url": "https://x/y?a=b"}
+
+        async def slow_stage(conn, query):
+            await release.wait()
+            return stage
+
+        admission = AdmissionControl(max_calls=4, tenant_calls=1, queue=0, timeout_s=1)
+        with (
+            patch.object(server, "_admission", admission),
+            patch.object(server, "_download_stage", side_effect=slow_stage),
+        ):
+            first = asyncio.ensure_future(server.export_query(datasource_id="ds-a"))
+            await asyncio.sleep(0.01)
+            busy = json.loads(await server.export_query(datasource_id="ds-b"))
+            release.set()
+            assert "download_url" in json.loads(await first)
+            again = json.loads(await server.export_query(datasource_id="ds-c"))
+
+        assert busy["status"] == "busy"
+        assert busy["retry_after_s"] >= 1
+        assert "Retry after" in busy["error"]
+        assert "download_url" in again
+        assert admission.stats()["running"] == 0
+
+    @pytest.mark.parametrize(
+        "call",
+        [
+            lambda: server.stage_queries(queries=[{"datasource_id": "test-ds"}]),
+            lambda: server.fetch_page(cursor="abc"),
+            lambda: server.load_datasource(datasource_id="test-ds"),
+        ],
+        ids=["stage_queries", "fetch_page", "load_datasource"],
+    )
+    async def test_other_data_tools_admitted(self, mock_conn, call):
+        from oceanum_mcp.common.admission import AdmissionControl
+
+        admission = AdmissionControl(max_calls=4, tenant_calls=1, queue=0, timeout_s=1)
+        with patch.object(server, "_admission", admission):
+            # The credential's one slot is taken by a call in progress.
+            started = await admission.acquire("test-user")
+            busy = json.loads(await call())
+            admission.release("test-user", started)
+            with pytest.raises(ToolError, match="cursor"):
+                await server.fetch_page(cursor="abc")
+
+        assert busy["status"] == "busy"
+        assert busy["retry_after_s"] >= 1
+        assert admission.stats()["running"] == 0
+
+    async def test_stdio_is_not_limited(self, mock_conn, mock_stage, mock_fetch):
+        from oceanum_mcp.common.admission import AdmissionControl
+        from oceanum_mcp.common.config import set_transport
+
+        set_transport("stdio")
+        mock_stage.return_value = make_stage(Container.DataFrame, size=100)
+        mock_fetch.return_value = pd.DataFrame({"temp": [15.0]})
+        admission = AdmissionControl(max_calls=1, tenant_calls=1, queue=0, timeout_s=1)
+        with patch.object(server, "_admission", admission):
+            results = await asyncio.gather(
+                *(server.query_data(datasource_id="test-ds") for _ in range(3))
+            )
+        assert all("error" not in json.loads(result) for result in results)
+        assert admission.stats()["admitted"] == 0
+
+
 class TestLoadDatasource:
-    def test_dataset_loaded(self, mock_conn, mock_stage):
+    async def test_dataset_loaded(self, mock_conn, mock_stage):
         mock_stage.return_value = make_stage(Container.Dataset, size=10**12)
-        mock_conn.load_datasource.return_value = _small_dataset().chunk({"time": 1})
-
-        parsed = json.loads(server.load_datasource(datasource_id="test-ds"))
+        with patch.object(
+            server, "_load_staged", return_value=_small_dataset().chunk({"time": 1})
+        ):
+            parsed = json.loads(await server.load_datasource(datasource_id="test-ds"))
         assert parsed["container"] == "dataset"
         assert parsed["lazy"] is True
 
-    def test_large_frame_refused(self, mock_conn, mock_stage):
+    async def test_large_frame_refused(self, mock_conn, mock_stage):
         mock_stage.return_value = make_stage(Container.DataFrame, size=10**9)
 
-        parsed = json.loads(server.load_datasource(datasource_id="test-ds"))
+        with patch.object(server, "_load_staged") as loader:
+            parsed = json.loads(await server.load_datasource(datasource_id="test-ds"))
         assert parsed["refused"] is True
-        mock_conn.load_datasource.assert_not_called()
+        loader.assert_not_called()
 
-    def test_load_error_returns_datasource_id(self, mock_conn, mock_stage):
+    async def test_load_error_returns_datasource_id(self, mock_conn, mock_stage):
         mock_stage.side_effect = DatameshConnectError("server error: 500")
 
-        parsed = json.loads(server.load_datasource(datasource_id="bad-ds"))
+        parsed = json.loads(await server.load_datasource(datasource_id="bad-ds"))
         assert "error" in parsed
         assert parsed["datasource_id"] == "bad-ds"
 
-    def test_invalid_id_raises_tool_error(self, mock_conn, mock_stage):
+    async def test_summary_error_returns_datasource_id(self, mock_conn, mock_stage):
+        mock_stage.return_value = make_stage(Container.Dataset, size=10**12)
+        with (
+            patch.object(server, "_load_staged", return_value=_small_dataset()),
+            patch.object(
+                server,
+                "summarize_data",
+                side_effect=DatameshConnectError("Server error 503"),
+            ),
+        ):
+            parsed = json.loads(await server.load_datasource(datasource_id="test-ds"))
+        assert "503" in parsed["error"]
+        assert parsed["datasource_id"] == "test-ds"
+
+    async def test_invalid_id_raises_tool_error(self, mock_conn, mock_stage):
         # Query validates datasource ids (min_length=3); the failure must be
         # a ToolError, not a raw pydantic ValidationError.
         with pytest.raises(ToolError, match="Invalid datasource_id"):
-            server.load_datasource(datasource_id="ds")
+            await server.load_datasource(datasource_id="ds")
 
 
 class TestUpdateMetadata:
-    def test_updates_fields_with_typed_info(self, mock_conn):
+    async def test_updates_fields_with_typed_info(self, mock_conn):
         ds = _mock_datasource(id="my-ds", name="Updated Name", tags=["new-tag"])
         mock_conn.update_metadata.return_value = ds
 
-        result = server.update_metadata(
+        result = await server.update_metadata(
             datasource_id="my-ds",
             name="Updated Name",
             tags=["new-tag"],
@@ -688,8 +2366,10 @@ class TestRegistration:
             "search_catalog",
             "get_datasource_info",
             "stage_query",
+            "stage_queries",
             "query_data",
             "export_query",
+            "fetch_page",
             "load_datasource",
             "update_metadata",
         }
@@ -0,0 +1,310 @@
+"""Tests for the Datamesh catalog mirror."""
+
+import datetime
+
+import numpy as np
+import shapely.geometry
+
+from oceanum_mcp.servers.datamesh.catalog import (
+    CatalogMirror,
+    SpatioTemporalIndex,
+    TextIndex,
+)
+
+
+def _feature(id, modified="2024-01-01T00:00:00Z", coords=(174.0, -41.0), **props):
+    return {
+        "type": "Feature",
+        "id": id,
+        "geometry": {"type": "Point", "coordinates": list(coords)},
+        "properties": {
+            "name": id.replace("-", " ").title(),
+            "driver": "onzarr",
+            "modified": modified,
+            **props,
+        },
+    }
+
+
+class TestApply:
+    def test_first_load_adds_everything(self):
+        mirror = CatalogMirror()
+        assert mirror.age() == float("inf")
+        counts = mirror.apply([_feature("aaa-one"), _feature("bbb-two")])
+        assert counts == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+        assert len(mirror) == 2
+        assert mirror.age() < 60
+
+    def test_unchanged_entries_are_not_reparsed(self):
+        mirror = CatalogMirror()
+        mirror.apply([_feature("aaa-one"), _feature("bbb-two")])
+        before = mirror.search(text="one")[0]
+
+        counts = mirror.apply(
+            [
+                _feature("aaa-one"),
+                _feature("bbb-two", modified="2024-06-01T00:00:00Z", name="Renamed"),
+                _feature("ccc-three"),
+            ]
+        )
+        assert counts == {"added": 1, "updated": 1, "removed": 0, "unchanged": 1}
+        assert mirror.search(text="one")[0] is before
+        assert [ds.id for ds in mirror.search(text="renamed")] == ["bbb-two"]
+
+    def test_missing_entries_removed(self):
+        mirror = CatalogMirror()
+        mirror.apply([_feature("aaa-one"), _feature("bbb-two")])
+        assert mirror.apply([_feature("aaa-one")])["removed"] == 1
+        assert mirror.search(text="two") == []
+
+    def test_invalid_features_skipped(self):
+        mirror = CatalogMirror()
+        mirror.apply([_feature("x"), {"type": "Feature"}, _feature("aaa-one")])
+        assert [ds.id for ds in mirror.search()] == ["aaa-one"]
+
+    def test_expire(self):
+        mirror = CatalogMirror()
+        mirror.apply([])
+        mirror.expire()
+        assert mirror.age() == float("inf")
+
+
+class TestTextIndex:
+    def test_rare_terms_outweigh_common_ones(self):
+        index = TextIndex()
+        index.add("a", ["wave", "model", "global"])
+        index.add("b", ["wave", "model", "regional"])
+        index.add("c", ["wave", "buoy"])
+        scores = index.scores("wave buoy")
+        assert max(scores, key=scores.get) == "c"
+        assert set(scores) == {"a", "b", "c"}
+
+    def test_shorter_documents_score_higher(self):
+        index = TextIndex()
+        index.add("short", ["wave", "height"])
+        index.add("long", ["wave", "height", "and", "a", "lot", "more", "words"])
+        index.add("other", ["tide"])
+        scores = index.scores("wave")
+        assert scores["short"] > scores["long"]
+
+    def test_add_replaces_and_remove_forgets(self):
+        index = TextIndex()
+        index.add("a", ["wave"])
+        index.add("a", ["tide"])
+        assert index.scores("wave") == {}
+        assert set(index.scores("tide")) == {"a"}
+        index.remove("a")
+        index.remove("missing")
+        assert len(index) == 0
+        assert index.scores("tide") == {}
+
+    def test_mirror_updates_only_changed_documents(self, monkeypatch):
+        mirror = CatalogMirror()
+        mirror.apply([_feature("aaa-one"), _feature("bbb-two")])
+        added = []
+        original = TextIndex.add
+        monkeypatch.setattr(
+            TextIndex,
+            "add",
+            lambda self, doc_id, tokens: added.append(doc_id)
+            or original(self, doc_id, tokens),
+        )
+        mirror.apply(
+            [
+                _feature("bbb-two", modified="2024-06-01T00:00:00Z", name="Tides"),
+                _feature("ccc-three"),
+            ]
+        )
+        assert added == ["bbb-two", "ccc-three"]
+        assert [ds.id for ds in mirror.search(text="tide")] == ["bbb-two"]
+        assert mirror.search(text="one") == []
+
+
+class TestSearch:
+    def _mirror(self):
+        mirror = CatalogMirror()
+        mirror.apply(
+            [
+                _feature(
+                    "wave-hindcast",
+                    tags=["Wave"],
+                    tstart="1980-01-01T00:00:00Z",
+                    tend="2000-01-01T00:00:00Z",
+                ),
+                _feature(
+                    "wave-forecast",
+                    description="Ongoing wave forecast",
+                    tstart="2020-01-01T00:00:00+12:00",
+                    coords=(0.0, 51.0),
+                ),
+                _feature("bathymetry", labels=["static"]),
+            ]
+        )
+        return mirror
+
+    def _ids(self, datasources):
+        return [ds.id for ds in datasources]
+
+    def test_text_any_term_case_insensitive(self):
+        mirror = self._mirror()
+        assert set(self._ids(mirror.search(text="WAVES"))) == {
+            "wave-hindcast",
+            "wave-forecast",
+        }
+        assert self._ids(mirror.search(text="static")) == ["bathymetry"]
+        assert mirror.search(text="salinity") == []
+
+    def test_text_ranked_by_relevance(self):
+        mirror = self._mirror()
+        # Both match "wave"; only the forecast also matches "ongoing".
+        assert self._ids(mirror.search(text="ongoing wave")) == [
+            "wave-forecast",
+            "wave-hindcast",
+        ]
+        assert self._ids(mirror.search(text="ongoing wave", limit=1)) == [
+            "wave-forecast"
+        ]
+
+    def test_text_combined_with_filters(self):
+        mirror = self._mirror()
+        t = datetime.datetime
+        found = mirror.search(
+            text="ongoing wave", start=t(1990, 1, 1), end=t(1991, 1, 1)
+        )
+        assert self._ids(found) == ["wave-hindcast"]
+
+    def test_variables_searchable(self):
+        mirror = CatalogMirror()
+        schema = {
+            "dims": {"time": 1},
+            "coords": {},
+            "attrs": {},
+            "data_vars": {
+                "hs": {"attrs": {"standard_name": "sea_surface_wave_height"}},
+                "tp": {"attrs": {"long_name": "Peak period"}},
+            },
+        }
+        mirror.apply([_feature("aaa-one", schema=schema), _feature("bbb-two")])
+        assert self._ids(mirror.search(text="hs")) == ["aaa-one"]
+        assert self._ids(mirror.search(text="peak periods")) == ["aaa-one"]
+        assert self._ids(mirror.search(text="surface height")) == ["aaa-one"]
+
+    def test_punctuation_only_text_is_no_filter(self):
+        assert len(self._mirror().search(text="--")) == 3
+
+    def test_time_overlap(self):
+        mirror = self._mirror()
+        t = datetime.datetime
+        assert self._ids(mirror.search(start=t(1990, 1, 1), end=t(1991, 1, 1))) == [
+            "wave-hindcast"
+        ]
+        # No tend means ongoing; datasources without time coverage never match.
+        assert self._ids(mirror.search(start=t(2030, 1, 1))) == ["wave-forecast"]
+        assert self._ids(mirror.search(end=t(1970, 1, 1))) == []
+
+    def test_relative_times(self):
+        mirror = self._mirror()
+        # Only the ongoing forecast covers the last week.
+        found = mirror.search(start=-datetime.timedelta(days=7))
+        assert self._ids(found) == ["wave-forecast"]
+        assert mirror.search(end=-datetime.timedelta(days=365 * 100)) == []
+
+    def test_timezones_normalized(self):
+        mirror = self._mirror()
+        # 2020-01-01T00:00+12:00 is 2019-12-31T12:00 UTC.
+        end = datetime.datetime(2019, 12, 31, 13, tzinfo=datetime.timezone.utc)
+        assert "wave-forecast" in self._ids(mirror.search(end=end))
+
+    def test_bbox_and_limit(self):
+        mirror = self._mirror()
+        assert self._ids(mirror.search(bbox=[-10, 40, 10, 60])) == ["wave-forecast"]
+        assert len(mirror.search(limit=2)) == 2
+
+
+def _synthetic(n, seed=0):
+    """Random point/box datasources, some without time or geometry."""
+    rng = np.random.default_rng(seed)
+    features = []
+    for i in range(n):
+        x, y = rng.uniform(-180, 170), rng.uniform(-90, 80)
+        w, h = rng.uniform(0, 10, size=2)
+        props = {}
+        if i % 7:
+            start = datetime.datetime(1950, 1, 1) + datetime.timedelta(
+                days=int(rng.integers(0, 25000))
+            )
+            props["tstart"] = start.isoformat() + "Z"
+            if i % 3:
+                end = start + datetime.timedelta(days=int(rng.integers(0, 5000)))
+                props["tend"] = end.isoformat() + "Z"
+        feature = _feature(f"ds-{i:05d}", **props)
+        feature["geometry"] = (
+            None
+            if i % 11 == 0
+            else {
+                "type": "Polygon",
+                "coordinates": [
+                    [[x, y], [x + w, y], [x + w, y + h], [x, y + h], [x, y]]
+                ],
+            }
+        )
+        features.append(feature)
+    return features
+
+
+def _scan(datasources, start=None, end=None, bbox=None):
+    """Brute-force reference for SpatioTemporalIndex.query."""
+    box = shapely.geometry.box(*bbox) if bbox else None
+    out = []
+    for i, ds in enumerate(datasources):
+        if start is not None or end is not None:
+            if ds.tstart is None:
+                continue
+            if end is not None and ds.tstart.replace(tzinfo=None) > end:
+                continue
+            if (
+                start is not None
+                and ds.tend is not None
+                and ds.tend.replace(tzinfo=None) < start
+            ):
+                continue
+        if box is not None and (ds.geom is None or not ds.geom.intersects(box)):
+            continue
+        out.append(i)
+    return out
+
+
+class TestSpatioTemporalIndex:
+    def test_matches_brute_force(self):
+        mirror = CatalogMirror()
+        mirror.apply(_synthetic(400))
+        datasources = mirror.search()
+        index = SpatioTemporalIndex(datasources)
+        t = datetime.datetime
+        cases = [
+            {"bbox": [0, 0, 30, 30]},
+            {"start": t(1980, 1, 1), "end": t(1985, 1, 1)},
+            {"start": t(2010, 1, 1)},
+            {"end": t(1960, 6, 1)},
+            {"start": t(1990, 1, 1), "end": t(2000, 1, 1), "bbox": [-60, -60, 0, 0]},
+        ]
+        for case in cases:
+            expected = _scan(datasources, **case)
+            assert index.query(**case).tolist() == expected, case
+            assert expected  # the case exercises something
+
+    def test_no_filters_returns_none(self):
+        assert SpatioTemporalIndex([]).query() is None
+
+    def test_empty_index(self):
+        index = SpatioTemporalIndex([])
+        assert index.query(bbox=[0, 0, 1, 1]).tolist() == []
+        assert index.query(start=datetime.datetime(2000, 1, 1)).tolist() == []
+
+    def test_unchanged_refresh_keeps_index(self):
+        mirror = CatalogMirror()
+        features = _synthetic(20)
+        mirror.apply(features)
+        index = mirror._snapshot.index
+        mirror.apply(features)
+        assert mirror._snapshot.index is index
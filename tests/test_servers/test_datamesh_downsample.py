@@ -0,0 +1,108 @@
+"""Tests for fit_to_budget downsampling plans."""
+
+import datetime
+
+from oceanum.datamesh.datasource import Datasource
+from oceanum.datamesh.query import Query
+
+from oceanum_mcp.servers.datamesh.downsample import plan_downsampling
+
+
+def _hourly_grid(**overrides):
+    """A year of hourly data on a 41 x 41 grid at 0.25 degrees."""
+    props = {
+        "id": "hourly-grid",
+        "name": "Hourly grid",
+        "driver": "onzarr",
+        "coordinates": {"t": "time", "x": "lon", "y": "lat"},
+        "tstart": "2000-01-01T00:00:00Z",
+        "tend": "2001-01-01T00:00:00Z",
+        "geom": {
+            "type": "Polygon",
+            "coordinates": [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]],
+        },
+        "schema": {
+            "dims": {"time": 8785, "lon": 41, "lat": 41},
+            "coords": {},
+            "data_vars": {},
+            "attrs": {},
+        },
+        **overrides,
+    }
+    return Datasource(**props)
+
+
+HOUR = datetime.timedelta(hours=1)
+
+
+def _query(**filters):
+    return Query(datasource="hourly-grid", **filters)
+
+
+_FEBRUARY = {"type": "range", "times": ["2000-02-01", "2000-03-01"]}
+
+
+class TestTime:
+    def test_finest_step_that_reaches_the_factor(self):
+        plan = plan_downsampling(_hourly_grid(), _query(timefilter=_FEBRUARY), 20)
+        # 1h native: 12h is a factor of 12, 1D the first step of at least 20.
+        assert plan.changes == {"time_resolution": "1D", "time_resample": "mean"}
+        assert plan.query.timefilter.resolution == "1D"
+        assert plan.query.timefilter.resample.value == "mean"
+
+    def test_range_added_when_query_has_none(self):
+        plan = plan_downsampling(_hourly_grid(), _query(), 2)
+        assert plan.changes["time_start"] == "2000-01-01T00:00:00"
+        assert plan.changes["time_resolution"] == "3h"
+
+    def test_existing_resolution_is_the_starting_step(self):
+        timefilter = {**_FEBRUARY, "resolution": "6h", "resample": "nearest"}
+        plan = plan_downsampling(_hourly_grid(), _query(timefilter=timefilter), 2)
+        # A chosen resample method is kept.
+        assert plan.changes == {"time_resolution": "12h"}
+        assert plan.query.timefilter.resample.value == "nearest"
+
+    def test_relative_range(self):
+        # A live feed: hourly since 2000 and still running.
+        steps = (datetime.datetime.now() - datetime.datetime(2000, 1, 1)) // HOUR
+        ds = _hourly_grid(
+            tend=None, schema={"dims": {"time": steps + 1, "lon": 41, "lat": 41}}
+        )
+        timefilter = {"type": "range", "times": ["-P30D", None]}
+        plan = plan_downsampling(ds, _query(timefilter=timefilter), 20)
+        assert plan.changes["time_resolution"] == "1D"
+        assert plan.query.timefilter.resolution == "1D"
+
+
+class TestSpace:
+    def test_space_makes_up_what_time_cannot(self):
+        plan = plan_downsampling(_hourly_grid(), _query(timefilter=_FEBRUARY), 100)
+        # February holds 29 days; 2D keeps at least 12 steps (factor 48).
+        assert plan.changes["time_resolution"] == "2D"
+        resolution = plan.changes["geofilter_resolution"]
+        assert (resolution / 0.25) ** 2 * 48 >= 100
+        assert plan.changes["bbox"] == [0.0, 0.0, 10.0, 10.0]
+        assert plan.query.geofilter.resolution == resolution
+
+    def test_series_times_leave_only_space(self):
+        timefilter = {"type": "series", "times": ["2000-02-01", "2000-02-02"]}
+        plan = plan_downsampling(_hourly_grid(), _query(timefilter=timefilter), 4)
+        assert set(plan.changes) == {"geofilter_resolution", "bbox"}
+        assert plan.changes["geofilter_resolution"] == 0.5
+
+    def test_other_crs_disables_space(self):
+        timefilter = {"type": "series", "times": ["2000-02-01"]}
+        query = _query(timefilter=timefilter, crs=3857)
+        assert plan_downsampling(_hourly_grid(), query, 4) is None
+
+
+class TestUnreachable:
+    def test_floors_bound_the_reduction(self):
+        query = _query(
+            timefilter=_FEBRUARY,
+            geofilter={"type": "bbox", "geom": [1, 1, 5, 5]},
+        )
+        assert plan_downsampling(_hourly_grid(), query, 10**6) is None
+
+    def test_no_schema_no_plan(self):
+        assert plan_downsampling(_hourly_grid(schema=None), _query(), 10) is None
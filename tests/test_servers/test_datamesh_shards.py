@@ -0,0 +1,133 @@
+"""Tests for splitting tabular queries into shards."""
+
+import pandas as pd
+from oceanum.datamesh.datasource import Datasource
+from oceanum.datamesh.query import Query
+
+from oceanum_mcp.servers.datamesh.shards import shard_queries
+
+
+def _ds(**overrides):
+    return Datasource(
+        **{
+            "id": "obs-table",
+            "name": "Observations",
+            "driver": "onsql",
+            "tstart": "2000-01-01T00:00:00Z",
+            "tend": "2000-01-05T00:00:00Z",
+            **overrides,
+        }
+    )
+
+
+def _times(query):
+    return [pd.Timestamp(t) for t in query.timefilter.times]
+
+
+class TestTimeRange:
+    def test_equal_disjoint_intervals(self):
+        query = Query(
+            datasource="obs-table",
+            timefilter={"type": "range", "times": ["2000-01-01", "2000-01-03"]},
+        )
+        axis, shards = shard_queries(query, _ds(), 4)
+        assert axis == "time"
+        assert [_times(s)[0] for s in shards] == list(
+            pd.date_range("2000-01-01", periods=4, freq="12h")
+        )
+        # Each shard ends just before the next starts; the last is inclusive.
+        for shard, following in zip(shards, shards[1:]):
+            assert _times(following)[0] - _times(shard)[1] == pd.Timedelta("1us")
+        assert _times(shards[-1])[1] == pd.Timestamp("2000-01-03")
+
+    def test_open_end_stays_open(self):
+        query = Query(
+            datasource="obs-table",
+            timefilter={"type": "range", "times": ["2000-01-03", None]},
+        )
+        _, shards = shard_queries(query, _ds(), 2)
+        assert _times(shards[0])[0] == pd.Timestamp("2000-01-03")
+        # Split within the coverage, but rows after the catalog's tend are kept.
+        assert _times(shards[1])[0] == pd.Timestamp("2000-01-04")
+        assert shards[-1].timefilter.times[1] is None
+
+    def test_no_timefilter_split_within_coverage_open_at_both_ends(self):
+        _, shards = shard_queries(Query(datasource="obs-table"), _ds(), 2)
+        assert shards[0].timefilter.times[0] is None
+        assert _times(shards[1])[0] == pd.Timestamp("2000-01-03")
+        assert shards[1].timefilter.times[1] is None
+
+    def test_bounds_wider_than_coverage_kept(self):
+        query = Query(
+            datasource="obs-table",
+            timefilter={"type": "range", "times": ["1999-01-01", "2001-01-01"]},
+        )
+        _, shards = shard_queries(query, _ds(), 2)
+        assert _times(shards[0])[0] == pd.Timestamp("1999-01-01")
+        assert _times(shards[1])[0] == pd.Timestamp("2000-01-03")
+        assert _times(shards[1])[1] == pd.Timestamp("2001-01-01")
+
+    def test_resampled_range_split_on_bin_boundaries(self):
+        query = Query(
+            datasource="obs-table",
+            timefilter={
+                "type": "range",
+                "times": ["2000-01-01", "2000-12-31"],
+                "resolution": "1MS",
+                "resample": "mean",
+            },
+        )
+        _, shards = shard_queries(query, _ds(tend="2001-01-01T00:00:00Z"), 3)
+        starts = [_times(s)[0] for s in shards]
+        assert starts == [pd.Timestamp(f"2000-{m:02d}-01") for m in (1, 5, 8)]
+        assert all(s.timefilter.resolution == "1MS" for s in shards)
+        assert all(s.timefilter.resample == "mean" for s in shards)
+
+    def test_resolution_with_data_anchored_bins_not_split_by_time(self):
+        query = Query(
+            datasource="obs-table",
+            timefilter={
+                "type": "range",
+                "times": ["2000-01-01", "2000-01-05"],
+                "resolution": "7D",
+            },
+        )
+        assert shard_queries(query, _ds(), 2) is None
+
+    def test_other_filters_kept(self):
+        query = Query(
+            datasource="obs-table",
+            variables=["hs"],
+            coordfilter=[{"coord": "station", "values": ["a", "b"]}],
+        )
+        _, shards = shard_queries(query, _ds(), 3)
+        assert all(s.variables == ["hs"] for s in shards)
+        assert all(s.coordfilter[0].values == ["a", "b"] for s in shards)
+
+
+class TestSelections:
+    def test_series_times_grouped(self):
+        times = [f"2000-01-0{d}" for d in range(1, 6)]
+        query = Query(
+            datasource="obs-table", timefilter={"type": "series", "times": times}
+        )
+        axis, shards = shard_queries(query, _ds(), 2)
+        assert axis == "time"
+        assert [len(s.timefilter.times) for s in shards] == [3, 2]
+
+    def test_coord_values_when_time_cannot_split(self):
+        query = Query(
+            datasource="obs-table",
+            coordfilter=[
+                {"coord": "depth", "values": [0]},
+                {"coord": "station", "values": ["a", "b", "c"]},
+            ],
+        )
+        axis, shards = shard_queries(query, _ds(tstart=None, tend=None), 8)
+        assert axis == "coord:station"
+        # Never more shards than values.
+        assert [s.coordfilter[1].values for s in shards] == [["a"], ["b"], ["c"]]
+        assert all(s.coordfilter[0].values == [0] for s in shards)
+
+    def test_nothing_to_split(self):
+        assert shard_queries(Query(datasource="obs-table"), _ds(tstart=None), 4) is None
@@ -0,0 +1,199 @@
+"""Tests for the incremental export writers."""
+
+import threading
+
+import dask.array as da
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+import xarray as xr
+
+from oceanum_mcp.servers.datamesh.writers import (
+    ExportManifest,
+    TableWriter,
+    assemble_parts,
+    is_zarr_store,
+    write_part,
+    write_netcdf,
+    write_zarr,
+)
+
+
+def test_parquet_pieces_become_row_groups_with_the_first_schema(tmp_path):
+    dest = tmp_path / "sub" / "out.parquet"
+    writer = TableWriter(dest, "parquet")
+    writer.write(pd.DataFrame({"x": [1.5, 2.5], "name": ["a", "b"]}))
+    # Reordered columns and integer values conform to the first piece.
+    writer.write(pd.DataFrame({"name": ["c"], "x": [3]}))
+    writer.close()
+
+    assert writer.rows == 3
+    assert pq.ParquetFile(dest).num_row_groups == 2
+    written = pd.read_parquet(dest)
+    assert list(written.columns) == ["x", "name"]
+    assert written["x"].tolist() == [1.5, 2.5, 3.0]
+    assert list(writer.template.columns) == ["x", "name"]
+    assert len(writer.template) == 0
+
+
+def test_parquet_piece_that_cannot_be_cast_is_an_error(tmp_path):
+    writer = TableWriter(tmp_path / "out.parquet", "parquet")
+    writer.write(pd.DataFrame({"x": [1, 2]}))
+    with pytest.raises(ValueError, match="Rows 2"):
+        writer.write(pd.DataFrame({"x": ["not a number"]}))
+    writer.close()
+
+
+def test_csv_pieces_append_under_one_header(tmp_path):
+    dest = tmp_path / "out.csv"
+    writer = TableWriter(dest, "csv")
+    writer.write(pd.DataFrame({"x": [1], "y": [np.nan]}))
+    writer.write(pd.DataFrame({"y": [2.0], "x": [3]}))
+    writer.close()
+
+    assert dest.read_text().splitlines() == ["x,y", "1,", "3,2.0"]
+
+
+class _SlowChunks:
+    """A lazy dataset whose chunk reads sleep briefly and record concurrency."""
+
+    def __init__(self) -> None:
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def _read(self, block):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        threading.Event().wait(0.02)
+        with self._lock:
+            self.active -= 1
+        return block + 1
+
+    def dataset(self) -> xr.Dataset:
+        # 8 chunks of 10 x 50 float64 = 4 kB each.
+        data = da.zeros((80, 50), chunks=(10, 50)).map_blocks(self._read)
+        return xr.Dataset({"hs": (("time", "x"), data)})
+
+
+def test_netcdf_chunks_fetched_concurrently_with_report(tmp_path):
+    chunks = _SlowChunks()
+    dest = tmp_path / "out.nc"
+    report = write_netcdf(chunks.dataset(), dest, workers=4, window_bytes=10**6)
+
+    assert 1 < chunks.peak <= 4
+    assert report["workers"] == 4
+    assert report["chunks"] == 8
+    assert report["bytes"] == 80 * 50 * 8
+    assert report["mb_per_s"] > 0 and report["chunks_per_s"] > 0
+    assert (xr.load_dataset(dest)["hs"] == 1).all()
+
+
+def test_netcdf_window_caps_workers(tmp_path):
+    chunks = _SlowChunks()
+    report = write_netcdf(
+        chunks.dataset(), tmp_path / "out.nc", workers=4, window_bytes=9000
+    )
+    assert report["workers"] == 2
+    assert chunks.peak <= 2
+
+
+def test_zarr_store_chunks_follow_source_and_even_out(tmp_path):
+    ds = xr.Dataset(
+        {"hs": (("time", "x"), np.random.rand(60, 20))},
+        coords={"time": pd.date_range("2000-01-01", periods=60, freq="h")},
+    ).chunk({"time": (5, 25, 25, 5)})
+    # NetCDF-only encodings from the source must not break the Zarr write.
+    ds["hs"].encoding.update(zlib=True, complevel=4, dtype="float32")
+    dest = tmp_path / "out.zarr"
+
+    report = write_zarr(ds, dest, workers=4, window_bytes=10**6, compression="zstd")
+
+    assert is_zarr_store(dest)
+    written = xr.open_zarr(dest)
+    assert written["hs"].encoding["chunks"] == (25, 20)
+    assert written["hs"].encoding["compressor"].cname == "zstd"
+    assert written["hs"].dtype == np.float32
+    np.testing.assert_allclose(written["hs"].values, ds["hs"].values, rtol=1e-6)
+    assert report["chunks"] == 3  # 25 + 25 + 10
+
+
+def test_zarr_uncompressed_and_parallel(tmp_path):
+    chunks = _SlowChunks()
+    dest = tmp_path / "out.zarr"
+    write_zarr(
+        chunks.dataset(), dest, workers=4, window_bytes=10**6, compression="none"
+    )
+    assert chunks.peak > 1
+    written = xr.open_zarr(dest)
+    assert written["hs"].encoding["compressor"] is None
+    assert written["hs"].encoding["chunks"] == (10, 50)
+    assert not is_zarr_store(tmp_path)
+
+
+def test_manifest_resumes_only_its_own_export_and_plan(tmp_path):
+    path = tmp_path / "out.zarr.manifest.json"
+    first = ExportManifest(path, {"query": {"datasource": "a"}})
+    assert not first.load()
+    assert not first.start({"edges": (0, 10, 20)}, 3)
+    first.complete(1)
+
+    again = ExportManifest(path, {"query": {"datasource": "a"}})
+    assert again.load()
+    assert again.start({"edges": [0, 10, 20]}, 3)
+    assert (again.remaining(), again.skipped) == ([0, 2], 1)
+    assert not ExportManifest(path, {"query": {"datasource": "b"}}).load()
+
+    # The same export cut differently starts over.
+    assert not again.start({"edges": [0, 20]}, 2)
+    assert again.remaining() == [0, 1]
+    again.discard()
+    assert not path.exists()
+
+
+def test_parts_assemble_in_order_skipping_empty_pieces(tmp_path):
+    parts = tmp_path / "out.csv.parts"
+    write_part(parts, 2, pd.DataFrame({"x": [3]}))
+    write_part(parts, 0, pd.DataFrame({"x": [1, 2]}))
+    dest = tmp_path / "out.csv"
+
+    writer = assemble_parts(parts, 3, dest, "csv")
+
+    assert writer.rows == 3
+    assert dest.read_text().splitlines() == ["x", "1", "2", "3"]
+
+
+def test_zarr_resumes_after_a_failed_chunk(tmp_path):
+    reads = []
+    failing = {50}
+
+    def read(block, block_info=None):
+        start = block_info[0]["array-location"][0][0]
+        if start in failing:
+            raise OSError("chunk fetch failed")
+        reads.append(start)
+        return block + start
+
+    def dataset() -> xr.Dataset:
+        data = da.zeros((80, 50), chunks=(10, 50)).map_blocks(read, dtype=float)
+        return xr.Dataset({"hs": (("time", "x"), data)}, coords={"time": np.arange(80)})
+
+    dest = tmp_path / "out.zarr"
+    manifest = ExportManifest(tmp_path / "out.zarr.manifest.json", {"q": 1})
+    # One worker: pieces are the store metadata, then two 4-chunk slabs.
+    with pytest.raises(OSError, match="chunk fetch failed"):
+        write_zarr(dataset(), dest, 1, 10**6, manifest=manifest)
+    assert manifest.done == {0, 1}
+
+    failing.clear()
+    reads.clear()
+    resumed = ExportManifest(tmp_path / "out.zarr.manifest.json", {"q": 1})
+    assert resumed.load()
+    report = write_zarr(dataset(), dest, 1, 10**6, manifest=resumed)
+
+    assert sorted(reads) == [40, 50, 60, 70]
+    assert report["chunks"] == 4
+    assert resumed.skipped == 2
+    written = xr.open_zarr(dest)["hs"].values
+    np.testing.assert_array_equal(written[:, 0], np.repeat(np.arange(0, 80, 10), 10))